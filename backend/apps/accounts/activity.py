@@ -0,0 +1,238 @@
+# backend/apps/accounts/activity.py
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import OperationalError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.core.cache import get_redis_client
+from .models import User, UserActivity
+
+ACTIVITY_QUEUE_KEY = 'activity:queue'
+# Eventos que não puderam ser gravados, guardados para inspeção
+ACTIVITY_DEAD_LETTER_KEY = 'activity:dead'
+ACTIVITY_BATCH_SIZE = 1000
+# Lote retirado da fila e ainda não gravado
+ACTIVITY_PROCESSING_KEY = 'activity:processing'
+ACTIVITY_FLUSH_LOCK_KEY = 'activity:flush_lock'
+ACTIVITY_FLUSH_LOCK_TIMEOUT = 5 * 60
+
+_local_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+def record_activity(user, activity_type, target_id=None, metadata=None):
+    """Registra uma atividade; com write-behind ela é enfileirada após o commit"""
+    if not settings.ACTIVITY_WRITE_BEHIND:
+        return UserActivity.objects.create(
+            user=user,
+            activity_type=activity_type,
+            target_id=target_id,
+            metadata=metadata or {}
+        )
+
+    # O horário é o do evento, não o da gravação em lote
+    event = {
+        'user_id': user.pk,
+        'activity_type': activity_type,
+        'target_id': target_id,
+        'metadata': metadata or {},
+        'created_at': timezone.now(),
+    }
+    transaction.on_commit(lambda: enqueue(event))
+    return None
+
+
+def enqueue(event):
+    _push(ACTIVITY_QUEUE_KEY, [json.dumps(event, cls=DjangoJSONEncoder)])
+
+
+def _push(key, payloads):
+    """Acrescenta os eventos ao fim da lista `key`"""
+    redis = get_redis_client()
+    if redis is not None:
+        redis.rpush(cache.make_key(key), *payloads)
+        return
+
+    with _local_lock:
+        queue = cache.get(key) or []
+        cache.set(key, queue + list(payloads), None)
+
+
+def _release(payloads):
+    """Devolve os eventos ao início da fila e esvazia a lista em processamento, numa transação"""
+    redis = get_redis_client()
+    if redis is not None:
+        pipe = redis.pipeline(transaction=True)
+        if payloads:
+            pipe.lpush(cache.make_key(ACTIVITY_QUEUE_KEY), *reversed(payloads))
+        pipe.delete(cache.make_key(ACTIVITY_PROCESSING_KEY))
+        pipe.execute()
+        return
+
+    with _local_lock:
+        queue = cache.get(ACTIVITY_QUEUE_KEY) or []
+        cache.set(ACTIVITY_QUEUE_KEY, list(payloads) + queue, None)
+        cache.delete(ACTIVITY_PROCESSING_KEY)
+
+
+def claim(limit):
+    """Move até `limit` eventos do início da fila para a lista em processamento
+
+    Cada LMOVE é atômico (Redis 6.2+): um worker morto no meio do lote deixa os
+    eventos na lista em processamento, de onde recover() os devolve à fila.
+    """
+    redis = get_redis_client()
+    if redis is not None:
+        queue = cache.make_key(ACTIVITY_QUEUE_KEY)
+        processing = cache.make_key(ACTIVITY_PROCESSING_KEY)
+        pipe = redis.pipeline(transaction=False)
+        for _ in range(limit):
+            pipe.lmove(queue, processing, 'LEFT', 'RIGHT')
+        return [payload for payload in pipe.execute() if payload is not None]
+
+    with _local_lock:
+        queue = cache.get(ACTIVITY_QUEUE_KEY) or []
+        processing = cache.get(ACTIVITY_PROCESSING_KEY) or []
+        cache.set(ACTIVITY_PROCESSING_KEY, processing + queue[:limit], None)
+        cache.set(ACTIVITY_QUEUE_KEY, queue[limit:], None)
+        return queue[:limit]
+
+
+def ack():
+    """Lote gravado (ou descartado): esvazia a lista em processamento"""
+    redis = get_redis_client()
+    if redis is not None:
+        redis.delete(cache.make_key(ACTIVITY_PROCESSING_KEY))
+        return
+    cache.delete(ACTIVITY_PROCESSING_KEY)
+
+
+def recover():
+    """Devolve ao início da fila, na ordem, um lote deixado por um flush interrompido"""
+    redis = get_redis_client()
+    if redis is not None:
+        queue = cache.make_key(ACTIVITY_QUEUE_KEY)
+        processing = cache.make_key(ACTIVITY_PROCESSING_KEY)
+        pending = redis.llen(processing)
+        if pending:
+            pipe = redis.pipeline(transaction=False)
+            for _ in range(pending):
+                pipe.lmove(processing, queue, 'RIGHT', 'LEFT')
+            pipe.execute()
+        return pending
+
+    with _local_lock:
+        processing = cache.get(ACTIVITY_PROCESSING_KEY) or []
+        if processing:
+            queue = cache.get(ACTIVITY_QUEUE_KEY) or []
+            cache.set(ACTIVITY_QUEUE_KEY, processing + queue, None)
+            cache.delete(ACTIVITY_PROCESSING_KEY)
+        return len(processing)
+
+
+def pending_count(key=ACTIVITY_QUEUE_KEY):
+    redis = get_redis_client()
+    if redis is not None:
+        return redis.llen(cache.make_key(key))
+    return len(cache.get(key) or [])
+
+
+def dead_letter(payloads, reason):
+    logger.error('Atividades descartadas (%s): %d evento(s)', reason, len(payloads))
+    _push(ACTIVITY_DEAD_LETTER_KEY, payloads)
+
+
+def _parse(payloads):
+    """Pares (payload, UserActivity); payloads ilegíveis vão para a dead letter"""
+    parsed, invalid = [], []
+    for payload in payloads:
+        try:
+            event = json.loads(payload)
+            event['created_at'] = parse_datetime(event['created_at'])
+            parsed.append((payload, UserActivity(**event)))
+        except (TypeError, ValueError, KeyError):
+            invalid.append(payload)
+    if invalid:
+        dead_letter(invalid, 'payload inválido')
+    return parsed
+
+
+def _insert_one_by_one(parsed):
+    """Fallback do lote: cada linha na sua savepoint, as que falham vão para a dead letter"""
+    saved, failed = 0, []
+    for index, (payload, activity) in enumerate(parsed):
+        try:
+            with transaction.atomic():
+                activity.save(force_insert=True)
+        except OperationalError:
+            # Banco indisponível: nada a ver com o evento, o resto volta para a fila
+            _release([payload for payload, _ in parsed[index:]])
+            raise
+        except Exception:
+            failed.append(payload)
+        else:
+            saved += 1
+    if failed:
+        dead_letter(failed, 'falha ao gravar')
+    return saved
+
+
+def _persist(payloads):
+    """Grava um lote já na lista em processamento; retorna quantas atividades foram salvas"""
+    parsed = _parse(payloads)
+
+    # Usuários excluídos depois do evento: as atividades iriam junto no CASCADE
+    existing = set(User.objects.filter(
+        pk__in={activity.user_id for _, activity in parsed}
+    ).values_list('pk', flat=True))
+    orphans = [payload for payload, activity in parsed if activity.user_id not in existing]
+    if orphans:
+        logger.warning('Atividades de usuários excluídos descartadas: %d', len(orphans))
+    parsed = [item for item in parsed if item[1].user_id in existing]
+    if not parsed:
+        return 0
+
+    try:
+        with transaction.atomic():
+            UserActivity.objects.bulk_create([activity for _, activity in parsed])
+    except OperationalError:
+        _release([payload for payload, _ in parsed])
+        raise
+    except Exception:
+        # Um evento ruim não pode travar a fila: grava um a um
+        logger.exception('Falha no lote de atividades; gravando uma a uma')
+        return _insert_one_by_one(parsed)
+    return len(parsed)
+
+
+def flush_activities(batch_size=ACTIVITY_BATCH_SIZE):
+    """Persiste os eventos enfileirados com bulk_create em lotes
+
+    Um flush por vez (lock no cache); cada lote fica na lista em processamento até
+    o commit, então um worker morto no meio não perde o lote: o próximo flush o recupera.
+    A entrega é pelo menos uma vez: o lote do worker morto pode já ter sido gravado.
+    """
+    if not cache.add(ACTIVITY_FLUSH_LOCK_KEY, 1, ACTIVITY_FLUSH_LOCK_TIMEOUT):
+        return 0
+    try:
+        recovered = recover()
+        if recovered:
+            logger.warning('Lote de atividades interrompido devolvido à fila: %d evento(s)', recovered)
+
+        saved = 0
+        while True:
+            payloads = claim(batch_size)
+            if not payloads:
+                return saved
+            saved += _persist(payloads)
+            ack()
+            cache.touch(ACTIVITY_FLUSH_LOCK_KEY, ACTIVITY_FLUSH_LOCK_TIMEOUT)
+    finally:
+        cache.delete(ACTIVITY_FLUSH_LOCK_KEY)
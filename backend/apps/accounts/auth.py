@@ -0,0 +1,122 @@
+# backend/apps/accounts/auth.py
+from channels.auth import AuthMiddleware
+from channels.db import database_sync_to_async
+from channels.sessions import CookieMiddleware, SessionMiddleware
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import User
+
+# Campos usados por permissões e serializers; os demais ficam adiados (deferred)
+AUTH_USER_FIELDS = (
+    'id', 'username', 'level', 'region', 'preferred_tags', 'profile_picture',
+    'is_active', 'is_staff', 'is_superuser',
+)
+AUTH_USER_TTL = 60 * 5
+
+
+def auth_user_key(user_id):
+    return f'auth_user:{user_id}'
+
+
+def invalidate_auth_user(user_id):
+    """Descarta a projeção; repetido no commit para não recachear dados antigos"""
+    cache.delete(auth_user_key(user_id))
+    transaction.on_commit(lambda: cache.delete(auth_user_key(user_id)))
+
+
+def _projection(user_id):
+    row = User.objects.filter(pk=user_id).values(*AUTH_USER_FIELDS, 'password').first()
+    if row is None:
+        return None
+
+    password = row.pop('password')
+    # Hashes derivados da senha: sessão (Channels) e revogação de token (JWT)
+    row['session_hash'] = User(password=password).get_session_auth_hash()
+    row['revoke_hash'] = get_md5_hash_password(password)
+    return row
+
+
+def get_cached_user(user_id):
+    """User com apenas os campos da projeção carregados, ou None
+
+    Campos fora da projeção são carregados sob demanda pelo próprio Django,
+    e save() grava só os campos carregados.
+    """
+    data = cache.get(auth_user_key(user_id))
+    if data is None:
+        data = _projection(user_id)
+        if data is None:
+            return None
+        cache.set(auth_user_key(user_id), data, AUTH_USER_TTL)
+
+    # from_db espera os valores na ordem dos campos concretos do modelo
+    fields = [field.attname for field in User._meta.concrete_fields if field.attname in AUTH_USER_FIELDS]
+    user = User.from_db(DEFAULT_DB_ALIAS, fields, [data[field] for field in fields])
+    user._auth_hashes = (data['session_hash'], data['revoke_hash'])
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication sem leitura da tabela de usuários a cada request"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != user._auth_hashes[1]:
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code='password_changed'
+                )
+
+        return user
+
+
+@database_sync_to_async
+def get_session_user(scope):
+    """Equivalente a channels.auth.get_user usando a projeção em cache"""
+    session = scope['session']
+    try:
+        user_id = User._meta.pk.to_python(session[SESSION_KEY])
+        backend_path = session[BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser()
+
+    user = get_cached_user(user_id)
+    session_hash = session.get(HASH_SESSION_KEY)
+    if user is None or not user.is_active or not (
+        session_hash and constant_time_compare(session_hash, user._auth_hashes[0])
+    ):
+        session.flush()
+        return AnonymousUser()
+    return user
+
+
+class CachedAuthMiddleware(AuthMiddleware):
+    async def resolve_scope(self, scope):
+        scope['user']._wrapped = await get_session_user(scope)
+
+
+def CachedAuthMiddlewareStack(inner):
+    return CookieMiddleware(SessionMiddleware(CachedAuthMiddleware(inner)))
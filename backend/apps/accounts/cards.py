@@ -0,0 +1,69 @@
+# backend/apps/accounts/cards.py
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import User
+
+# Representação compacta do usuário embutida em posts, comentários, reações e mensagens
+USER_CARD_FIELDS = ('id', 'username', 'profile_picture')
+USER_CARD_TTL = 60 * 60
+
+
+def user_card_key(user_id):
+    return f'user_card:{user_id}'
+
+
+def build_user_card(user):
+    """Cartão pré-computado; a URL do avatar é resolvida uma vez, não a cada render"""
+    return {
+        'id': user.id,
+        'username': user.username,
+        'profile_picture': user.profile_picture.url if user.profile_picture else None,
+    }
+
+
+def get_user_cards(user_ids):
+    """{id: cartão} com uma ida ao cache e, para os faltantes, uma única query"""
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return {}
+
+    keys = {user_card_key(user_id): user_id for user_id in user_ids}
+    cards = {keys[key]: card for key, card in cache.get_many(keys).items()}
+
+    missing = user_ids - cards.keys()
+    if missing:
+        loaded = {
+            user.id: build_user_card(user)
+            for user in User.objects.filter(pk__in=missing).only(*USER_CARD_FIELDS)
+        }
+        cache.set_many({user_card_key(user_id): card for user_id, card in loaded.items()}, USER_CARD_TTL)
+        cards.update(loaded)
+
+    return cards
+
+
+def load_user_cards(context, user_ids):
+    """Acumula os cartões no contexto do serializer, buscando só os que faltam"""
+    cards = context.setdefault('user_cards', {})
+    cards.update(get_user_cards(set(user_ids) - cards.keys()))
+    return cards
+
+
+def represent_user_card(user_id, context, user=None):
+    """Cartão como emitido pela API: avatar em URL absoluta quando há request"""
+    card = context.get('user_cards', {}).get(user_id)
+    if card is None:
+        card = build_user_card(user) if user is not None else get_user_cards([user_id]).get(user_id)
+    if card is None:
+        return None
+
+    request = context.get('request')
+    if request is not None and card['profile_picture']:
+        card = {**card, 'profile_picture': request.build_absolute_uri(card['profile_picture'])}
+    return card
+
+
+def invalidate_user_card(user_id):
+    cache.delete(user_card_key(user_id))
+    transaction.on_commit(lambda: cache.delete(user_card_key(user_id)))
@@ -0,0 +1,7 @@
+# backend/apps/accounts/counters.py
+from apps.core.counters import BufferedCounter
+
+from .models import User
+
+user_followers = BufferedCounter(User, 'followers_count', source=('accounts.Follow', 'following'))
+user_following = BufferedCounter(User, 'following_count', source=('accounts.Follow', 'follower'))
@@ -0,0 +1,104 @@
+# backend/apps/accounts/graph.py
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.core.cache import get_redis_client
+from .models import Follow
+
+FOLLOW_GRAPH_TTL = 60 * 60 * 24
+# Membro sentinela: conjunto carregado, ainda que o usuário não siga ninguém
+_LOADED = 0
+
+# SADD só em conjuntos já carregados; os demais são lidos do banco sob demanda
+_ADD_IF_LOADED = """
+if redis.call('exists', KEYS[1]) == 1 then
+    return redis.call('sadd', KEYS[1], ARGV[1])
+end
+return 0
+"""
+
+
+class FollowGraph:
+    """Arestas de follow em cache (um set de seguidos por usuário), lidas sob demanda"""
+
+    @property
+    def redis(self):
+        return get_redis_client()
+
+    def _key(self, user_id):
+        return f'follows:{user_id}'
+
+    def _load(self, user_id):
+        following = set(Follow.objects.filter(follower_id=user_id).values_list('following_id', flat=True))
+        redis = self.redis
+        if redis is not None:
+            key = cache.make_key(self._key(user_id))
+            pipe = redis.pipeline()
+            pipe.sadd(key, _LOADED, *following)
+            pipe.expire(key, FOLLOW_GRAPH_TTL)
+            pipe.execute()
+        else:
+            cache.set(self._key(user_id), following, FOLLOW_GRAPH_TTL)
+        return following
+
+    def mutual(self, user_a, user_b):
+        """Os dois se seguem? Um round trip quando os dois conjuntos estão em cache"""
+        return all(self.mutual_edges(user_a, user_b))
+
+    def mutual_edges(self, user_a, user_b):
+        """(a segue b, b segue a)"""
+        redis = self.redis
+        if redis is not None:
+            key_a = cache.make_key(self._key(user_a))
+            key_b = cache.make_key(self._key(user_b))
+            pipe = redis.pipeline(transaction=False)
+            pipe.exists(key_a)
+            pipe.exists(key_b)
+            pipe.sismember(key_a, user_b)
+            pipe.sismember(key_b, user_a)
+            loaded_a, loaded_b, a_follows_b, b_follows_a = pipe.execute()
+
+            if not loaded_a:
+                a_follows_b = user_b in self._load(user_a)
+            if not loaded_b:
+                b_follows_a = user_a in self._load(user_b)
+            return bool(a_follows_b), bool(b_follows_a)
+
+        sets = cache.get_many([self._key(user_a), self._key(user_b)])
+        following_a = sets.get(self._key(user_a))
+        if following_a is None:
+            following_a = self._load(user_a)
+        following_b = sets.get(self._key(user_b))
+        if following_b is None:
+            following_b = self._load(user_b)
+        return user_b in following_a, user_a in following_b
+
+    def add_edge(self, follower_id, following_id):
+        redis = self.redis
+        if redis is not None:
+            redis.eval(_ADD_IF_LOADED, 1, cache.make_key(self._key(follower_id)), following_id)
+            return
+
+        following = cache.get(self._key(follower_id))
+        if following is not None:
+            following.add(following_id)
+            cache.set(self._key(follower_id), following, FOLLOW_GRAPH_TTL)
+
+    def remove_edge(self, follower_id, following_id):
+        redis = self.redis
+        if redis is not None:
+            redis.srem(cache.make_key(self._key(follower_id)), following_id)
+            return
+
+        following = cache.get(self._key(follower_id))
+        if following is not None:
+            following.discard(following_id)
+            cache.set(self._key(follower_id), following, FOLLOW_GRAPH_TTL)
+
+    def unfollowed(self, follower_id, following_id):
+        """Chamado por Follow.delete; repetido no commit caso outra leitura recarregue o conjunto antes"""
+        self.remove_edge(follower_id, following_id)
+        transaction.on_commit(lambda: self.remove_edge(follower_id, following_id))
+
+
+follow_graph = FollowGraph()
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:59
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['preferred_tags'], name='accounts_user_pref_tags_gin'),
+        ),
+    ]
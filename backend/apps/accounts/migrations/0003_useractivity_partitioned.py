@@ -0,0 +1,112 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:17
+
+import datetime
+
+from django.db import migrations, models
+import django.utils.timezone
+
+TABLE = 'accounts_useractivity'
+LEGACY = 'accounts_useractivity_legacy'
+SEQUENCE = 'accounts_useractivity_id_seq'
+COLUMNS = 'id, activity_type, target_id, metadata, created_at, user_id'
+
+
+def _next_month(day):
+    return (day.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+
+
+def partition_useractivity(apps, schema_editor):
+    """Recria accounts_useractivity particionada por mês em created_at"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    execute = schema_editor.execute
+    execute(f'ALTER TABLE {TABLE} RENAME TO {LEGACY}')
+    execute(f'ALTER TABLE {LEGACY} RENAME CONSTRAINT {TABLE}_pkey TO {LEGACY}_pkey')
+    # Libera o nome da sequência de identidade para a nova tabela
+    execute(f'ALTER TABLE {LEGACY} ALTER COLUMN id DROP IDENTITY')
+    execute(f'CREATE SEQUENCE {SEQUENCE}')
+    # A chave primária de uma tabela particionada precisa incluir a coluna de partição
+    execute(f'''
+        CREATE TABLE {TABLE} (
+            id bigint NOT NULL DEFAULT nextval('{SEQUENCE}'),
+            activity_type varchar(20) NOT NULL,
+            target_id integer NULL CHECK (target_id >= 0),
+            metadata jsonb NOT NULL,
+            created_at timestamp with time zone NOT NULL,
+            user_id bigint NOT NULL REFERENCES accounts_user (id) DEFERRABLE INITIALLY DEFERRED,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    ''')
+    execute(f'ALTER SEQUENCE {SEQUENCE} OWNED BY {TABLE}.id')
+    execute(f'CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT')
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'SELECT MIN(created_at)::date, COALESCE(MAX(id), 0) FROM {LEGACY}')
+        first_day, last_id = cursor.fetchone()
+
+    day = (first_day or django.utils.timezone.localdate()).replace(day=1)
+    last = _next_month(_next_month(django.utils.timezone.localdate()))
+    while day <= last:
+        execute(
+            f'CREATE TABLE {TABLE}_y{day.year}m{day.month:02d} PARTITION OF {TABLE} '
+            f'FOR VALUES FROM (%s) TO (%s)',
+            [day.isoformat(), _next_month(day).isoformat()]
+        )
+        day = _next_month(day)
+
+    execute(f'INSERT INTO {TABLE} ({COLUMNS}) SELECT {COLUMNS} FROM {LEGACY}')
+    # Checa a FK diferida agora; o CREATE INDEX seguinte não roda com triggers pendentes
+    execute('SET CONSTRAINTS ALL IMMEDIATE')
+    execute(f'SELECT setval(%s, %s + 1, false)', [SEQUENCE, last_id])
+    execute(f'DROP TABLE {LEGACY}')
+
+
+def unpartition_useractivity(apps, schema_editor):
+    """Volta para uma tabela comum, preservando os registros"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    execute = schema_editor.execute
+    execute(f'ALTER TABLE {TABLE} RENAME TO {LEGACY}')
+    execute(f'ALTER TABLE {LEGACY} RENAME CONSTRAINT {TABLE}_pkey TO {LEGACY}_pkey')
+    execute(f'ALTER SEQUENCE {SEQUENCE} RENAME TO {LEGACY}_id_seq')
+    execute(f'''
+        CREATE TABLE {TABLE} (
+            id bigint NOT NULL PRIMARY KEY GENERATED BY DEFAULT AS IDENTITY,
+            activity_type varchar(20) NOT NULL,
+            target_id integer NULL CHECK (target_id >= 0),
+            metadata jsonb NOT NULL,
+            created_at timestamp with time zone NOT NULL,
+            user_id bigint NOT NULL REFERENCES accounts_user (id) DEFERRABLE INITIALLY DEFERRED
+        )
+    ''')
+    execute(f'CREATE INDEX {TABLE}_user_id_idx ON {TABLE} (user_id)')
+    execute(f'INSERT INTO {TABLE} ({COLUMNS}) SELECT {COLUMNS} FROM {LEGACY}')
+    execute('SET CONSTRAINTS ALL IMMEDIATE')
+    execute(
+        f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), "
+        f"COALESCE((SELECT MAX(id) FROM {TABLE}), 0) + 1, false)"
+    )
+    execute(f'DROP TABLE {LEGACY}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_preferred_tags_gin_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='useractivity',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        # O índice abaixo é criado na tabela particionada e propagado às partições
+        migrations.RunPython(partition_useractivity, unpartition_useractivity),
+        migrations.AddIndex(
+            model_name='useractivity',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='accounts_ua_user_created_idx'),
+        ),
+    ]
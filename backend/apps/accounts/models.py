@@ -1,8 +1,10 @@
 # backend/apps/accounts/models.py
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
 from django.core.validators import FileExtensionValidator
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 import os
 
 class UserLevel(models.TextChoices):
@@ -87,10 +89,19 @@ class User(AbstractUser):
             models.Index(fields=['email']),
             models.Index(fields=['level']),
             models.Index(fields=['region']),
+            GinIndex(fields=['preferred_tags'], name='accounts_user_pref_tags_gin'),
         ]
     
     def __str__(self):
         return f"{self.username} ({self.get_level_display()})"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Nível, perfil e senha alimentam a projeção da autenticação e o cartão do usuário
+        from .auth import invalidate_auth_user
+        from .cards import invalidate_user_card
+        invalidate_auth_user(self.pk)
+        invalidate_user_card(self.pk)
     
     def can_post(self):
         return self.level in [UserLevel.USER, UserLevel.PLUS, UserLevel.PRO]
@@ -154,15 +165,28 @@ class Follow(models.Model):
 
         super().save(*args, **kwargs)
         if is_new:
-            User.objects.filter(pk=self.follower_id).update(following_count=models.F('following_count') + 1)
-            User.objects.filter(pk=self.following_id).update(followers_count=models.F('followers_count') + 1)
+            from .counters import user_followers, user_following
+            from .graph import follow_graph
+            user_following.incr(self.follower_id)
+            user_followers.incr(self.following_id)
+            follow_graph.add_edge(self.follower_id, self.following_id)
+
+            from apps.core.versioned_cache import bump_version
+            bump_version(f'follows:{self.follower_id}', f'follows:{self.following_id}')
 
     def delete(self, *args, **kwargs):
         follower_id = self.follower_id
         following_id = self.following_id
         super().delete(*args, **kwargs)
-        User.objects.filter(pk=follower_id).update(following_count=models.F('following_count') - 1)
-        User.objects.filter(pk=following_id).update(followers_count=models.F('followers_count') - 1)
+        from .counters import user_followers, user_following
+        from .graph import follow_graph
+        from apps.chat.access import forget_private_rooms
+        from apps.core.versioned_cache import bump_version
+        user_following.incr(follower_id, -1)
+        user_followers.incr(following_id, -1)
+        follow_graph.unfollowed(follower_id, following_id)
+        forget_private_rooms(follower_id, following_id)
+        bump_version(f'follows:{follower_id}', f'follows:{following_id}')
 
 class UserActivity(models.Model):
     """Registro de atividades do usuário"""
@@ -182,9 +206,14 @@ class UserActivity(models.Model):
     activity_type = models.CharField(max_length=20, choices=ACTIVITY_TYPES)
     target_id = models.PositiveIntegerField(null=True, blank=True)
     metadata = models.JSONField(default=dict, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Gravadas em lote (ver activity.py): o horário vem do evento
+    created_at = models.DateTimeField(default=timezone.now)
     
     class Meta:
         verbose_name = 'Atividade'
         verbose_name_plural = 'Atividades'
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        # Tabela particionada por mês em created_at (migração 0003)
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='accounts_ua_user_created_idx'),
+        ]
\ No newline at end of file
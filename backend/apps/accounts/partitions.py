@@ -0,0 +1,60 @@
+# backend/apps/accounts/partitions.py
+import datetime
+
+from django.db import connection
+from django.utils import timezone
+
+from .models import UserActivity
+
+# Partições mensais criadas com antecedência; a DEFAULT só recebe o que escapar delas
+ACTIVITY_PARTITIONS_AHEAD = 2
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(day):
+    return (day.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+
+
+def activity_partition_name(day):
+    return f'{UserActivity._meta.db_table}_y{day.year}m{day.month:02d}'
+
+
+def create_activity_partition(cursor, day):
+    """Cria a partição mensal de UserActivity que contém `day`, se não existir"""
+    quote = connection.ops.quote_name
+    start = month_start(day)
+    cursor.execute(
+        f'CREATE TABLE IF NOT EXISTS {quote(activity_partition_name(start))} '
+        f'PARTITION OF {quote(UserActivity._meta.db_table)} '
+        f'FOR VALUES FROM (%s) TO (%s)',
+        [start.isoformat(), next_month(start).isoformat()]
+    )
+
+
+def is_partitioned(cursor, table):
+    cursor.execute(
+        'SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid '
+        'WHERE c.relname = %s',
+        [table]
+    )
+    return cursor.fetchone() is not None
+
+
+def ensure_activity_partitions(months_ahead=ACTIVITY_PARTITIONS_AHEAD):
+    """Garante as partições do mês atual e dos próximos meses"""
+    if connection.vendor != 'postgresql':
+        return 0
+
+    with connection.cursor() as cursor:
+        if not is_partitioned(cursor, UserActivity._meta.db_table):
+            return 0
+
+        day = month_start(timezone.localdate())
+        for _ in range(months_ahead + 1):
+            create_activity_partition(cursor, day)
+            day = next_month(day)
+
+    return months_ahead + 1
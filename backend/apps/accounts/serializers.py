@@ -1,5 +1,7 @@
 # backend/apps/accounts/serializers.py
+from django.db import models
 from rest_framework import serializers
+from .cards import load_user_cards, represent_user_card
 from .models import User, Follow, UserLevel, UserActivity  # Adicione UserActivity aqui
 from django.core import exceptions
 from django.contrib.auth import authenticate
@@ -26,6 +28,24 @@ class UserSerializer(serializers.ModelSerializer):
             'password': {'write_only': True}
         }
 
+class UserCardField(serializers.RelatedField):
+    """Cartão do usuário (id, username, avatar) para contextos aninhados
+
+    Lê só a FK (author_id, user_id...): o usuário não precisa ser carregado.
+    Os cartões vêm de context['user_cards'], preenchido em lote pelos list serializers.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def use_pk_only_optimization(self):
+        return True
+
+    def to_representation(self, value):
+        # Instância completa (ex.: participants pré-carregados) dispensa o cache
+        return represent_user_card(value.pk, self.context, value if isinstance(value, User) else None)
+
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True)
     password2 = serializers.CharField(write_only=True, required=True)
@@ -71,15 +91,37 @@ class ProfileUpdateSerializer(serializers.ModelSerializer):
             'region', 'preferred_tags', 'birth_date'
         ]
 
+class FollowListSerializer(serializers.ListSerializer):
+    """Cartões dos dois lados da lista carregados em lote"""
+
+    def to_representation(self, data):
+        follows = list(data.all() if isinstance(data, models.Manager) else data)
+        load_user_cards(self.context, [
+            user_id for follow in follows for user_id in (follow.follower_id, follow.following_id)
+        ])
+        return super().to_representation(follows)
+
 class FollowSerializer(serializers.ModelSerializer):
-    follower_username = serializers.CharField(source='follower.username', read_only=True)
-    following_username = serializers.CharField(source='following.username', read_only=True)
+    # Nomes pelos cartões (invalidados em User.save), não pelas linhas de Follow
+    follower_username = serializers.SerializerMethodField()
+    following_username = serializers.SerializerMethodField()
     
     class Meta:
         model = Follow
+        list_serializer_class = FollowListSerializer
         fields = ['id', 'follower', 'follower_username', 'following', 'following_username', 'created_at']
         read_only_fields = ['created_at']
 
+    def _username(self, user_id):
+        card = represent_user_card(user_id, self.context)
+        return card['username'] if card else None
+
+    def get_follower_username(self, obj):
+        return self._username(obj.follower_id)
+
+    def get_following_username(self, obj):
+        return self._username(obj.following_id)
+
 class UserActivitySerializer(serializers.ModelSerializer):
     class Meta:
         model = UserActivity
@@ -0,0 +1,17 @@
+# backend/apps/accounts/tasks.py
+from celery import shared_task
+
+from .activity import flush_activities
+from .partitions import ensure_activity_partitions
+
+
+@shared_task
+def flush_activity_queue():
+    """Grava em lote as atividades enfileiradas"""
+    return flush_activities()
+
+
+@shared_task
+def create_activity_partitions():
+    """Cria com antecedência as partições mensais de UserActivity"""
+    return ensure_activity_partitions()
@@ -1,7 +1,16 @@
 import pytest
+from io import StringIO
 from django.contrib.auth import get_user_model
-from django.db import IntegrityError
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from apps.accounts.activity import (
+    ACTIVITY_DEAD_LETTER_KEY, ACTIVITY_PROCESSING_KEY, ACTIVITY_QUEUE_KEY, _push, claim, flush_activities,
+    pending_count, record_activity
+)
+from apps.accounts.counters import user_followers
 from apps.accounts.models import Follow, UserActivity, UserLevel
+from apps.core.counters import flush_all
 
 User = get_user_model()
 
@@ -110,4 +119,118 @@ class TestFollowModel:
         plus_user.refresh_from_db()
         
         assert user_user.following_count == 1
-        assert plus_user.followers_count == 1
\ No newline at end of file
+        assert plus_user.followers_count == 1
+
+@pytest.mark.django_db
+class TestCounters:
+    """Testes para os contadores write-behind e a reconciliação"""
+
+    def test_follow_counts_buffered(self, settings, user_user, plus_user):
+        """Com write-behind os contadores só mudam no flush"""
+        settings.COUNTERS_WRITE_BEHIND = True
+        Follow.objects.create(follower=user_user, following=plus_user)
+
+        plus_user.refresh_from_db()
+        assert plus_user.followers_count == 0
+        assert user_followers.pending([plus_user.id]) == {plus_user.id: 1}
+
+        flush_all()
+        user_user.refresh_from_db()
+        plus_user.refresh_from_db()
+        assert user_user.following_count == 1
+        assert plus_user.followers_count == 1
+
+    def test_reconcile_counters(self, user_user, plus_user):
+        """Reconciliação recalcula os valores a partir da tabela Follow"""
+        Follow.objects.create(follower=user_user, following=plus_user)
+        User.objects.filter(pk=plus_user.pk).update(followers_count=42)
+        User.objects.filter(pk=user_user.pk).update(following_count=7)
+
+        out = StringIO()
+        call_command('reconcile_counters', 'accounts.User.followers_count', 'accounts.User.following_count', stdout=out)
+
+        user_user.refresh_from_db()
+        plus_user.refresh_from_db()
+        assert plus_user.followers_count == 1
+        assert user_user.following_count == 1
+        assert user_user.followers_count == 0
+        assert 'accounts.User.followers_count' in out.getvalue()
+
+
+@pytest.mark.django_db
+class TestActivityPipeline:
+    """Testes para a fila de atividades gravada em lote"""
+
+    def test_activity_buffered_until_flush(self, settings, user_user, django_capture_on_commit_callbacks):
+        """Atividades só chegam ao banco no flush, com o horário do evento"""
+        settings.ACTIVITY_WRITE_BEHIND = True
+
+        with django_capture_on_commit_callbacks(execute=True):
+            for target_id in range(3):
+                record_activity(user_user, 'post', target_id=target_id)
+        assert pending_count() == 3
+        assert not UserActivity.objects.filter(user=user_user).exists()
+
+        before = timezone.now()
+        assert flush_activities(batch_size=2) == 3
+        assert pending_count() == 0
+
+        activities = list(UserActivity.objects.filter(user=user_user).order_by('target_id'))
+        assert [activity.target_id for activity in activities] == [0, 1, 2]
+        assert all(activity.created_at <= before for activity in activities)
+
+    def test_activity_discarded_on_rollback(self, settings, user_user, django_capture_on_commit_callbacks):
+        """Eventos de transações desfeitas não são enfileirados"""
+        settings.ACTIVITY_WRITE_BEHIND = True
+
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    record_activity(user_user, 'follow', target_id=1)
+                    raise IntegrityError
+            except IntegrityError:
+                pass
+
+        assert callbacks == []
+        assert pending_count() == 0
+
+    def test_poison_events_do_not_block_queue(self, settings, user_user, plus_user, django_capture_on_commit_callbacks):
+        """Eventos inválidos, de usuários excluídos ou que falham no insert não travam o lote"""
+        settings.ACTIVITY_WRITE_BEHIND = True
+
+        with django_capture_on_commit_callbacks(execute=True):
+            record_activity(user_user, 'post', target_id=1)
+            record_activity(plus_user, 'post', target_id=2)
+            # jsonb do Postgres não aceita \u0000: o bulk_create do lote falha
+            record_activity(user_user, 'comment', target_id=3, metadata={'text': 'a\x00b'})
+            record_activity(user_user, 'follow', target_id=4)
+        _push(ACTIVITY_QUEUE_KEY, ['não é json'])
+        plus_user.delete()
+
+        assert flush_activities(batch_size=10) == 2
+        assert pending_count() == 0
+        assert pending_count(ACTIVITY_DEAD_LETTER_KEY) == 2
+        assert sorted(UserActivity.objects.values_list('target_id', flat=True)) == [1, 4]
+
+        # A fila segue andando nos próximos flushes
+        with django_capture_on_commit_callbacks(execute=True):
+            record_activity(user_user, 'post', target_id=5)
+        assert flush_activities() == 1
+
+    def test_interrupted_batch_is_recovered(self, settings, user_user, django_capture_on_commit_callbacks):
+        """Lote retirado por um worker que morreu antes do commit volta à fila, na ordem"""
+        settings.ACTIVITY_WRITE_BEHIND = True
+
+        with django_capture_on_commit_callbacks(execute=True):
+            for target_id in range(3):
+                record_activity(user_user, 'post', target_id=target_id)
+
+        # Worker morto entre retirar o lote e gravar
+        assert len(claim(2)) == 2
+        assert pending_count() == 1
+        assert pending_count(ACTIVITY_PROCESSING_KEY) == 2
+
+        assert flush_activities() == 3
+        assert pending_count() == 0
+        assert pending_count(ACTIVITY_PROCESSING_KEY) == 0
+        assert list(UserActivity.objects.order_by('created_at').values_list('target_id', flat=True)) == [0, 1, 2]
@@ -1,7 +1,13 @@
 import pytest
 from rest_framework import status
 from django.urls import reverse
-from apps.accounts.models import Follow, UserLevel
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.accounts.auth import get_cached_user
+from apps.accounts.models import Follow, UserActivity, UserLevel
+from apps.core.queries import QueryRecorder
+
+User = get_user_model()
 
 @pytest.mark.django_db
 class TestAuthViews:
@@ -127,4 +133,100 @@ class TestFollowViews:
         url = reverse('following', args=[user_user.id])
         response = client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 2
\ No newline at end of file
+        assert len(response.data) == 2
+
+@pytest.mark.django_db
+class TestQueryBudget:
+    """Orçamento de queries das listagens de contas"""
+
+    @pytest.mark.parametrize('url_name', ['followers', 'following'])
+    def test_follow_lists_budget(self, auth_client, user_user, url_name, query_budget):
+        """Listas de seguidores não fazem uma query por usuário"""
+        for i in range(8):
+            other = User.objects.create_user(username=f'fan{i}', email=f'fan{i}@test.com', password='testpass123')
+            Follow.objects.create(follower=other, following=user_user)
+            Follow.objects.create(follower=user_user, following=other)
+        client = auth_client(user_user)
+
+        with query_budget(2, max_repeats=1):
+            response = client.get(reverse(url_name, args=[user_user.id]))
+        assert len(response.data) == 8
+
+    def test_activities_budget(self, auth_client, user_user, query_budget):
+        """Histórico de atividades é uma única query"""
+        for i in range(8):
+            UserActivity.objects.create(user=user_user, activity_type='post', target_id=i)
+        client = auth_client(user_user)
+
+        with query_budget(1):
+            response = client.get(reverse('activities'))
+        assert len(response.data['results']) == 8
+
+
+@pytest.mark.django_db
+class TestCachedAuthUser:
+    """Projeção do usuário autenticado em cache"""
+
+    @pytest.fixture
+    def jwt_client(self, api_client):
+        def _jwt_client(user):
+            token = RefreshToken.for_user(user).access_token
+            api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+            return api_client
+        return _jwt_client
+
+    def test_second_request_skips_user_lookup(self, jwt_client, user_user):
+        """Com a projeção em cache, a autenticação não consulta accounts_user"""
+        client = jwt_client(user_user)
+        client.get(reverse('activities'))
+
+        with QueryRecorder() as recorder:
+            response = client.get(reverse('activities'))
+        assert response.status_code == status.HTTP_200_OK, response.data
+        assert not [sql for sql, _ in recorder.queries if 'FROM "accounts_user"' in sql]
+
+    def test_upgrade_invalidates_projection(self, jwt_client, user_user):
+        """Mudança de nível é vista no request seguinte"""
+        client = jwt_client(user_user)
+        client.get(reverse('activities'))
+        assert get_cached_user(user_user.pk).level == UserLevel.USER
+
+        User.objects.get(pk=user_user.pk).upgrade_to(UserLevel.PLUS)
+
+        assert get_cached_user(user_user.pk).level == UserLevel.PLUS
+
+    def test_deactivation_rejects_token(self, jwt_client, user_user):
+        """Desativar a conta invalida a projeção e recusa o token"""
+        client = jwt_client(user_user)
+        assert client.get(reverse('profile')).status_code == status.HTTP_200_OK
+
+        user_user.is_active = False
+        user_user.save()
+
+        assert client.get(reverse('profile')).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+class TestProfileConditionalGet:
+    """ETag/Last-Modified nos perfis"""
+
+    def test_profile_not_modified(self, auth_client, user_user, plus_user):
+        """Perfil inalterado responde 304; novo seguidor muda o ETag"""
+        client = auth_client(user_user)
+        url = reverse('user-profile', args=[plus_user.id])
+        etag = client.get(url)['ETag']
+
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+        Follow.objects.create(follower=user_user, following=plus_user)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['followers_count'] == 1
+
+    def test_own_profile_if_modified_since(self, auth_client, user_user):
+        """If-Modified-Since com a data do Last-Modified responde 304"""
+        client = auth_client(user_user)
+        last_modified = client.get(reverse('profile'))['Last-Modified']
+
+        response = client.get(reverse('profile'), HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
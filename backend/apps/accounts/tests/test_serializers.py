@@ -1,10 +1,13 @@
 import pytest
+from django.urls import reverse
 from rest_framework.exceptions import ValidationError
+from apps.accounts.cards import get_user_cards
 from apps.accounts.serializers import (
     RegisterSerializer, LoginSerializer, 
     ProfileUpdateSerializer, UserSerializer
 )
 from apps.accounts.models import UserLevel
+from apps.posts.models import Post
 
 @pytest.mark.django_db
 class TestRegisterSerializer:
@@ -70,4 +73,34 @@ class TestLoginSerializer:
             'password': 'errada'
         }
         serializer = LoginSerializer(data=data)
-        assert not serializer.is_valid()
\ No newline at end of file
+        assert not serializer.is_valid()
+
+@pytest.mark.django_db
+class TestUserCard:
+    """Cartão compacto do usuário usado em contextos aninhados"""
+
+    def test_card_shape_and_cache(self, user_user, django_assert_num_queries):
+        """Cartão tem só id, username e avatar e fica em cache"""
+        assert get_user_cards([user_user.id])[user_user.id] == {
+            'id': user_user.id, 'username': user_user.username, 'profile_picture': None
+        }
+        with django_assert_num_queries(0):
+            get_user_cards([user_user.id])
+
+    def test_save_invalidates_card(self, user_user):
+        """Mudança no perfil é refletida no cartão"""
+        get_user_cards([user_user.id])
+
+        user_user.username = 'renomeado'
+        user_user.save()
+
+        assert get_user_cards([user_user.id])[user_user.id]['username'] == 'renomeado'
+
+    def test_post_author_is_card(self, auth_client, user_user):
+        """Posts embutem o cartão do autor, não o perfil completo"""
+        Post.objects.create(author=user_user, content='Post')
+        client = auth_client(user_user)
+
+        response = client.get(reverse('post-list'))
+
+        assert set(response.data['results'][0]['author']) == {'id', 'username', 'profile_picture'}
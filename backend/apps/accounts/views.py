@@ -9,12 +9,18 @@ from django.shortcuts import get_object_or_404
 from rest_framework.decorators import action
 from django.utils import timezone
 
+from .activity import record_activity
 from .models import User, Follow, UserActivity, UserLevel
 from .serializers import (
     UserSerializer, RegisterSerializer, LoginSerializer,
     ProfileUpdateSerializer, FollowSerializer, UserActivitySerializer
 )
 from .permissions import IsOwnerOrReadOnly, CanFollow
+from apps.core.conditional import ConditionalGetMixin, make_etag
+from apps.core.pagination import KeysetPagination
+from apps.core.versioned_cache import cached
+from apps.posts.following import invalidate_following_feed
+from apps.posts.timeline import TimelineStore
 
 User = get_user_model()
 
@@ -45,13 +51,26 @@ class LoginView(APIView):
             })
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class ProfileView(generics.RetrieveUpdateAPIView):
+def profile_validators(user_id):
+    """ETag/Last-Modified do perfil: updated_at, atividade e contadores"""
+    row = User.objects.filter(pk=user_id).values_list(
+        'updated_at', 'last_active', 'followers_count', 'following_count', 'posts_count'
+    ).first()
+    if row is None:
+        return None
+    return make_etag(*row), row[0]
+
+class ProfileView(ConditionalGetMixin, generics.RetrieveUpdateAPIView):
     """Visualizar e editar próprio perfil"""
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_object(self):
-        return self.request.user
+        # request.user é a projeção em cache; o perfil completo vem do banco
+        return User.objects.get(pk=self.request.user.pk)
+    
+    def get_validators(self):
+        return profile_validators(self.request.user.pk)
     
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
@@ -63,14 +82,22 @@ class ProfileView(generics.RetrieveUpdateAPIView):
         )
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
+
+        # Região e tags definem a timeline; o feed é reconstruído na próxima leitura
+        if {'region', 'preferred_tags'} & set(serializer.validated_data):
+            TimelineStore().clear(instance.id)
+
         return Response(UserSerializer(instance).data)
 
-class UserProfileView(generics.RetrieveAPIView):
+class UserProfileView(ConditionalGetMixin, generics.RetrieveAPIView):
     """Visualizar perfil de outro usuário"""
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
     lookup_field = 'pk'
+    
+    def get_validators(self):
+        return profile_validators(self.kwargs['pk'])
 
 class FollowView(APIView):
     """Seguir usuário"""
@@ -91,10 +118,12 @@ class FollowView(APIView):
         )
         
         if created:
+            invalidate_following_feed(request.user.id)
+
             # Registrar atividade
-            UserActivity.objects.create(
-                user=request.user,
-                activity_type='follow',
+            record_activity(
+                request.user,
+                'follow',
                 target_id=user_to_follow.id,
                 metadata={'username': user_to_follow.username}
             )
@@ -122,6 +151,7 @@ class UnfollowView(APIView):
                 following=user_to_unfollow
             )
             follow.delete()
+            invalidate_following_feed(request.user.id)
             
             return Response(
                 {'message': f'Você deixou de seguir {user_to_unfollow.username}'},
@@ -133,30 +163,41 @@ class UnfollowView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-class FollowersListView(generics.ListAPIView):
-    """Lista de seguidores"""
+class FollowListView(generics.ListAPIView):
+    """Base das listas de seguidores e seguidos
+
+    Só as linhas de Follow ficam em cache, pela versão follows:<id> (Follow.save/delete);
+    os nomes vêm dos cartões, que User.save invalida.
+    """
     serializer_class = FollowSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = None
-    
+    # Lado da relação em que está o usuário da URL
+    user_field = None
+
     def get_queryset(self):
         user_id = self.kwargs['user_id']
-        return Follow.objects.filter(following_id=user_id)
+        return cached(
+            f'follow_rows:{self.user_field}', [f'follows:{user_id}'], (user_id,),
+            lambda: list(
+                Follow.objects.filter(**{f'{self.user_field}_id': user_id})
+                .only('id', 'follower_id', 'following_id', 'created_at')
+            )
+        )
 
-class FollowingListView(generics.ListAPIView):
+class FollowersListView(FollowListView):
+    """Lista de seguidores"""
+    user_field = 'following'
+
+class FollowingListView(FollowListView):
     """Lista de quem o usuário segue"""
-    serializer_class = FollowSerializer
-    permission_classes = [permissions.IsAuthenticated]
-    pagination_class = None
-    
-    def get_queryset(self):
-        user_id = self.kwargs['user_id']
-        return Follow.objects.filter(follower_id=user_id)
+    user_field = 'follower'
 
 class UserActivityView(generics.ListAPIView):
     """Histórico de atividades do usuário"""
     serializer_class = UserActivitySerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         return UserActivity.objects.filter(user=self.request.user)
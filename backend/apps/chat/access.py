@@ -0,0 +1,44 @@
+# backend/apps/chat/access.py
+from django.core.cache import cache
+
+from apps.accounts.graph import follow_graph
+from .models import ChatParticipant, ChatRoom
+
+ROOM_ACCESS_TTL = 60 * 60
+
+
+def room_access_key(room_id):
+    return f'chat_room_access:{room_id}'
+
+
+def private_chat_allowed(room):
+    """Sala privada só funciona com follow mútuo; resultado positivo memoizado por sala"""
+    if room.room_type != 'private':
+        return True
+
+    key = room_access_key(room.id)
+    if cache.get(key):
+        return True
+
+    members = list(ChatParticipant.objects.filter(room=room).values_list('user_id', flat=True))
+    allowed = len(members) != 2 or follow_graph.mutual(*members)
+    if allowed:
+        cache.set(key, True, ROOM_ACCESS_TTL)
+    return allowed
+
+
+def forget_private_rooms(user_a, user_b):
+    """Invalida o memo das salas privadas entre os dois usuários (unfollow)"""
+    room_ids = ChatRoom.objects.filter(
+        room_type='private', participants=user_a
+    ).filter(participants=user_b).values_list('id', flat=True)
+    cache.delete_many([room_access_key(room_id) for room_id in room_ids])
+
+
+async def aget_member_room(room_id, user_id):
+    """Sala, se o usuário participa dela; None caso contrário
+
+    Uma query pelo ORM assíncrono (índice único room/user de ChatParticipant),
+    a cada conexão: sem cache, a remoção de um participante vale na hora.
+    """
+    return await ChatRoom.objects.filter(pk=room_id, memberships__user_id=user_id).afirst()
@@ -1,127 +1,309 @@
 # backend/apps/chat/consumers.py
-import json
+import time
+
+from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
-from channels.db import database_sync_to_async
-from django.utils import timezone
-from .models import ChatRoom, Message
+from .access import aget_member_room
+from .inbox import inbox_group, notify_read
+from .models import ChatParticipant
+from .presence import PRESENCE_REFRESH, presence
+from .writer import get_message_writer
 from apps.accounts.models import User
+from apps.core.consumers import JSONFramesMixin
+
+
+def room_group(room_id):
+    return f'chat_{room_id}'
+
+
+class RoomEventsMixin:
+    """Ações e eventos de sala comuns ao ChatConsumer (uma sala) e ao InboxConsumer (várias)"""
+
+    def room_frame(self, room_id, frame):
+        """Frame de uma sala como enviado ao cliente"""
+        return frame
+
+    async def enter_room(self, room_id):
+        """Presença: estado atual da sala para quem entra, aviso ao grupo só na primeira conexão"""
+        joined = await sync_to_async(presence.join)(room_id, self.user.id, self.channel_name)
+        self.presence_touched = time.monotonic()
+        snapshot = await sync_to_async(presence.snapshot)(room_id)
+        await self.send_json(self.room_frame(room_id, {'type': 'presence', **snapshot}))
+        if joined:
+            await self.send_presence(room_id, online=True)
+
+    async def exit_room(self, room_id):
+        if await sync_to_async(presence.stop_typing)(room_id, self.user.id):
+            await self.send_typing(room_id, False)
+        if await sync_to_async(presence.leave)(room_id, self.user.id, self.channel_name):
+            await self.send_presence(room_id, online=False)
 
-class ChatConsumer(AsyncWebsocketConsumer):
+    async def touch_rooms(self, room_ids):
+        """Qualquer frame (inclusive 'heartbeat') mantém a conexão online, renovando poucas vezes por TTL"""
+        if time.monotonic() - self.presence_touched < PRESENCE_REFRESH:
+            return
+        for room_id in room_ids:
+            await sync_to_async(presence.touch)(room_id, self.user.id, self.channel_name)
+        self.presence_touched = time.monotonic()
+
+    async def post_message(self, room, text_data_json):
+        content = text_data_json['content']
+
+        # Gravada em lote com as de outras conexões; só segue após o commit
+        try:
+            message = await get_message_writer().write(room, self.user, content)
+        except Exception:
+            await self.send_json(self.room_frame(room.id, {
+                'type': 'error',
+                'client_id': text_data_json.get('client_id'),
+                'error': 'Mensagem não enviada'
+            }))
+            return
+
+        # Confirmação para o remetente, correlacionada pelo client_id opcional
+        await self.send_json(self.room_frame(room.id, {
+            'type': 'ack',
+            'client_id': text_data_json.get('client_id'),
+            'id': message.id,
+            'timestamp': str(message.created_at)
+        }))
+
+        # Enviar a mensagem encerra a digitação
+        if await sync_to_async(presence.stop_typing)(room.id, self.user.id):
+            await self.send_typing(room.id, False)
+
+        # Enviar para o grupo
+        await self.channel_layer.group_send(
+            room_group(room.id),
+            {
+                'type': 'chat_message',
+                'room_id': room.id,
+                'message_id': message.id,
+                'content': content,
+                'sender_id': self.user.id,
+                'sender_username': self.user.username,
+                'sender_avatar': self.user.profile_picture.url if self.user.profile_picture else None,
+                'timestamp': str(message.created_at)
+            }
+        )
+
+    async def set_typing(self, room_id, is_typing):
+        # Estado no Redis; ao grupo só transições e no máximo um "digitando" por intervalo
+        if is_typing:
+            changed = await sync_to_async(presence.start_typing)(room_id, self.user.id)
+        else:
+            changed = await sync_to_async(presence.stop_typing)(room_id, self.user.id)
+        if changed:
+            await self.send_typing(room_id, is_typing)
+
+    async def send_typing(self, room_id, is_typing):
+        await self.channel_layer.group_send(
+            room_group(room_id),
+            {
+                'type': 'typing_indicator',
+                'room_id': room_id,
+                'user_id': self.user.id,
+                'username': self.user.username,
+                'is_typing': is_typing
+            }
+        )
+
+    async def send_presence(self, room_id, online):
+        await self.channel_layer.group_send(
+            room_group(room_id),
+            {
+                'type': 'presence_update',
+                'room_id': room_id,
+                'user_id': self.user.id,
+                'username': self.user.username,
+                'online': online
+            }
+        )
+
+    async def mark_read(self, room_id):
+        await ChatParticipant.amark_read(room_id, self.user)
+        await notify_read(self.user.id, room_id)
+
+    async def chat_message(self, event):
+        """Receber mensagem do grupo e enviar para WebSocket"""
+        await self.send_json(self.room_frame(event['room_id'], {
+            'type': 'message',
+            'id': event['message_id'],
+            'content': event['content'],
+            'sender': {
+                'id': event['sender_id'],
+                'username': event['sender_username'],
+                'avatar': event['sender_avatar']
+            },
+            'timestamp': event['timestamp']
+        }))
+
+    async def typing_indicator(self, event):
+        """Receber indicador de digitação"""
+        await self.send_json(self.room_frame(event['room_id'], {
+            'type': 'typing',
+            'user_id': event['user_id'],
+            'username': event['username'],
+            'is_typing': event['is_typing']
+        }))
+
+    async def presence_update(self, event):
+        """Usuário entrou ou saiu da sala"""
+        await self.send_json(self.room_frame(event['room_id'], {
+            'type': 'presence_update',
+            'user_id': event['user_id'],
+            'username': event['username'],
+            'online': event['online']
+        }))
+
+
+class ChatConsumer(RoomEventsMixin, JSONFramesMixin, AsyncWebsocketConsumer):
     async def connect(self):
         self.room_id = self.scope['url_route']['kwargs']['room_id']
-        self.room_group_name = f'chat_{self.room_id}'
-        
+        self.room_group_name = room_group(self.room_id)
+
         # Verificar autenticação
         user = self.scope['user']
         if not user.is_authenticated or not user.can_chat():
             await self.close()
             return
-        
-        # Verificar se usuário é participante da sala
-        if not await self.is_participant(user, self.room_id):
+
+        # Verificar se usuário é participante da sala; a sala fica na conexão para gravar mensagens
+        self.room = await aget_member_room(self.room_id, user.id)
+        if self.room is None:
             await self.close()
             return
-        
+
         self.user = user
-        
+
         # Entrar no grupo
         await self.channel_layer.group_add(
             self.room_group_name,
             self.channel_name
         )
-        
+
         await self.accept()
-        
+        await self.enter_room(self.room_id)
+
         # Marcar mensagens como lidas
-        await self.mark_messages_as_read()
-    
+        await self.mark_read(self.room_id)
+
     async def disconnect(self, close_code):
+        if hasattr(self, 'user'):
+            await self.exit_room(self.room_id)
+
         await self.channel_layer.group_discard(
             self.room_group_name,
             self.channel_name
         )
-    
+
     async def receive(self, text_data):
-        text_data_json = json.loads(text_data)
+        text_data_json = await self.decode_json(text_data)
         message_type = text_data_json.get('type', 'message')
-        
+
+        await self.touch_rooms([self.room_id])
+
         if message_type == 'message':
-            content = text_data_json['content']
-            
-            # Salvar mensagem no banco
-            message = await self.save_message(content)
-            
-            # Enviar para o grupo
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    'type': 'chat_message',
-                    'message_id': message.id,
-                    'content': content,
-                    'sender_id': self.user.id,
-                    'sender_username': self.user.username,
-                    'sender_avatar': self.user.profile_picture.url if self.user.profile_picture else None,
-                    'timestamp': str(timezone.now())
-                }
-            )
-        
+            await self.post_message(self.room, text_data_json)
+
         elif message_type == 'typing':
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    'type': 'typing_indicator',
-                    'user_id': self.user.id,
-                    'username': self.user.username,
-                    'is_typing': text_data_json['is_typing']
-                }
-            )
-    
-    async def chat_message(self, event):
-        """Receber mensagem do grupo e enviar para WebSocket"""
-        await self.send(text_data=json.dumps({
-            'type': 'message',
-            'id': event['message_id'],
-            'content': event['content'],
-            'sender': {
-                'id': event['sender_id'],
-                'username': event['sender_username'],
-                'avatar': event['sender_avatar']
-            },
-            'timestamp': event['timestamp']
-        }))
-    
-    async def typing_indicator(self, event):
-        """Receber indicador de digitação"""
-        await self.send(text_data=json.dumps({
-            'type': 'typing',
-            'user_id': event['user_id'],
-            'username': event['username'],
-            'is_typing': event['is_typing']
-        }))
-    
-    @database_sync_to_async
-    def is_participant(self, user, room_id):
-        try:
-            room = ChatRoom.objects.get(id=room_id)
-            return user in room.participants.all()
-        except ChatRoom.DoesNotExist:
-            return False
-    
-    @database_sync_to_async
-    def save_message(self, content):
-        room = ChatRoom.objects.get(id=self.room_id)
-        return Message.objects.create(
-            room=room,
-            sender=self.user,
-            content=content
-        )
-    
-    @database_sync_to_async
-    def mark_messages_as_read(self):
-        Message.objects.filter(
-            room_id=self.room_id
-        ).exclude(
-            sender=self.user
-        ).exclude(
-            read_by=self.user
-        ).update(is_read=True)
\ No newline at end of file
+            await self.set_typing(self.room_id, text_data_json['is_typing'])
+
+
+class InboxConsumer(RoomEventsMixin, JSONFramesMixin, AsyncWebsocketConsumer):
+    """Um socket por usuário para todas as conversas
+
+    Na conexão entra só no grupo do usuário (inbox_<id>), que recebe avisos de
+    mensagens novas e de não lidas de todas as salas. Frames 'subscribe' e
+    'unsubscribe' com room_id ligam os eventos completos (mensagens, digitação,
+    presença) das conversas abertas; frames de sala levam o room_id.
+    """
+
+    def room_frame(self, room_id, frame):
+        return {**frame, 'room_id': room_id}
+
+    async def connect(self):
+        user = self.scope['user']
+        if not user.is_authenticated or not user.can_chat():
+            await self.close()
+            return
+
+        self.user = user
+        self.rooms = {}
+        self.presence_touched = time.monotonic()
+        await self.channel_layer.group_add(inbox_group(user.id), self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        if not hasattr(self, 'user'):
+            return
+        for room_id in list(self.rooms):
+            await self.unsubscribe(room_id)
+        await self.channel_layer.group_discard(inbox_group(self.user.id), self.channel_name)
+
+    async def receive(self, text_data):
+        text_data_json = await self.decode_json(text_data)
+        message_type = text_data_json.get('type')
+        room_id = text_data_json.get('room_id')
+
+        await self.touch_rooms(list(self.rooms))
+
+        if message_type == 'subscribe':
+            await self.subscribe(room_id)
+        elif message_type == 'unsubscribe':
+            if room_id in self.rooms:
+                await self.unsubscribe(room_id)
+        elif message_type in ('message', 'mark_read'):
+            # Permitido em qualquer sala do usuário, assinada ou não
+            room = self.rooms.get(room_id) or await self.member_room(room_id)
+            if room is None:
+                await self.send_room_error(room_id, text_data_json)
+            elif message_type == 'message':
+                await self.post_message(room, text_data_json)
+            else:
+                await self.mark_read(room.id)
+        elif message_type == 'typing':
+            if room_id in self.rooms:
+                await self.set_typing(room_id, text_data_json['is_typing'])
+
+    async def member_room(self, room_id):
+        if not isinstance(room_id, int):
+            return None
+        return await aget_member_room(room_id, self.user.id)
+
+    async def send_room_error(self, room_id, text_data_json):
+        await self.send_json({
+            'type': 'error',
+            'room_id': room_id,
+            'client_id': text_data_json.get('client_id'),
+            'error': 'Sala não encontrada'
+        })
+
+    async def subscribe(self, room_id):
+        if room_id in self.rooms:
+            return
+        room = await self.member_room(room_id)
+        if room is None:
+            await self.send_room_error(room_id, {})
+            return
+
+        self.rooms[room_id] = room
+        await self.channel_layer.group_add(room_group(room_id), self.channel_name)
+        await self.enter_room(room_id)
+
+    async def unsubscribe(self, room_id):
+        del self.rooms[room_id]
+        await self.exit_room(room_id)
+        await self.channel_layer.group_discard(room_group(room_id), self.channel_name)
+
+    async def inbox_messages(self, event):
+        """Mensagens novas em qualquer sala; as assinadas já recebem o evento completo"""
+        for item in event['messages']:
+            if item['room_id'] not in self.rooms:
+                await self.send_json({'type': 'inbox_message', **item})
+        for room_id, increment in event['unread']:
+            await self.send_json({'type': 'unread', 'room_id': room_id, 'increment': increment})
+
+    async def inbox_read(self, event):
+        """Sala lida em algum socket do usuário"""
+        await self.send_json({'type': 'unread', 'room_id': event['room_id'], 'unread_count': 0})
@@ -0,0 +1,44 @@
+# backend/apps/chat/fastpath.py
+from apps.accounts.cards import represent_user_card
+from apps.core.fastpath import format_datetime
+
+
+def message_is_read(message, read_cursors):
+    """Lida por algum outro participante; read_cursors: {user_id: last_read_message_id}"""
+    if read_cursors is None:
+        return message.is_read
+    return any(
+        cursor is not None and cursor >= message.id
+        for user_id, cursor in read_cursors.items()
+        if user_id != message.sender_id
+    )
+
+
+def render_attachments(message):
+    return [
+        {
+            'id': att.id,
+            'filename': att.filename,
+            'file_type': att.file_type,
+            'file_size': att.file_size,
+            'url': att.file.url
+        }
+        for att in message.attachments.all()
+    ]
+
+
+def render_messages(messages, context):
+    """Saída de MessageSerializer(many=True) para mensagens com cartões já carregados"""
+    read_cursors = context.get('read_cursors')
+    return [
+        {
+            'id': message.id,
+            'room': message.room_id,
+            'sender': represent_user_card(message.sender_id, context),
+            'content': message.content,
+            'is_read': message_is_read(message, read_cursors),
+            'attachments': render_attachments(message),
+            'created_at': format_datetime(message.created_at),
+        }
+        for message in messages
+    ]
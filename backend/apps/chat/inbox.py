@@ -0,0 +1,52 @@
+# backend/apps/chat/inbox.py
+from collections import Counter, defaultdict
+
+from channels.layers import get_channel_layer
+
+# Prévia da mensagem nos eventos de caixa de entrada, como ChatRoom.last_message_content
+PREVIEW_LENGTH = 100
+
+
+def inbox_group(user_id):
+    """Grupo do channel layer com todos os sockets de caixa de entrada do usuário"""
+    return f'inbox_{user_id}'
+
+
+async def notify_new_messages(messages, members):
+    """Avisa as caixas de entrada dos participantes: um group_send por usuário e lote
+
+    `members` é {room_id: [user_id]}. As não lidas vão como incremento por sala,
+    em pares [room_id, n] (msgpack do channels_redis não aceita chaves inteiras).
+    """
+    layer = get_channel_layer()
+    if layer is None:
+        return
+
+    events = defaultdict(list)
+    unread = defaultdict(Counter)
+    for message in messages:
+        item = {
+            'room_id': message.room_id,
+            'id': message.id,
+            'sender_id': message.sender_id,
+            'content': message.content[:PREVIEW_LENGTH],
+            'timestamp': str(message.created_at),
+        }
+        for user_id in members.get(message.room_id, ()):
+            events[user_id].append(item)
+            if user_id != message.sender_id:
+                unread[user_id][message.room_id] += 1
+
+    for user_id, items in events.items():
+        await layer.group_send(inbox_group(user_id), {
+            'type': 'inbox_messages',
+            'messages': items,
+            'unread': [[room_id, total] for room_id, total in unread[user_id].items()],
+        })
+
+
+async def notify_read(user_id, room_id):
+    """Zera as não lidas da sala em todos os sockets do usuário"""
+    layer = get_channel_layer()
+    if layer is not None:
+        await layer.group_send(inbox_group(user_id), {'type': 'inbox_read', 'room_id': room_id})
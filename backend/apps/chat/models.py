@@ -1,5 +1,7 @@
 # backend/apps/chat/models.py
-from django.db import models
+from collections import Counter
+
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
@@ -18,6 +20,7 @@ class ChatRoom(models.Model):
     )
     participants = models.ManyToManyField(
         User,
+        through='ChatParticipant',
         related_name='chat_rooms',
         verbose_name='Participantes'
     )
@@ -32,6 +35,18 @@ class ChatRoom(models.Model):
         null=True,
         related_name='created_rooms'
     )
+    
+    # Última mensagem (desnormalizada para a listagem de salas)
+    last_message_content = models.CharField(max_length=100, blank=True)
+    last_message_sender = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -44,6 +59,76 @@ class ChatRoom(models.Model):
         if self.room_type == 'private':
             return f"Sala privada {self.id}"
         return self.name or f"Grupo {self.id}"
+    
+    def register_message(self, message):
+        """Atualiza última mensagem e contadores de não lidas dos demais participantes"""
+        self.register_messages([message])
+
+    def register_messages(self, messages):
+        """register_message para um lote da sala, em ordem, com duas queries"""
+        last = messages[-1]
+        ChatRoom.objects.filter(pk=self.pk).update(
+            last_message_content=last.content[:100],
+            last_message_sender_id=last.sender_id,
+            last_message_at=last.created_at,
+            updated_at=timezone.now()
+        )
+
+        # Cada participante recebe as mensagens do lote que não enviou
+        sent = Counter(message.sender_id for message in messages)
+        increment = models.Case(
+            *[models.When(user_id=sender_id, then=len(messages) - total) for sender_id, total in sent.items()],
+            default=len(messages),
+            output_field=models.PositiveIntegerField()
+        )
+        ChatParticipant.objects.filter(room_id=self.pk).exclude(
+            user_id__in=[sender_id for sender_id, total in sent.items() if total == len(messages)]
+        ).update(unread_count=models.F('unread_count') + increment)
+
+class ChatParticipant(models.Model):
+    """Participação do usuário na sala"""
+    room = models.ForeignKey(
+        ChatRoom,
+        on_delete=models.CASCADE,
+        related_name='memberships'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='chat_memberships'
+    )
+    unread_count = models.PositiveIntegerField(default=0, verbose_name='Não lidas')
+    # Cursor de leitura: tudo até esta mensagem foi lido pelo participante
+    last_read_message = models.ForeignKey(
+        'Message',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    joined_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['room', 'user']
+        verbose_name = 'Participante'
+        verbose_name_plural = 'Participantes'
+    
+    @classmethod
+    def mark_read(cls, room_id, user):
+        """Avança o cursor até a última mensagem da sala em um único UPDATE"""
+        return cls.objects.filter(room_id=room_id, user=user).update(**cls._read_cursor())
+
+    @classmethod
+    async def amark_read(cls, room_id, user):
+        """mark_read pelo ORM assíncrono (consumer)"""
+        return await cls.objects.filter(room_id=room_id, user=user).aupdate(**cls._read_cursor())
+
+    @staticmethod
+    def _read_cursor():
+        latest = Message.objects.filter(
+            room_id=models.OuterRef('room_id')
+        ).order_by('-id').values('id')[:1]
+        return {'last_read_message_id': models.Subquery(latest), 'unread_count': 0}
 
 class Message(models.Model):
     room = models.ForeignKey(
@@ -66,11 +151,6 @@ class Message(models.Model):
         default=False,
         verbose_name='Lida'
     )
-    read_by = models.ManyToManyField(
-        User,
-        related_name='read_messages',
-        blank=True
-    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -80,10 +160,20 @@ class Message(models.Model):
         verbose_name_plural = 'Mensagens'
         indexes = [
             models.Index(fields=['room', '-created_at']),
+            # Não lidas: id > cursor de leitura dentro da sala
+            models.Index(fields=['room', 'id']),
         ]
     
     def __str__(self):
         return f"Mensagem de {self.sender.username} - {self.created_at.strftime('%H:%M')}"
+    
+    def save(self, *args, **kwargs):
+        is_new = self.pk is None
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new:
+                self.room.register_message(self)
 
 class MessageAttachment(models.Model):
     """Anexos em mensagens"""
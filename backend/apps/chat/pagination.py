@@ -0,0 +1,7 @@
+# backend/apps/chat/pagination.py
+from apps.core.pagination import KeysetPagination
+
+
+class MessagePagination(KeysetPagination):
+    """Histórico da sala em ordem cronológica"""
+    ordering = ('created_at', 'id')
@@ -0,0 +1,160 @@
+# backend/apps/chat/presence.py
+import threading
+import time
+
+from django.core.cache import cache
+
+from apps.core.cache import get_redis_client
+
+# Conexão sem frames por PRESENCE_TTL some da sala; o consumer renova a cada PRESENCE_REFRESH
+PRESENCE_TTL = 60
+PRESENCE_REFRESH = 20
+# Digitação expira sozinha; "começou a digitar" vai ao grupo no máximo uma vez por intervalo
+TYPING_TTL = 6
+TYPING_BROADCAST_INTERVAL = 3
+
+_local_lock = threading.Lock()
+
+
+class RoomPresence:
+    """Usuários online e digitando por sala, efêmeros no Redis (locmem nos testes)
+
+    Cada estado é um sorted set membro -> expiração; leituras descartam os
+    expirados, então conexões que caíram sem disconnect somem sozinhas.
+    Nada passa pelo banco.
+    """
+
+    @property
+    def redis(self):
+        return get_redis_client()
+
+    def _online_key(self, room_id):
+        return f'presence:{room_id}'
+
+    def _typing_key(self, room_id):
+        return f'typing:{room_id}'
+
+    def _gate_key(self, room_id, user_id):
+        return f'typing_gate:{room_id}:{user_id}'
+
+    def _add(self, key, member, ttl):
+        redis = self.redis
+        if redis is not None:
+            key = cache.make_key(key)
+            pipe = redis.pipeline(transaction=False)
+            pipe.zadd(key, {member: time.time() + ttl})
+            pipe.expire(key, ttl)
+            pipe.execute()
+            return
+
+        with _local_lock:
+            members = cache.get(key) or {}
+            members[member] = time.time() + ttl
+            cache.set(key, members, ttl)
+
+    def _remove(self, key, member):
+        """Remove o membro; True se ele estava presente"""
+        redis = self.redis
+        if redis is not None:
+            return bool(redis.zrem(cache.make_key(key), member))
+
+        with _local_lock:
+            members = cache.get(key) or {}
+            removed = members.pop(member, None) is not None
+            cache.set(key, members, max(PRESENCE_TTL, TYPING_TTL))
+            return removed
+
+    def _live(self, key):
+        """Membros ainda não expirados"""
+        now = time.time()
+        redis = self.redis
+        if redis is not None:
+            key = cache.make_key(key)
+            pipe = redis.pipeline(transaction=False)
+            pipe.zremrangebyscore(key, '-inf', now)
+            pipe.zrange(key, 0, -1)
+            _, members = pipe.execute()
+            return [member.decode() if isinstance(member, bytes) else str(member) for member in members]
+
+        members = cache.get(key) or {}
+        return [str(member) for member, expires in members.items() if expires > now]
+
+    def _connection(self, user_id, channel_name):
+        return f'{user_id}:{channel_name}'
+
+    def _update_connection(self, room_id, member, add):
+        """Adiciona ou remove a conexão e devolve as conexões vivas da sala, num passo atômico
+
+        No Redis é um MULTI/EXEC: duas conexões do mesmo usuário abrindo ou fechando
+        ao mesmo tempo veem estados sucessivos, então só uma delas anuncia a transição.
+        """
+        now = time.time()
+        key = self._online_key(room_id)
+        redis = self.redis
+        if redis is not None:
+            key = cache.make_key(key)
+            pipe = redis.pipeline(transaction=True)
+            pipe.zremrangebyscore(key, '-inf', now)
+            if add:
+                pipe.zadd(key, {member: now + PRESENCE_TTL})
+                pipe.expire(key, PRESENCE_TTL)
+            else:
+                pipe.zrem(key, member)
+            pipe.zrange(key, 0, -1)
+            members = pipe.execute()[-1]
+            return [value.decode() if isinstance(value, bytes) else str(value) for value in members]
+
+        with _local_lock:
+            members = {
+                value: expires for value, expires in (cache.get(key) or {}).items() if expires > now
+            }
+            if add:
+                members[member] = now + PRESENCE_TTL
+            else:
+                members.pop(member, None)
+            cache.set(key, members, PRESENCE_TTL)
+            return list(members)
+
+    def _user_connections(self, members, user_id):
+        prefix = f'{user_id}:'
+        return sum(1 for member in members if member.startswith(prefix))
+
+    def online(self, room_id):
+        """Ids dos usuários com ao menos uma conexão viva na sala"""
+        return {int(member.split(':', 1)[0]) for member in self._live(self._online_key(room_id))}
+
+    def touch(self, room_id, user_id, channel_name):
+        self._add(self._online_key(room_id), self._connection(user_id, channel_name), PRESENCE_TTL)
+
+    def join(self, room_id, user_id, channel_name):
+        """Registra a conexão; True se o usuário acabou de ficar online na sala"""
+        members = self._update_connection(room_id, self._connection(user_id, channel_name), add=True)
+        return self._user_connections(members, user_id) == 1
+
+    def leave(self, room_id, user_id, channel_name):
+        """Remove a conexão; True se era a última do usuário na sala"""
+        members = self._update_connection(room_id, self._connection(user_id, channel_name), add=False)
+        return self._user_connections(members, user_id) == 0
+
+    def typing(self, room_id):
+        return {int(member) for member in self._live(self._typing_key(room_id))}
+
+    def start_typing(self, room_id, user_id):
+        """Renova o estado; True quando o evento deve ir ao grupo (fora do intervalo de coalescência)"""
+        self._add(self._typing_key(room_id), str(user_id), TYPING_TTL)
+        return cache.add(self._gate_key(room_id, user_id), 1, TYPING_BROADCAST_INTERVAL)
+
+    def stop_typing(self, room_id, user_id):
+        """Limpa o estado; True se o usuário estava digitando (o grupo precisa saber)"""
+        cache.delete(self._gate_key(room_id, user_id))
+        return self._remove(self._typing_key(room_id), str(user_id))
+
+    def snapshot(self, room_id):
+        """Estado enviado ao conectar"""
+        return {
+            'online': sorted(self.online(room_id)),
+            'typing': sorted(self.typing(room_id)),
+        }
+
+
+presence = RoomPresence()
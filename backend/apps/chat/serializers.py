@@ -1,10 +1,14 @@
 # backend/apps/chat/serializers.py
+from django.db import models
 from rest_framework import serializers
-from .models import ChatRoom, Message, MessageAttachment
-from apps.accounts.serializers import UserSerializer
+from .fastpath import message_is_read, render_attachments, render_messages
+from .models import ChatRoom, ChatParticipant, Message, MessageAttachment
+from apps.accounts.cards import load_user_cards
+from apps.accounts.serializers import UserCardField
+from apps.core.fastpath import fast_serializers_enabled
 
 class ChatRoomSerializer(serializers.ModelSerializer):
-    participants = UserSerializer(many=True, read_only=True)
+    participants = UserCardField(many=True)
     last_message = serializers.SerializerMethodField()
     unread_count = serializers.SerializerMethodField()
     
@@ -17,44 +21,53 @@ class ChatRoomSerializer(serializers.ModelSerializer):
         ]
     
     def get_last_message(self, obj):
-        last_msg = obj.messages.order_by('-created_at').first()
-        if last_msg:
-            return {
-                'content': last_msg.content[:100],
-                'sender': last_msg.sender.username,
-                'created_at': last_msg.created_at
-            }
-        return None
+        if obj.last_message_at is None:
+            return None
+        return {
+            'content': obj.last_message_content,
+            'sender': obj.last_message_sender.username if obj.last_message_sender else None,
+            'created_at': obj.last_message_at
+        }
     
     def get_unread_count(self, obj):
+        if hasattr(obj, 'viewer_unread_count'):
+            return obj.viewer_unread_count or 0
+        
         user = self.context.get('request').user
-        return obj.messages.filter(
-            read_by=user
-        ).exclude(sender=user).count()
+        return ChatParticipant.objects.filter(
+            room=obj,
+            user=user
+        ).values_list('unread_count', flat=True).first() or 0
+
+class MessageListSerializer(serializers.ListSerializer):
+    """Carrega os cartões dos remetentes da página em uma ida ao cache"""
+    
+    def to_representation(self, data):
+        messages = list(data.all() if isinstance(data, models.Manager) else data)
+        load_user_cards(self.context, [message.sender_id for message in messages])
+        if fast_serializers_enabled() and type(self.child) is MessageSerializer:
+            return render_messages(messages, self.context)
+        return super().to_representation(messages)
 
 class MessageSerializer(serializers.ModelSerializer):
-    sender = UserSerializer(read_only=True)
+    sender = UserCardField()
+    is_read = serializers.SerializerMethodField()
     attachments = serializers.SerializerMethodField()
     
     class Meta:
         model = Message
+        list_serializer_class = MessageListSerializer
         fields = [
             'id', 'room', 'sender', 'content',
             'is_read', 'attachments', 'created_at'
         ]
         read_only_fields = ['is_read', 'created_at']
     
+    def get_is_read(self, obj):
+        return message_is_read(obj, self.context.get('read_cursors'))
+    
     def get_attachments(self, obj):
-        return [
-            {
-                'id': att.id,
-                'filename': att.filename,
-                'file_type': att.file_type,
-                'file_size': att.file_size,
-                'url': att.file.url
-            }
-            for att in obj.attachments.all()
-        ]
+        return render_attachments(obj)
 
 class MessageCreateSerializer(serializers.ModelSerializer):
     class Meta:
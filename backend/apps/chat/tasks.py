@@ -0,0 +1,23 @@
+# backend/apps/chat/tasks.py
+from asgiref.sync import async_to_sync
+from celery import shared_task
+
+from .inbox import notify_new_messages, notify_read
+from .models import ChatParticipant, Message
+
+
+@shared_task
+def notify_inbox(message_id):
+    """Avisa as caixas de entrada dos participantes de uma mensagem enviada pela API"""
+    message = Message.objects.filter(pk=message_id).first()
+    if message is None:
+        return 0
+    members = list(ChatParticipant.objects.filter(room_id=message.room_id).values_list('user_id', flat=True))
+    async_to_sync(notify_new_messages)([message], {message.room_id: members})
+    return len(members)
+
+
+@shared_task
+def notify_inbox_read(user_id, room_id):
+    """Zera as não lidas da sala nos sockets do usuário após o mark_read da API"""
+    async_to_sync(notify_read)(user_id, room_id)
@@ -0,0 +1,55 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.chat.access import aget_member_room
+from apps.chat.models import ChatParticipant, ChatRoom, Message
+
+
+@pytest.mark.django_db(transaction=True)
+class TestMemberRoom:
+    """Autorização do websocket pelo ORM assíncrono"""
+
+    def member_room(self, room_id, user_id):
+        with CaptureQueriesContext(connection) as queries:
+            room = async_to_sync(aget_member_room)(room_id, user_id)
+        return room, len(queries)
+
+    def test_one_query_per_connection(self, user_user, plus_user):
+        """Sala e participação verificadas numa única query"""
+        room = ChatRoom.objects.create(room_type='group', name='Grupo')
+        room.participants.add(user_user, plus_user)
+
+        assert self.member_room(room.id, user_user.id) == (room, 1)
+        assert self.member_room(room.id, plus_user.id) == (room, 1)
+
+    def test_non_member(self, user_user, plus_user, pro_user):
+        room = ChatRoom.objects.create(room_type='group', name='Grupo')
+        room.participants.add(user_user, plus_user)
+
+        assert self.member_room(room.id, pro_user.id) == (None, 1)
+        assert self.member_room(room.id + 1000, user_user.id)[0] is None
+
+    def test_amark_read(self, user_user, plus_user):
+        """Cursor de leitura avançado pelo aupdate"""
+        room = ChatRoom.objects.create(room_type='group', name='Grupo')
+        room.participants.add(user_user, plus_user)
+        Message.objects.create(room=room, sender=plus_user, content='Oi')
+        last = Message.objects.create(room=room, sender=plus_user, content='Tudo bem?')
+
+        assert async_to_sync(ChatParticipant.amark_read)(room.id, user_user) == 1
+        participant = ChatParticipant.objects.get(room=room, user=user_user)
+        assert (participant.last_read_message_id, participant.unread_count) == (last.id, 0)
+
+    def test_removed_participant_denied_immediately(self, user_user, plus_user):
+        """Remoção do participante ou da sala, por qualquer caminho, vale na próxima conexão"""
+        room = ChatRoom.objects.create(room_type='group', name='Grupo')
+        room.participants.add(user_user, plus_user)
+        assert self.member_room(room.id, plus_user.id)[0] == room
+
+        ChatParticipant.objects.filter(room=room, user=plus_user).delete()
+        assert self.member_room(room.id, plus_user.id)[0] is None
+
+        ChatRoom.objects.filter(pk=room.pk).delete()
+        assert self.member_room(room.id, user_user.id)[0] is None
@@ -1,5 +1,5 @@
 import pytest
-from apps.chat.models import ChatRoom, Message, UserTyping
+from apps.chat.models import ChatRoom, ChatParticipant, Message, UserTyping
 from apps.accounts.models import UserLevel
 
 @pytest.mark.django_db
@@ -44,4 +44,19 @@ class TestChatModels:
         )
         
         assert typing.is_typing is True
-        assert typing.user == user_user
\ No newline at end of file
+        assert typing.user == user_user
+
+    def test_message_updates_room_summary(self, user_user, plus_user, pro_user):
+        """Nova mensagem atualiza a última mensagem e as não lidas dos outros"""
+        room = ChatRoom.objects.create(room_type='group')
+        room.participants.add(user_user, plus_user, pro_user)
+        
+        Message.objects.create(room=room, sender=user_user, content="Primeira")
+        Message.objects.create(room=room, sender=plus_user, content="Segunda")
+        
+        room.refresh_from_db()
+        assert room.last_message_content == "Segunda"
+        assert room.last_message_sender == plus_user
+        
+        unread = dict(ChatParticipant.objects.filter(room=room).values_list('user_id', 'unread_count'))
+        assert unread == {user_user.id: 1, plus_user.id: 1, pro_user.id: 2}
@@ -1,7 +1,9 @@
 import pytest
 from rest_framework import status
 from django.urls import reverse
-from apps.chat.models import ChatRoom, Message
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from apps.chat.models import ChatRoom, ChatParticipant, Message
 from apps.accounts.models import Follow
 
 @pytest.mark.django_db
@@ -99,7 +101,7 @@ class TestChatViews:
         response = client.get(url)
         
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 2
+        assert len(response.data['results']) == 2
     
     def test_unread_messages(self, auth_client, user_user, plus_user):
         """Testa mensagens não lidas"""
@@ -122,4 +124,126 @@ class TestChatViews:
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data) == 1
         assert response.data[0]['content'] == 'Mensagem não lida'
-        assert response.data[0]['sender']['username'] == plus_user.username
\ No newline at end of file
+        assert response.data[0]['sender']['username'] == plus_user.username
+
+    def test_room_list_uses_denormalized_summary(self, auth_client, user_user, plus_user):
+        """Lista de salas traz última mensagem e não lidas sem carregar o histórico"""
+        Follow.objects.create(follower=user_user, following=plus_user)
+        Follow.objects.create(follower=plus_user, following=user_user)
+        room = ChatRoom.objects.create(room_type='private')
+        room.participants.add(user_user, plus_user)
+
+        client = auth_client(plus_user)
+        for i in range(3):
+            client.post(reverse('chat-room-send-message', args=[room.id]), {'content': f'Oi {i}'})
+
+        client = auth_client(user_user)
+        url = reverse('chat-room-list')
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.data['results'][0]
+        assert data['last_message']['content'] == 'Oi 2'
+        assert data['last_message']['sender'] == plus_user.username
+        assert data['unread_count'] == 3
+        assert not any('chat_message' in q['sql'] for q in ctx.captured_queries)
+
+    def test_mutual_follow_is_memoized_per_room(self, auth_client, user_user, plus_user):
+        """Depois da primeira mensagem a permissão não consulta Follow nem participantes"""
+        Follow.objects.create(follower=user_user, following=plus_user)
+        Follow.objects.create(follower=plus_user, following=user_user)
+        room = ChatRoom.objects.create(room_type='private')
+        room.participants.add(user_user, plus_user)
+        client = auth_client(user_user)
+        url = reverse('chat-room-send-message', args=[room.id])
+
+        assert client.post(url, {'content': 'Primeira'}).status_code == status.HTTP_201_CREATED
+        with CaptureQueriesContext(connection) as ctx:
+            assert client.post(url, {'content': 'Segunda'}).status_code == status.HTTP_201_CREATED
+
+        selects = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT')]
+        assert not any('accounts_follow' in sql for sql in selects)
+        assert not any('_prefetch_related_val' in sql for sql in selects)
+        assert not any(sql.startswith('SELECT "chat_chatparticipant"') for sql in selects)
+
+    def test_unfollow_revokes_memoized_access(self, auth_client, user_user, plus_user):
+        """Deixar de seguir invalida o memo da sala"""
+        Follow.objects.create(follower=user_user, following=plus_user)
+        follow = Follow.objects.create(follower=plus_user, following=user_user)
+        room = ChatRoom.objects.create(room_type='private')
+        room.participants.add(user_user, plus_user)
+        client = auth_client(user_user)
+        url = reverse('chat-room-send-message', args=[room.id])
+        assert client.post(url, {'content': 'Oi'}).status_code == status.HTTP_201_CREATED
+
+        follow.delete()
+
+        assert client.post(url, {'content': 'Oi?'}).status_code == status.HTTP_403_FORBIDDEN
+        create_url = reverse('chat-room-create-private')
+        assert client.post(create_url, {'user_id': plus_user.id}).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_room_list_budget(self, auth_client, user_user, plus_user, query_budget):
+        """Lista de salas tem custo constante em queries"""
+        for _ in range(6):
+            room = ChatRoom.objects.create(room_type='group', name='Grupo')
+            room.participants.add(user_user, plus_user)
+        client = auth_client(user_user)
+
+        with query_budget(3, max_repeats=1):
+            response = client.get(reverse('chat-room-list'))
+        assert len(response.data['results']) == 6
+
+    def test_mark_read_notifies_after_commit(self, auth_client, user_user, plus_user, monkeypatch,
+                                             django_capture_on_commit_callbacks):
+        """Aviso às caixas de entrada fica para depois do commit; a resposta não depende do channel layer"""
+        room = ChatRoom.objects.create(room_type='group')
+        room.participants.add(user_user, plus_user)
+        calls = []
+        monkeypatch.setattr('apps.chat.tasks.notify_inbox_read.delay', lambda *args: calls.append(args))
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            response = auth_client(user_user).post(reverse('chat-room-mark-read', args=[room.id]))
+        assert response.status_code == status.HTTP_200_OK
+        assert calls == []
+
+        for callback in callbacks:
+            callback()
+        assert calls == [(user_user.id, room.id)]
+
+    def test_mark_read_moves_cursor(self, auth_client, user_user, plus_user, pro_user):
+        """Marcar como lida avança o cursor e zera as não lidas"""
+        room = ChatRoom.objects.create(room_type='group')
+        room.participants.add(user_user, plus_user, pro_user)
+        other_room = ChatRoom.objects.create(room_type='group')
+        other_room.participants.add(user_user, pro_user)
+
+        first = Message.objects.create(room=room, sender=plus_user, content="Antiga")
+        client = auth_client(user_user)
+        response = client.post(reverse('chat-room-mark-read', args=[room.id]))
+        assert response.status_code == status.HTTP_200_OK
+
+        membership = ChatParticipant.objects.get(room=room, user=user_user)
+        assert membership.last_read_message_id == first.id
+        assert membership.unread_count == 0
+
+        Message.objects.create(room=room, sender=pro_user, content="Nova")
+        Message.objects.create(room=room, sender=user_user, content="Minha")
+        Message.objects.create(room=other_room, sender=pro_user, content="Outra sala")
+
+        response = client.get(reverse('unread-messages'))
+        contents = sorted(m['content'] for m in response.data['results'])
+        assert contents == ["Nova", "Outra sala"]
+
+    def test_read_receipts_from_cursor(self, auth_client, user_user, plus_user):
+        """is_read reflete o cursor de leitura do outro participante"""
+        room = ChatRoom.objects.create(room_type='private')
+        room.participants.add(user_user, plus_user)
+        read = Message.objects.create(room=room, sender=user_user, content="Lida")
+        ChatParticipant.mark_read(room.id, plus_user)
+        Message.objects.create(room=room, sender=user_user, content="Pendente")
+
+        client = auth_client(user_user)
+        response = client.get(reverse('chat-room-messages', args=[room.id]))
+        assert [m['is_read'] for m in response.data['results']] == [True, False]
+        assert response.data['results'][0]['id'] == read.id
@@ -0,0 +1,194 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from channels.layers import get_channel_layer
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.chat.consumers import ChatConsumer, InboxConsumer
+from apps.chat.inbox import inbox_group
+from apps.chat.models import ChatParticipant, ChatRoom, Message
+from apps.chat.tasks import notify_inbox
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.websocket
+class TestChatConsumer:
+    """Consumers de chat de ponta a ponta, com o channel layer em memória"""
+
+    async def open(self, consumer, path, user, **kwargs):
+        # channels.testing depende do daphne; o ApplicationCommunicator do asgiref basta aqui
+        communicator = ApplicationCommunicator(consumer.as_asgi(), {
+            'type': 'websocket',
+            'path': path,
+            'user': user,
+            'url_route': {'kwargs': kwargs},
+        })
+        await communicator.send_input({'type': 'websocket.connect'})
+        assert (await communicator.receive_output())['type'] == 'websocket.accept'
+        return communicator
+
+    async def connect(self, room, user):
+        return await self.open(ChatConsumer, f'/ws/chat/{room.id}/', user, room_id=room.id)
+
+    async def send(self, communicator, data):
+        await communicator.send_input({'type': 'websocket.receive', 'text': json.dumps(data)})
+
+    async def receive(self, communicator):
+        return json.loads((await communicator.receive_output())['text'])
+
+    async def disconnect(self, communicator):
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait()
+
+    def test_presence_and_typing(self, plus_user, pro_user):
+        """Estado enviado ao conectar e eventos de digitação sem repetição"""
+        room = ChatRoom.objects.create(room_type='group', name='Grupo')
+        room.participants.add(plus_user, pro_user)
+
+        queries = CaptureQueriesContext(connection)
+        count_queries = sync_to_async(lambda: len(queries))
+
+        async def scenario():
+            first = await self.connect(room, plus_user)
+            assert await self.receive(first) == {'type': 'presence', 'online': [plus_user.id], 'typing': []}
+
+            second = await self.connect(room, pro_user)
+            snapshot = await self.receive(second)
+            assert snapshot['online'] == sorted([plus_user.id, pro_user.id])
+            # O grupo, inclusive a própria conexão, recebe cada entrada
+            joins = [await self.receive(first) for _ in range(2)]
+            assert [event['user_id'] for event in joins] == [plus_user.id, pro_user.id]
+
+            # Rajada de frames de digitação: sem banco e um único evento no grupo
+            before = await count_queries()
+            for _ in range(5):
+                await self.send(second, {'type': 'typing', 'is_typing': True})
+            await self.send(second, {'type': 'typing', 'is_typing': False})
+            events = [await self.receive(first) for _ in range(2)]
+            assert await count_queries() == before
+            assert [event['is_typing'] for event in events] == [True, False]
+            assert await first.receive_nothing()
+
+            await self.disconnect(second)
+            assert await self.receive(first) == {
+                'type': 'presence_update', 'user_id': pro_user.id, 'username': pro_user.username, 'online': False
+            }
+            await self.disconnect(first)
+
+        with queries:
+            async_to_sync(scenario)()
+
+    def test_messages_are_acknowledged_in_order(self, plus_user, pro_user):
+        """Mensagens gravadas em lote, com ack ao remetente e broadcast na ordem de envio"""
+        room = ChatRoom.objects.create(room_type='group', name='Grupo')
+        room.participants.add(plus_user, pro_user)
+
+        async def scenario():
+            sender = await self.connect(room, plus_user)
+            await sender.receive_output()
+            await sender.receive_output()
+
+            for i in range(3):
+                await self.send(sender, {'type': 'message', 'content': f'M{i}', 'client_id': f'c{i}'})
+            frames = [await self.receive(sender) for _ in range(6)]
+            await self.disconnect(sender)
+            return frames
+
+        frames = async_to_sync(scenario)()
+        acks = [frame for frame in frames if frame['type'] == 'ack']
+        broadcast = [frame for frame in frames if frame['type'] == 'message']
+
+        saved = list(Message.objects.filter(room=room).order_by('id').values_list('id', 'content'))
+        assert [content for _, content in saved] == ['M0', 'M1', 'M2']
+        assert [(ack['client_id'], ack['id']) for ack in acks] == [('c0', saved[0][0]), ('c1', saved[1][0]), ('c2', saved[2][0])]
+        assert [frame['id'] for frame in broadcast] == [message_id for message_id, _ in saved]
+
+        room.refresh_from_db()
+        assert room.last_message_content == 'M2'
+        assert ChatParticipant.objects.get(room=room, user=pro_user).unread_count == 3
+
+    def test_inbox_multiplexes_rooms(self, plus_user, pro_user):
+        """Um socket: avisos de todas as salas, eventos completos só das assinadas"""
+        watched = ChatRoom.objects.create(room_type='group', name='Aberta')
+        other = ChatRoom.objects.create(room_type='group', name='Outra')
+        for room in (watched, other):
+            room.participants.add(plus_user, pro_user)
+
+        queries = CaptureQueriesContext(connection)
+        count_queries = sync_to_async(lambda: len(queries))
+
+        def by_type(frames):
+            return sorted(frames, key=lambda frame: frame['type'])
+
+        async def scenario():
+            before = await count_queries()
+            inbox = await self.open(InboxConsumer, '/ws/inbox/', plus_user)
+            # Conectar não consulta salas nem marca leitura
+            assert await count_queries() == before
+
+            await self.send(inbox, {'type': 'subscribe', 'room_id': watched.id})
+            snapshot, joined = [await self.receive(inbox) for _ in range(2)]
+            assert snapshot == {'type': 'presence', 'room_id': watched.id, 'online': [plus_user.id], 'typing': []}
+            assert (joined['type'], joined['room_id']) == ('presence_update', watched.id)
+
+            # Sala não assinada: só o aviso de caixa de entrada e o incremento de não lidas
+            elsewhere = await self.connect(other, pro_user)
+            await self.send(elsewhere, {'type': 'message', 'content': 'Na outra'})
+            notice, unread = [await self.receive(inbox) for _ in range(2)]
+            assert (notice['type'], notice['room_id'], notice['content']) == ('inbox_message', other.id, 'Na outra')
+            assert unread == {'type': 'unread', 'room_id': other.id, 'increment': 1}
+
+            # Sala assinada: mensagem completa, sem aviso duplicado
+            here = await self.connect(watched, pro_user)
+            await self.send(here, {'type': 'message', 'content': 'Na aberta'})
+            frames = by_type([await self.receive(inbox) for _ in range(3)])
+            assert [frame['type'] for frame in frames] == ['message', 'presence_update', 'unread']
+            assert (frames[0]['room_id'], frames[0]['content']) == (watched.id, 'Na aberta')
+            assert frames[2] == {'type': 'unread', 'room_id': watched.id, 'increment': 1}
+
+            # Leitura e envio em sala não assinada pelo mesmo socket
+            await self.send(inbox, {'type': 'mark_read', 'room_id': other.id})
+            assert await self.receive(inbox) == {'type': 'unread', 'room_id': other.id, 'unread_count': 0}
+
+            await self.send(inbox, {'type': 'message', 'room_id': other.id, 'content': 'Resposta', 'client_id': 'r1'})
+            ack, notice = by_type([await self.receive(inbox) for _ in range(2)])
+            assert (ack['type'], ack['room_id'], ack['client_id']) == ('ack', other.id, 'r1')
+            assert (notice['type'], notice['id']) == ('inbox_message', ack['id'])
+
+            # Sala de que o usuário não participa
+            await self.send(inbox, {'type': 'subscribe', 'room_id': other.id + 1000})
+            assert (await self.receive(inbox))['type'] == 'error'
+
+            for communicator in (elsewhere, here, inbox):
+                await self.disconnect(communicator)
+
+        with queries:
+            async_to_sync(scenario)()
+
+        assert ChatParticipant.objects.get(room=other, user=plus_user).unread_count == 0
+        assert ChatParticipant.objects.get(room=other, user=pro_user).unread_count == 1
+
+
+@pytest.mark.django_db(transaction=True)
+class TestInboxNotifications:
+    """Mensagens enviadas pela API também chegam às caixas de entrada"""
+
+    def test_notify_inbox_task(self, plus_user, pro_user):
+        room = ChatRoom.objects.create(room_type='group', name='Grupo')
+        room.participants.add(plus_user, pro_user)
+        message = Message.objects.create(room=room, sender=pro_user, content='Pela API')
+        layer = get_channel_layer()
+
+        async def scenario():
+            channel = await layer.new_channel()
+            await layer.group_add(inbox_group(plus_user.id), channel)
+            assert await sync_to_async(notify_inbox)(message.id) == 2
+            return await layer.receive(channel)
+
+        event = async_to_sync(scenario)()
+        assert event['type'] == 'inbox_messages'
+        assert [item['id'] for item in event['messages']] == [message.id]
+        assert event['unread'] == [[room.id, 1]]
@@ -0,0 +1,68 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.core.cache import caches
+
+from apps.chat import presence as presence_module
+from apps.chat.presence import presence
+
+
+@pytest.mark.django_db
+class TestRoomPresence:
+    """Presença e digitação efêmeras, com expiração"""
+
+    def test_online_per_connection(self):
+        """Usuário fica online até fechar a última conexão"""
+        assert presence.join(1, 10, 'canal-a') is True
+        assert presence.join(1, 10, 'canal-b') is False
+        assert presence.online(1) == {10}
+
+        assert presence.leave(1, 10, 'canal-a') is False
+        assert presence.leave(1, 10, 'canal-b') is True
+        assert presence.online(1) == set()
+
+    def test_concurrent_connections_announce_once(self, monkeypatch):
+        """Conexões do mesmo usuário abrindo ou fechando juntas: uma única transição"""
+        channels = [f'canal-{n}' for n in range(8)]
+        # Leitura lenta força as threads a se intercalarem entre ler e gravar
+        # (na classe: cada thread tem sua instância do backend)
+        backend = type(caches['default'])
+        get = backend.get
+        monkeypatch.setattr(backend, 'get', lambda self, *args: time.sleep(0.01) or get(self, *args))
+        barrier = threading.Barrier(len(channels))
+
+        def at_once(method):
+            def run(channel):
+                barrier.wait()
+                return method(1, 10, channel)
+            with ThreadPoolExecutor(len(channels)) as pool:
+                return list(pool.map(run, channels))
+
+        assert at_once(presence.join).count(True) == 1
+        assert presence.online(1) == {10}
+        assert at_once(presence.leave).count(True) == 1
+        assert presence.online(1) == set()
+
+    def test_connection_expires(self, monkeypatch):
+        """Conexão que caiu sem disconnect some após o TTL"""
+        presence.join(1, 10, 'canal-a')
+        monkeypatch.setattr(presence_module.time, 'time', lambda: 10 ** 11)
+        assert presence.online(1) == set()
+
+    def test_typing_is_coalesced(self):
+        """Só o primeiro "digitando" do intervalo vai ao grupo; parar só se estava digitando"""
+        assert presence.start_typing(1, 10) is True
+        assert presence.start_typing(1, 10) is False
+        assert presence.typing(1) == {10}
+
+        assert presence.stop_typing(1, 10) is True
+        assert presence.stop_typing(1, 10) is False
+        assert presence.start_typing(1, 10) is True
+
+    def test_snapshot(self):
+        presence.join(1, 10, 'canal-a')
+        presence.join(1, 11, 'canal-b')
+        presence.start_typing(1, 11)
+        assert presence.snapshot(1) == {'online': [10, 11], 'typing': [11]}
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.chat import writer as writer_module
+from apps.chat.models import ChatParticipant, ChatRoom, Message
+from apps.chat.writer import MessageWriter
+
+
+@pytest.mark.django_db(transaction=True)
+class TestMessageWriter:
+    """Mensagens concorrentes gravadas em lote, em ordem de chegada"""
+
+    def room_with(self, *users):
+        room = ChatRoom.objects.create(room_type='group', name='Grupo')
+        room.participants.add(*users)
+        return room
+
+    def test_batches_concurrent_writes(self, user_user, plus_user, pro_user):
+        """Um único INSERT para as mensagens da janela, resumo e não lidas como no save()"""
+        room = self.room_with(user_user, plus_user, pro_user)
+        writer = MessageWriter()
+
+        async def scenario():
+            return await asyncio.gather(
+                writer.write(room, plus_user, 'Primeira'),
+                writer.write(room, pro_user, 'Segunda'),
+                writer.write(room, plus_user, 'Terceira'),
+            )
+
+        with CaptureQueriesContext(connection) as queries:
+            messages = async_to_sync(scenario)()
+
+        inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT')]
+        assert len(inserts) == 1
+        assert [m.id for m in messages] == sorted(m.id for m in messages)
+        assert [m.content for m in Message.objects.filter(room=room).order_by('id')] == ['Primeira', 'Segunda', 'Terceira']
+
+        room.refresh_from_db()
+        assert room.last_message_content == 'Terceira'
+        assert room.last_message_sender_id == plus_user.id
+        unread = dict(ChatParticipant.objects.filter(room=room).values_list('user_id', 'unread_count'))
+        assert unread == {user_user.id: 3, plus_user.id: 1, pro_user.id: 2}
+
+    def test_batch_size(self, plus_user, pro_user):
+        """Lotes maiores que batch_size são divididos, mantendo a ordem"""
+        room = self.room_with(plus_user, pro_user)
+        writer = MessageWriter(batch_size=2)
+
+        async def scenario():
+            return await asyncio.gather(*[writer.write(room, plus_user, f'M{i}') for i in range(5)])
+
+        messages = async_to_sync(scenario)()
+        assert [m.content for m in Message.objects.filter(room=room).order_by('id')] == [f'M{i}' for i in range(5)]
+        assert [m.id for m in messages] == sorted(m.id for m in messages)
+        assert ChatParticipant.objects.get(room=room, user=pro_user).unread_count == 5
+
+    def test_failure_reaches_senders(self, plus_user, pro_user, monkeypatch):
+        """Lote que falha não é confirmado; o writer segue atendendo"""
+        room = self.room_with(plus_user, pro_user)
+        writer = MessageWriter()
+        persist = writer_module.persist_messages
+
+        def failing(messages):
+            raise RuntimeError('banco indisponível')
+
+        async def scenario():
+            monkeypatch.setattr(writer_module, 'persist_messages', failing)
+            with pytest.raises(RuntimeError):
+                await writer.write(room, plus_user, 'Perdida')
+            monkeypatch.setattr(writer_module, 'persist_messages', persist)
+            return await writer.write(room, plus_user, 'Gravada')
+
+        assert async_to_sync(scenario)().content == 'Gravada'
+        assert list(Message.objects.filter(room=room).values_list('content', flat=True)) == ['Gravada']
+
+    def test_invalid_message_fails_alone(self, plus_user, pro_user):
+        """Mensagem inválida no lote: só o seu remetente recebe o erro"""
+        room = self.room_with(plus_user, pro_user)
+        writer = MessageWriter()
+
+        async def scenario():
+            return await asyncio.gather(
+                writer.write(room, plus_user, 'Válida'),
+                # psycopg2 recusa NUL em strings: o bulk_create do lote falha
+                writer.write(room, pro_user, 'Inválida\x00'),
+                return_exceptions=True
+            )
+
+        valid, invalid = async_to_sync(scenario)()
+        assert isinstance(invalid, ValueError)
+        assert valid.content == 'Válida' and valid.id is not None
+        assert list(Message.objects.filter(room=room).values_list('content', flat=True)) == ['Válida']
+        assert ChatParticipant.objects.get(room=room, user=pro_user).unread_count == 1
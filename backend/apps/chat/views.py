@@ -2,11 +2,18 @@
 from rest_framework import generics, permissions, status, viewsets
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from django.db import transaction
 from django.shortcuts import get_object_or_404
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
-from .models import ChatRoom, Message
+from .access import private_chat_allowed
+from .models import ChatRoom, ChatParticipant, Message
+from .pagination import MessagePagination
 from .serializers import ChatRoomSerializer, MessageSerializer, MessageCreateSerializer
-from apps.accounts.models import User, Follow
+from .tasks import notify_inbox, notify_inbox_read
+from apps.accounts.graph import follow_graph
+from apps.accounts.models import User
 from apps.accounts.permissions import CanChat
 
 
@@ -16,15 +23,21 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated, CanChat]
 
     def get_queryset(self):
-        return ChatRoom.objects.filter(
+        # Última mensagem e não lidas vêm desnormalizadas; o histórico não é carregado
+        queryset = ChatRoom.objects.filter(
             participants=self.request.user
-        ).prefetch_related('participants', 'messages')
-
-    def _users_follow_each_other(self, user_a, user_b):
-        return (
-            Follow.objects.filter(follower=user_a, following=user_b).exists()
-            and Follow.objects.filter(follower=user_b, following=user_a).exists()
+        ).select_related('last_message_sender').annotate(
+            viewer_unread_count=Subquery(
+                ChatParticipant.objects.filter(
+                    room=OuterRef('pk'),
+                    user=self.request.user
+                ).values('unread_count')[:1]
+            )
         )
+        # Participantes só são serializados na listagem e no detalhe da sala
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.prefetch_related('participants')
+        return queryset
 
     @action(detail=False, methods=['post'])
     def create_private(self, request):
@@ -35,7 +48,7 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
         if request.user.id == other_user.id:
             return Response({'error': 'Não é possível abrir chat consigo mesmo'}, status=status.HTTP_400_BAD_REQUEST)
 
-        if not self._users_follow_each_other(request.user, other_user):
+        if not follow_graph.mutual(request.user.id, other_user.id):
             return Response(
                 {'error': 'Somente usuários que se seguem mutuamente podem conversar'},
                 status=status.HTTP_403_FORBIDDEN
@@ -61,39 +74,44 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def messages(self, request, pk=None):
         room = self.get_object()
-        messages = room.messages.all().order_by('created_at')
 
-        page = self.paginate_queryset(messages)
-        if page is not None:
-            serializer = MessageSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        # Cursor em (created_at, id) sobre o índice (room, -created_at)
+        paginator = MessagePagination()
+        page = paginator.paginate_queryset(room.messages.prefetch_related('attachments'), request, view=self)
+        read_cursors = dict(room.memberships.values_list('user_id', 'last_read_message_id'))
+        serializer = MessageSerializer(page, many=True, context={'read_cursors': read_cursors})
+        return paginator.get_paginated_response(serializer.data)
 
-        serializer = MessageSerializer(messages, many=True)
-        return Response(serializer.data)
+    @action(detail=True, methods=['post'])
+    def mark_read(self, request, pk=None):
+        """Marcar todas as mensagens da sala como lidas"""
+        room = self.get_object()
+        ChatParticipant.mark_read(room.id, request.user)
+        # Aviso fora da requisição, como em send_message: falha do channel layer não vira 500
+        transaction.on_commit(lambda: notify_inbox_read.delay(request.user.id, room.id))
+        return Response({'message': 'Mensagens marcadas como lidas'})
 
     @action(detail=True, methods=['post'])
     def send_message(self, request, pk=None):
         room = self.get_object()
         serializer = MessageCreateSerializer(data=request.data)
 
-        if room.room_type == 'private':
-            participants = list(room.participants.all())
-            if len(participants) == 2:
-                other_user = participants[0] if participants[1].id == request.user.id else participants[1]
-                if not self._users_follow_each_other(request.user, other_user):
-                    return Response(
-                        {'error': 'Chat bloqueado: os usuários precisam se seguir mutuamente'},
-                        status=status.HTTP_403_FORBIDDEN
-                    )
+        if not private_chat_allowed(room):
+            return Response(
+                {'error': 'Chat bloqueado: os usuários precisam se seguir mutuamente'},
+                status=status.HTTP_403_FORBIDDEN
+            )
 
         if serializer.is_valid():
+            # Message.save atualiza a última mensagem e as não lidas na mesma transação
             message = Message.objects.create(
                 room=room,
                 sender=request.user,
                 content=serializer.validated_data['content']
             )
 
-            room.save()
+            # Avisa as caixas de entrada (sockets /ws/inbox/) fora da requisição
+            transaction.on_commit(lambda: notify_inbox.delay(message.id))
 
             return Response(MessageSerializer(message).data, status=status.HTTP_201_CREATED)
 
@@ -106,10 +124,10 @@ class UnreadMessagesView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated, CanChat]
 
     def get_queryset(self):
+        # Faixa id > cursor de leitura em cada sala do usuário (índice room, id)
         return Message.objects.filter(
-            room__participants=self.request.user
+            room__memberships__user=self.request.user,
+            id__gt=Coalesce(F('room__memberships__last_read_message_id'), 0)
         ).exclude(
             sender=self.request.user
-        ).exclude(
-            read_by=self.request.user
-        ).select_related('sender', 'room')
+        ).select_related('room').prefetch_related('attachments')
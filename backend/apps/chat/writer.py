@@ -0,0 +1,134 @@
+# backend/apps/chat/writer.py
+"""Gravação em lote das mensagens recebidas pelo websocket
+
+As mensagens que chegam dentro de MESSAGE_BATCH_WINDOW são gravadas juntas:
+um bulk_create e o resumo de cada sala numa única transação, ocupando uma
+thread do pool por lote, não por mensagem.
+
+Garantias:
+- Ordem: lotes são gravados um de cada vez, na ordem de chegada ao processo;
+  os ids seguem essa ordem, então mensagens de uma mesma conexão nunca se invertem.
+  Entre processos diferentes a ordem é só a dos ids.
+- Durabilidade: write() só retorna depois do commit; ack e broadcast vêm depois
+  disso. Uma mensagem sem ack (processo caiu na janela, erro na gravação) não
+  foi gravada e pode ser reenviada pelo cliente.
+- Isolamento: se o lote falha, as mensagens são regravadas uma a uma e só as que
+  falham de novo recebem o erro.
+
+Após o commit, as caixas de entrada dos participantes são avisadas (ver inbox).
+"""
+import asyncio
+import logging
+import weakref
+from collections import defaultdict
+
+from channels.db import database_sync_to_async
+from django.db import transaction
+
+from .inbox import notify_new_messages
+from .models import ChatParticipant, Message
+
+MESSAGE_BATCH_WINDOW = 0.005
+MESSAGE_BATCH_SIZE = 100
+
+_writers = weakref.WeakKeyDictionary()
+
+logger = logging.getLogger(__name__)
+
+
+def persist_messages(messages):
+    """Grava o lote e atualiza o resumo de cada sala (Message.save não roda no bulk_create)
+
+    Retorna {room_id: [user_id]} dos participantes, para os avisos de caixa de entrada.
+    """
+    with transaction.atomic():
+        Message.objects.bulk_create(messages)
+
+        by_room = defaultdict(list)
+        for message in messages:
+            by_room[message.room].append(message)
+        for room, room_messages in by_room.items():
+            room.register_messages(room_messages)
+
+        members = defaultdict(list)
+        for room_id, user_id in ChatParticipant.objects.filter(
+            room_id__in=[room.pk for room in by_room]
+        ).values_list('room_id', 'user_id'):
+            members[room_id].append(user_id)
+    return members
+
+
+class MessageWriter:
+    """Buffer de mensagens do processo, esvaziado por uma única tarefa de cada vez"""
+
+    def __init__(self, window=MESSAGE_BATCH_WINDOW, batch_size=MESSAGE_BATCH_SIZE):
+        self.window = window
+        self.batch_size = batch_size
+        self.pending = []
+        self.task = None
+
+    async def write(self, room, sender, content):
+        """Mensagem gravada (com id e created_at), após o commit do lote"""
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((Message(room=room, sender=sender, content=content), future))
+        if self.task is None:
+            self.task = asyncio.create_task(self.drain())
+        return await future
+
+    async def drain(self):
+        try:
+            await asyncio.sleep(self.window)
+            while self.pending:
+                batch = self.pending[:self.batch_size]
+                del self.pending[:self.batch_size]
+                messages = [message for message, _ in batch]
+                try:
+                    members = await database_sync_to_async(persist_messages)(messages)
+                except Exception as exc:
+                    if len(batch) == 1:
+                        self.resolve(batch, exc)
+                        continue
+                    # Uma mensagem inválida (ou sala excluída) não derruba as dos outros remetentes
+                    logger.warning('Falha no lote de mensagens; gravando uma a uma', exc_info=True)
+                    messages, members = await self.persist_one_by_one(batch)
+                else:
+                    self.resolve(batch)
+                try:
+                    await notify_new_messages(messages, members)
+                except Exception:
+                    # Mensagens já gravadas e confirmadas; o aviso é só uma conveniência
+                    logger.exception('Falha ao avisar caixas de entrada')
+        finally:
+            self.task = None
+
+    async def persist_one_by_one(self, batch):
+        """Fallback do lote: cada mensagem na sua transação, o erro só para o seu remetente"""
+        saved, members = [], {}
+        for message, future in batch:
+            try:
+                members.update(await database_sync_to_async(persist_messages)([message]))
+            except Exception as exc:
+                self.resolve([(message, future)], exc)
+            else:
+                self.resolve([(message, future)])
+                saved.append(message)
+        return saved, members
+
+    @staticmethod
+    def resolve(batch, exc=None):
+        for message, future in batch:
+            if future.done():
+                continue
+            if exc is None:
+                future.set_result(message)
+            else:
+                future.set_exception(exc)
+
+
+def get_message_writer():
+    """Writer do event loop atual (um por processo no servidor ASGI)"""
+    loop = asyncio.get_running_loop()
+    writer = _writers.get(loop)
+    if writer is None:
+        writer = _writers[loop] = MessageWriter()
+    return writer
@@ -0,0 +1,11 @@
+# backend/apps/core/cache.py
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+
+
+def get_redis_client(alias='default'):
+    """Retorna o cliente Redis do cache configurado, ou None para outros backends"""
+    backend = caches[alias]
+    if isinstance(backend, RedisCache):
+        return backend._cache.get_client(write=True)
+    return None
@@ -0,0 +1,54 @@
+# backend/apps/core/conditional.py
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    """Hash dos valores que determinam a representação"""
+    return hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+class ConditionalGetMixin:
+    """GET condicional (ETag/Last-Modified) para retrieve e list
+
+    get_validators() roda uma consulta barata (só timestamps e contadores);
+    se o cliente já tem a versão atual, responde 304 sem carregar nem serializar.
+    Contadores não mexem em updated_at: Last-Modified cobre o conteúdo,
+    o ETag cobre também os contadores e prevalece quando o cliente envia os dois.
+    """
+
+    def get_validators(self):
+        """(etag, last_modified) do recurso, ou None para responder sem condicional"""
+        return None
+
+    def conditional(self, handler, request, *args, **kwargs):
+        try:
+            validators = self.get_validators()
+        except (TypeError, ValueError, ValidationError):
+            # Lookup inválido: get_object responde 404 como sempre
+            validators = None
+        if validators is None:
+            return handler(request, *args, **kwargs)
+
+        etag, last_modified = validators
+        etag = quote_etag(etag)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
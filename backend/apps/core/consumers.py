@@ -0,0 +1,20 @@
+# backend/apps/core/consumers.py
+from . import jsonlib
+
+
+class JSONFramesMixin:
+    """encode_json/decode_json/send_json de AsyncJsonWebsocketConsumer via jsonlib
+
+    Para consumers que tratam frames de texto à mão (AsyncWebsocketConsumer).
+    """
+
+    @classmethod
+    async def decode_json(cls, text_data):
+        return jsonlib.loads(text_data)
+
+    @classmethod
+    async def encode_json(cls, content):
+        return jsonlib.dumps(content).decode()
+
+    async def send_json(self, content, close=False):
+        await self.send(text_data=await self.encode_json(content), close=close)
@@ -0,0 +1,166 @@
+# backend/apps/core/counters.py
+import threading
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .cache import get_redis_client
+
+FLUSH_BATCH_SIZE = 500
+RECONCILE_BATCH_SIZE = 1000
+
+_local_lock = threading.Lock()
+_registry = []
+
+
+def apply_deltas(model, field, deltas, batch_size=FLUSH_BATCH_SIZE):
+    """Aplica {pk: delta} ao campo com UPDATE ... FROM (VALUES ...) em lotes"""
+    items = [(int(pk), int(delta)) for pk, delta in deltas.items() if int(delta)]
+    if not items:
+        return 0
+
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    column = quote(model._meta.get_field(field).column)
+    pk_column = quote(model._meta.pk.column)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            values = ', '.join(['(%s, %s)'] * len(batch))
+            cursor.execute(
+                f'UPDATE {table} AS t '
+                f'SET {column} = GREATEST(t.{column} + v.delta, 0) '
+                f'FROM (VALUES {values}) AS v(id, delta) '
+                f'WHERE t.{pk_column} = v.id',
+                [value for row in batch for value in row]
+            )
+
+    return len(items)
+
+
+class BufferedCounter:
+    """Contador write-behind: incrementos no Redis (locmem nos testes), flush em lote no banco
+
+    `source` é ('app_label.Model', 'campo_fk') e permite recalcular o valor exato
+    a partir da tabela de origem (ver reconcile).
+    """
+
+    def __init__(self, model, field, source=None):
+        self.model = model
+        self.field = field
+        self.source = source
+        self.key = f'counter:{model._meta.label_lower}.{field}'
+        _registry.append(self)
+
+    def __str__(self):
+        return f'{self.model._meta.label}.{self.field}'
+
+    @property
+    def redis(self):
+        return get_redis_client()
+
+    def incr(self, pk, delta=1):
+        """Acumula o delta e retorna quanto o valor lido do banco ainda não reflete"""
+        if not settings.COUNTERS_WRITE_BEHIND:
+            apply_deltas(self.model, self.field, {pk: delta})
+            return delta
+
+        redis = self.redis
+        if redis is not None:
+            return redis.hincrby(cache.make_key(self.key), pk, delta)
+
+        with _local_lock:
+            buffer = cache.get(self.key) or {}
+            buffer[pk] = buffer.get(pk, 0) + delta
+            cache.set(self.key, buffer, None)
+            return buffer[pk]
+
+    def pending(self, pks):
+        """Deltas ainda não gravados no banco para os objetos informados"""
+        pks = list(pks)
+        if not pks:
+            return {}
+
+        redis = self.redis
+        if redis is not None:
+            values = redis.hmget(cache.make_key(self.key), pks)
+            return {pk: int(value or 0) for pk, value in zip(pks, values)}
+
+        buffer = cache.get(self.key) or {}
+        return {pk: buffer.get(pk, 0) for pk in pks}
+
+    def drain(self):
+        """Retira atomicamente todos os deltas acumulados"""
+        redis = self.redis
+        if redis is not None:
+            key = cache.make_key(self.key)
+            flushing = f'{key}:flushing:{uuid.uuid4().hex}'
+            pipe = redis.pipeline(transaction=True)
+            pipe.rename(key, flushing)
+            pipe.hgetall(flushing)
+            pipe.delete(flushing)
+            # RENAME falha quando não há nada acumulado; o HGETALL devolve vazio
+            _, rows, _ = pipe.execute(raise_on_error=False)
+            if isinstance(rows, Exception):
+                return {}
+            return {int(pk): int(delta) for pk, delta in rows.items()}
+
+        with _local_lock:
+            buffer = cache.get(self.key) or {}
+            cache.delete(self.key)
+            return buffer
+
+    def flush(self, batch_size=FLUSH_BATCH_SIZE):
+        """Grava os deltas acumulados; em caso de erro eles voltam para o buffer"""
+        deltas = self.drain()
+        try:
+            return apply_deltas(self.model, self.field, deltas, batch_size)
+        except Exception:
+            for pk, delta in deltas.items():
+                self.incr(pk, delta)
+            raise
+
+    def reconcile(self, batch_size=RECONCILE_BATCH_SIZE):
+        """Recalcula o contador a partir da tabela de origem, em faixas de pk"""
+        if self.source is None:
+            return 0
+
+        # Deltas pendentes seriam somados em cima do valor exato
+        self.flush()
+
+        label, fk = self.source
+        source = apps.get_model(label)
+        exact = Coalesce(
+            Subquery(
+                source.objects.filter(**{fk: OuterRef('pk')})
+                .order_by().values(fk).annotate(total=Count('pk')).values('total'),
+                output_field=IntegerField()
+            ),
+            0
+        )
+
+        updated = 0
+        pks = self.model.objects.order_by('pk').values_list('pk', flat=True)
+        last_pk = None
+        while True:
+            batch = pks.filter(pk__gt=last_pk) if last_pk is not None else pks
+            batch = list(batch[:batch_size])
+            if not batch:
+                return updated
+            updated += self.model.objects.filter(pk__in=batch).update(**{self.field: exact})
+            last_pk = batch[-1]
+
+
+def registered_counters():
+    return list(_registry)
+
+
+def flush_all():
+    """Grava os deltas de todos os contadores registrados"""
+    return sum(counter.flush() for counter in _registry)
@@ -0,0 +1,56 @@
+# backend/apps/core/fastpath.py
+"""Helpers das listagens rápidas: mesma saída dos campos do DRF, sem a maquinaria dos serializers
+
+Os renderizadores de cada app (fastpath.py) montam dicts direto dos atributos
+das linhas já carregadas; a ordem das chaves segue Meta.fields do serializer.
+"""
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601
+from rest_framework.settings import api_settings
+
+
+def fast_serializers_enabled():
+    return getattr(settings, 'FAST_SERIALIZERS', True)
+
+
+def format_datetime(value):
+    """Equivalente a serializers.DateTimeField().to_representation"""
+    if not value:
+        return None
+
+    output_format = api_settings.DATETIME_FORMAT
+    if output_format is None or isinstance(value, str):
+        return value
+
+    if settings.USE_TZ:
+        current = timezone.get_current_timezone()
+        value = value.astimezone(current) if timezone.is_aware(value) else timezone.make_aware(value, current)
+    elif timezone.is_aware(value):
+        value = timezone.make_naive(value, datetime.timezone.utc)
+
+    if output_format.lower() == ISO_8601:
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return value.strftime(output_format)
+
+
+def file_url(value, request=None, storage=None):
+    """Equivalente a serializers.FileField().to_representation
+
+    Aceita o FieldFile da instância ou o nome do arquivo vindo de .values().
+    """
+    if not value:
+        return None
+
+    if not api_settings.UPLOADED_FILES_USE_URL:
+        return value if isinstance(value, str) else value.name
+
+    url = storage.url(value) if isinstance(value, str) else value.url
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
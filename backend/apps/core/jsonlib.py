@@ -0,0 +1,56 @@
+# backend/apps/core/jsonlib.py
+"""JSON rápido (orjson) com a mesma saída do JSONRenderer do DRF
+
+Sem orjson instalado, ou para o que ele não representa (inteiros acima de
+64 bits, aninhamento muito profundo), cai no json da stdlib com o encoder do DRF.
+Floats só diferem quando a stdlib usa expoente (1e+16, 1e-07); nesses casos a
+saída também vem da stdlib.
+"""
+import json
+import re
+
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# Datas passam pelo encoder do DRF (sufixo Z, isoformat) em vez do formato do orjson
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+_encoder = JSONEncoder()
+
+# Número em notação científica ou abaixo de 1e-4 na saída do orjson: o repr() da
+# stdlib escreveria com expoente. Pode casar dentro de strings, o que só custa o fallback.
+_STDLIB_FLOAT = re.compile(rb'(?:^|[:,\[])-?(?:\d+(?:\.\d+)?[eE]|0\.0000)')
+
+
+def _escape_separators(data):
+    # Como o DRF: \u2028 e \u2029 sempre escapados (JSON subconjunto estrito de JavaScript)
+    if b'\xe2\x80' in data:
+        data = data.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+    return data
+
+
+def dumps(obj):
+    """bytes UTF-8 compactos, idênticos a JSONRenderer().render(obj)"""
+    if orjson is not None:
+        try:
+            data = orjson.dumps(obj, default=_encoder.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # A stdlib serializa o que o orjson recusa, ou levanta o mesmo TypeError
+            pass
+        else:
+            if not _STDLIB_FLOAT.search(data):
+                return _escape_separators(data)
+    return _escape_separators(json.dumps(
+        obj, cls=JSONEncoder, ensure_ascii=False, allow_nan=False, separators=(',', ':')
+    ).encode())
+
+
+def loads(data):
+    """Aceita str ou bytes; erros de sintaxe levantam ValueError"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
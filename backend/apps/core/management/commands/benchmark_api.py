@@ -0,0 +1,159 @@
+# backend/apps/core/management/commands/benchmark_api.py
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.accounts.models import UserLevel
+from apps.chat.models import ChatParticipant
+from apps.core.queries import QueryRecorder
+from apps.posts.models import Post
+
+from .seed_social_graph import BENCH_PREFIX
+
+User = get_user_model()
+
+# Endpoints medidos; cada um recebe (usuário, post quente) e devolve (método, url, dados)
+ENDPOINTS = {
+    'timeline': lambda user, post: ('get', reverse('timeline'), None),
+    'post-list': lambda user, post: ('get', reverse('post-list'), None),
+    'comment-list': lambda user, post: ('get', reverse('post-comments-list', args=[post.pk]), None),
+    'chat-room-list': lambda user, post: ('get', reverse('chat-room-list'), None),
+    'reaction-toggle': lambda user, post: (
+        'post', reverse('post-reactions-toggle', args=[post.pk]), {'reaction_type': 'like'}
+    ),
+}
+
+
+def percentile(samples, pct):
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100, method='inclusive')[pct - 1]
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Mede latência (p50/p95/p99), queries e throughput dos endpoints principais (JSON)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('endpoints', nargs='*', help=f'Padrão: {", ".join(ENDPOINTS)}')
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=20)
+        parser.add_argument('--users', type=int, default=50, help='Usuários bench_* sorteados para as requisições')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help='Arquivo JSON de saída (padrão: stdout)')
+
+    def handle(self, *args, **options):
+        names = options['endpoints'] or list(ENDPOINTS)
+        unknown = set(names) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(f'Endpoints desconhecidos: {", ".join(sorted(unknown))}')
+
+        rng = random.Random(options['seed'])
+        users = list(
+            User.objects.filter(username__startswith=BENCH_PREFIX, level__in=[UserLevel.PLUS, UserLevel.PRO])
+            .order_by('pk')[:options['users'] * 4]
+        )
+        if not users:
+            raise CommandError('Nenhum usuário bench_*; rode seed_social_graph antes')
+        users = rng.sample(users, min(options['users'], len(users)))
+
+        # Post com mais comentários: pior caso da árvore de comentários
+        post = Post.objects.filter(author__username__startswith=BENCH_PREFIX).order_by('-comments_count', 'pk').first()
+
+        results = {}
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            clients = {}
+            for user in users:
+                client = APIClient()
+                client.force_authenticate(user=user)
+                clients[user.pk] = client
+
+            for name in names:
+                results[name] = self.measure(name, users, clients, post, rng, options)
+
+        report = {
+            'meta': {
+                'revision': git_revision(),
+                'timestamp': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'iterations': options['iterations'],
+                'warmup': options['warmup'],
+                'users': len(users),
+                'seed': options['seed'],
+                'dataset': {
+                    'users': User.objects.filter(username__startswith=BENCH_PREFIX).count(),
+                    'posts': Post.objects.filter(author__username__startswith=BENCH_PREFIX).count(),
+                    'chat_memberships': ChatParticipant.objects.filter(user__username__startswith=BENCH_PREFIX).count(),
+                },
+            },
+            'endpoints': results,
+        }
+
+        payload = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(payload + '\n')
+        else:
+            self.stdout.write(payload)
+
+    def measure(self, name, users, clients, post, rng, options):
+        latencies = []
+        queries = []
+        sizes = []
+        errors = 0
+
+        for i in range(options['warmup'] + options['iterations']):
+            user = rng.choice(users)
+            method, url, data = ENDPOINTS[name](user, post)
+            client = clients[user.pk]
+
+            with QueryRecorder() as recorder:
+                start = time.perf_counter()
+                if method == 'get':
+                    response = client.get(url)
+                else:
+                    response = client.post(url, data, format='json')
+                elapsed = time.perf_counter() - start
+
+            if i < options['warmup']:
+                continue
+            latencies.append(elapsed * 1000)
+            queries.append(recorder.count)
+            sizes.append(len(response.content))
+            if response.status_code >= 400:
+                errors += 1
+
+        total = sum(latencies) / 1000
+        return {
+            'requests': len(latencies),
+            'errors': errors,
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'mean_ms': round(statistics.fmean(latencies), 3),
+            'queries_per_request': round(statistics.fmean(queries), 2),
+            'max_queries': max(queries),
+            'payload_bytes': round(statistics.fmean(sizes)),
+            'throughput_rps': round(len(latencies) / total, 1) if total else 0.0,
+        }
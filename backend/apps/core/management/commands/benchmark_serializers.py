@@ -0,0 +1,114 @@
+# backend/apps/core/management/commands/benchmark_serializers.py
+import json
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.accounts.serializers import UserSerializer
+from apps.core.renderers import ORJSONRenderer
+from apps.posts.models import Post
+from apps.posts.serializers import PostSerializer
+
+from .benchmark_api import percentile
+from .seed_social_graph import BENCH_PREFIX
+
+User = get_user_model()
+
+
+class FullAuthorPostSerializer(PostSerializer):
+    """Post com o autor completo aninhado (representação anterior ao cartão)"""
+    author = UserSerializer(read_only=True)
+
+
+# Modo -> (serializer, queryset da página, listagem rápida ligada)
+MODES = {
+    'full_author': (
+        FullAuthorPostSerializer,
+        lambda: Post.objects.filter(is_active=True).select_related('author').prefetch_related('media'),
+        False,
+    ),
+    'author_card': (
+        PostSerializer,
+        lambda: Post.objects.filter(is_active=True).prefetch_related('media'),
+        False,
+    ),
+    'fastpath': (
+        PostSerializer,
+        lambda: Post.objects.filter(is_active=True).prefetch_related('media'),
+        True,
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = 'Compara tamanho e tempo de serialização de uma página do timeline: autor completo, cartão e listagem rápida'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=20)
+        parser.add_argument('--output', help='Arquivo JSON de saída (padrão: stdout)')
+
+    def handle(self, *args, **options):
+        viewer = User.objects.filter(username__startswith=BENCH_PREFIX).order_by('pk').first()
+        if viewer is None:
+            raise CommandError('Nenhum usuário bench_*; rode seed_social_graph antes')
+
+        request = Request(APIRequestFactory().get('/api/posts/timeline/'))
+        request.user = viewer
+
+        results = {}
+        for mode, (serializer_class, queryset, fast) in MODES.items():
+            with override_settings(ALLOWED_HOSTS=['testserver'], FAST_SERIALIZERS=fast):
+                results[mode] = self.measure(serializer_class, queryset, request, options)
+
+        full, card, fast = results['full_author'], results['author_card'], results['fastpath']
+        report = {
+            'page_size': options['page_size'],
+            'iterations': options['iterations'],
+            'modes': results,
+            'saved': {
+                'bytes': full['payload_bytes'] - card['payload_bytes'],
+                'bytes_pct': round(100 * (1 - card['payload_bytes'] / full['payload_bytes']), 1),
+                'p50_ms': round(full['p50_ms'] - card['p50_ms'], 3),
+                'p50_pct': round(100 * (1 - card['p50_ms'] / full['p50_ms']), 1) if full['p50_ms'] else 0.0,
+            },
+            # Mesmo JSON do author_card; ganho de throughput da listagem sem os campos do DRF
+            'fastpath_speedup': round(card['mean_ms'] / fast['mean_ms'], 2) if fast['mean_ms'] else 0.0,
+        }
+
+        payload = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(payload + '\n')
+        else:
+            self.stdout.write(payload)
+
+    def measure(self, serializer_class, queryset, request, options):
+        latencies = []
+        size = 0
+
+        for i in range(options['warmup'] + options['iterations']):
+            # Página já carregada: mede serialização e renderização, não a query da página
+            page = list(queryset().order_by('-created_at', '-id')[:options['page_size']])
+
+            start = time.perf_counter()
+            data = serializer_class(page, many=True, context={'request': request}).data
+            size = len(ORJSONRenderer().render(data))
+            elapsed = time.perf_counter() - start
+
+            if i >= options['warmup']:
+                latencies.append(elapsed * 1000)
+
+        return {
+            'payload_bytes': size,
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'mean_ms': round(statistics.fmean(latencies), 3),
+            'pages_per_s': round(1000 / statistics.fmean(latencies), 1),
+        }
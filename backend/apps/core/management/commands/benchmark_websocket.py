@@ -0,0 +1,288 @@
+# backend/apps/core/management/commands/benchmark_websocket.py
+import asyncio
+import json
+import os
+import platform
+import time
+import tracemalloc
+
+import django
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from apps.accounts.models import UserLevel
+from apps.chat.models import ChatParticipant, ChatRoom
+
+from .benchmark_api import git_revision, percentile
+from .seed_social_graph import BENCH_PREFIX
+
+User = get_user_model()
+
+ROOM_PREFIX = 'bench_ws_'
+
+
+def channel_layers(layer, redis_url):
+    if layer == 'redis':
+        return {'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [redis_url], 'capacity': 10000},
+        }}
+    # Capacidade alta: o InMemoryChannelLayer descarta em silêncio quando a fila enche
+    return {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer', 'CONFIG': {'capacity': 100000}}}
+
+
+class BenchSocket:
+    """Cliente websocket em processo: fala ASGI direto com config.asgi.application"""
+
+    def __init__(self, application, room_id, cookie, stats):
+        self.room_id = room_id
+        self.stats = stats
+        self.inbox = asyncio.Queue()
+        self.acks = asyncio.Queue()
+        self.accepted = asyncio.Event()
+        self.closed = asyncio.Event()
+        scope = {
+            'type': 'websocket',
+            'path': f'/ws/chat/{room_id}/',
+            'headers': [(b'cookie', cookie.encode())],
+            'query_string': b'',
+            'subprotocols': [],
+        }
+        self.task = asyncio.create_task(application(scope, self.inbox.get, self.receive))
+
+    async def receive(self, event):
+        """Chamado pela aplicação a cada evento enviado ao cliente"""
+        if event['type'] == 'websocket.accept':
+            self.accepted.set()
+        elif event['type'] == 'websocket.close':
+            self.closed.set()
+            self.accepted.set()
+        elif event['type'] == 'websocket.send':
+            frame = json.loads(event['text'])
+            if frame['type'] == 'message':
+                sent_at = self.stats['sent'].get(frame['content'])
+                if sent_at is not None:
+                    self.stats['delivery_ms'].append((time.perf_counter() - sent_at) * 1000)
+                self.stats['delivered'] += 1
+                if self.stats['delivered'] >= self.stats['expected']:
+                    self.stats['done'].set()
+            elif frame['type'] in ('ack', 'error'):
+                self.acks.put_nowait(frame)
+            elif frame['type'] == 'typing':
+                self.stats['typing_events'] += 1
+
+    async def connect(self):
+        await self.inbox.put({'type': 'websocket.connect'})
+        accepted = asyncio.create_task(self.accepted.wait())
+        await asyncio.wait([accepted, self.task], return_when=asyncio.FIRST_COMPLETED)
+        if self.task.done():
+            # Consumer terminou sem aceitar: propaga a exceção, se houver
+            accepted.cancel()
+            self.task.result()
+            return False
+        return not self.closed.is_set()
+
+    async def send_json(self, data):
+        await self.inbox.put({'type': 'websocket.receive', 'text': json.dumps(data)})
+
+    async def disconnect(self):
+        await self.inbox.put({'type': 'websocket.disconnect', 'code': 1000})
+        try:
+            await asyncio.wait_for(self.task, 5)
+        except asyncio.TimeoutError:
+            self.task.cancel()
+
+
+class Command(BaseCommand):
+    help = (
+        'Abre N websockets em M salas contra config.asgi.application e mede latência de conexão, '
+        'entrega ponta a ponta (p50/p95/p99), memória por conexão e mensagens/s (JSON)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=200)
+        parser.add_argument('--rooms', type=int, default=10)
+        parser.add_argument('--messages', type=int, default=5, help='Mensagens enviadas por conexão')
+        parser.add_argument('--typing', type=int, default=3, help='Frames de digitação antes de cada mensagem')
+        parser.add_argument('--users', type=int, default=50, help='Usuários bench_* distribuídos entre as conexões')
+        parser.add_argument('--layer', choices=['memory', 'redis'], default='memory')
+        parser.add_argument('--redis-url', default=os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+        parser.add_argument('--timeout', type=float, default=60.0, help='Espera máxima pelas entregas (s)')
+        parser.add_argument(
+            '--skip-memory', action='store_true',
+            help='Sem tracemalloc (a latência de conexão fica sem o custo do rastreamento)'
+        )
+        parser.add_argument('--output', help='Arquivo JSON de saída (padrão: stdout)')
+
+    def handle(self, *args, **options):
+        if options['connections'] < 1 or options['rooms'] < 1:
+            raise CommandError('--connections e --rooms devem ser positivos')
+
+        users = list(
+            User.objects.filter(username__startswith=BENCH_PREFIX, level__in=[UserLevel.PLUS, UserLevel.PRO])
+            .order_by('pk')[:options['users']]
+        )
+        if not users:
+            raise CommandError('Nenhum usuário bench_* com chat; rode seed_social_graph antes')
+
+        # Conexão i: usuário i % U na sala i % M
+        rooms = ChatRoom.objects.bulk_create([
+            ChatRoom(room_type='group', name=f'{ROOM_PREFIX}{n}') for n in range(options['rooms'])
+        ])
+        plan = [
+            (users[i % len(users)], rooms[i % len(rooms)])
+            for i in range(options['connections'])
+        ]
+        ChatParticipant.objects.bulk_create(
+            [ChatParticipant(room=room, user=user) for user, room in set(plan)],
+            ignore_conflicts=True
+        )
+
+        # Sessões reais: a conexão passa pelo CachedAuthMiddlewareStack como em produção
+        clients = {}
+        for user in {user for user, _ in plan}:
+            client = Client()
+            client.force_login(user)
+            clients[user.pk] = client
+        cookies = {
+            pk: f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+            for pk, client in clients.items()
+        }
+
+        try:
+            with override_settings(CHANNEL_LAYERS=channel_layers(options['layer'], options['redis_url'])):
+                from config.asgi import application
+                results = async_to_sync(self.run)(application, plan, cookies, options)
+        finally:
+            for client in clients.values():
+                client.logout()
+            ChatRoom.objects.filter(pk__in=[room.pk for room in rooms]).delete()
+
+        report = {
+            'meta': {
+                'revision': git_revision(),
+                'timestamp': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'layer': options['layer'],
+                'connections': options['connections'],
+                'rooms': options['rooms'],
+                'users': len(clients),
+                'messages_per_connection': options['messages'],
+                'typing_per_message': options['typing'],
+            },
+            'results': results,
+        }
+
+        payload = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(payload + '\n')
+        else:
+            self.stdout.write(payload)
+
+    async def run(self, application, plan, cookies, options):
+        room_sizes = {}
+        for _, room in plan:
+            room_sizes[room.pk] = room_sizes.get(room.pk, 0) + 1
+
+        stats = {
+            'sent': {},
+            'delivery_ms': [],
+            'delivered': 0,
+            # Cada mensagem chega a todas as conexões da sala, inclusive a do remetente
+            'expected': sum(room_sizes[room.pk] * options['messages'] for _, room in plan),
+            'typing_events': 0,
+            'done': asyncio.Event(),
+        }
+
+        # Conexões: uma a uma, para medir a latência sem contenção entre elas
+        memory = not options['skip_memory']
+        if memory:
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+
+        sockets = []
+        connect_ms = []
+        rejected = 0
+        for user, room in plan:
+            socket = BenchSocket(application, room.pk, cookies[user.pk], stats)
+            start = time.perf_counter()
+            if await socket.connect():
+                connect_ms.append((time.perf_counter() - start) * 1000)
+                sockets.append(socket)
+            else:
+                rejected += 1
+
+        memory_per_connection = None
+        if memory:
+            held = tracemalloc.get_traced_memory()[0] - baseline
+            tracemalloc.stop()
+            memory_per_connection = round(held / max(len(sockets), 1) / 1024, 2)
+
+        if not sockets:
+            raise CommandError('Nenhuma conexão aceita')
+        stats['expected'] = sum(room_sizes[socket.room_id] * options['messages'] for socket in sockets)
+
+        # Tráfego: todas as conexões ao mesmo tempo; cada uma espera o ack antes da próxima mensagem
+        ack_ms = []
+        errors = 0
+
+        async def drive(index, socket):
+            nonlocal errors
+            for seq in range(options['messages']):
+                for _ in range(options['typing']):
+                    await socket.send_json({'type': 'typing', 'is_typing': True})
+                content = f'bench {index}:{seq}'
+                start = stats['sent'][content] = time.perf_counter()
+                await socket.send_json({'type': 'message', 'content': content, 'client_id': content})
+                try:
+                    frame = await asyncio.wait_for(socket.acks.get(), options['timeout'])
+                except asyncio.TimeoutError:
+                    frame = {'type': 'error'}
+                if frame['type'] == 'error':
+                    errors += 1
+                    continue
+                ack_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[drive(index, socket) for index, socket in enumerate(sockets)])
+        sent_elapsed = time.perf_counter() - start
+        try:
+            await asyncio.wait_for(stats['done'].wait(), options['timeout'])
+        except asyncio.TimeoutError:
+            pass
+        delivered_elapsed = time.perf_counter() - start
+
+        for socket in sockets:
+            await socket.disconnect()
+
+        messages = len(sockets) * options['messages']
+        delivery_ms = stats['delivery_ms']
+        return {
+            'accepted': len(sockets),
+            'rejected': rejected,
+            'send_errors': errors,
+            'connect_p50_ms': round(percentile(connect_ms, 50), 3),
+            'connect_p95_ms': round(percentile(connect_ms, 95), 3),
+            'connect_p99_ms': round(percentile(connect_ms, 99), 3),
+            'ack_p50_ms': round(percentile(ack_ms, 50), 3),
+            'ack_p95_ms': round(percentile(ack_ms, 95), 3),
+            'delivery_p50_ms': round(percentile(delivery_ms, 50), 3),
+            'delivery_p95_ms': round(percentile(delivery_ms, 95), 3),
+            'delivery_p99_ms': round(percentile(delivery_ms, 99), 3),
+            'messages': messages,
+            'deliveries': stats['delivered'],
+            'lost_deliveries': stats['expected'] - stats['delivered'],
+            'messages_per_s': round(messages / sent_elapsed, 1) if sent_elapsed else 0.0,
+            'deliveries_per_s': round(stats['delivered'] / delivered_elapsed, 1) if delivered_elapsed else 0.0,
+            # Frames de digitação enviados vs. eventos que chegaram às conexões (coalescência)
+            'typing_frames': messages * options['typing'],
+            'typing_events': stats['typing_events'],
+            'memory_per_connection_kb': memory_per_connection,
+        }
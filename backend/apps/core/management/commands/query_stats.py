@@ -0,0 +1,30 @@
+# backend/apps/core/management/commands/query_stats.py
+from django.core.management.base import BaseCommand
+
+from apps.core.queries import QUERY_BUCKETS, reset_view_query_stats, view_query_stats
+
+
+class Command(BaseCommand):
+    help = 'Histograma de queries por view coletado pelo QueryBudgetMiddleware'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Zera as estatísticas após exibir')
+
+    def handle(self, *args, **options):
+        buckets = [f'le_{limit}' for limit in QUERY_BUCKETS] + ['le_inf']
+        header = ['view', 'reqs', 'avg q', 'avg db ms'] + [name[3:] for name in buckets]
+        self.stdout.write('\t'.join(header))
+
+        stats = view_query_stats()
+        for view_name, fields in sorted(stats.items(), key=lambda item: -item[1].get('queries', 0)):
+            requests = fields.get('requests', 0) or 1
+            row = [
+                view_name,
+                str(fields.get('requests', 0)),
+                f"{fields.get('queries', 0) / requests:.1f}",
+                f"{fields.get('db_us', 0) / requests / 1000:.2f}",
+            ] + [str(fields.get(name, 0)) for name in buckets]
+            self.stdout.write('\t'.join(row))
+
+        if options['reset']:
+            reset_view_query_stats()
@@ -0,0 +1,29 @@
+# backend/apps/core/management/commands/reconcile_counters.py
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.counters import RECONCILE_BATCH_SIZE, registered_counters
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os contadores denormalizados a partir das tabelas de origem'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'counters',
+            nargs='*',
+            help='Contadores a reconciliar (ex.: posts.Post.reactions_count); padrão: todos'
+        )
+        parser.add_argument('--batch-size', type=int, default=RECONCILE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        counters = [counter for counter in registered_counters() if counter.source]
+        if options['counters']:
+            names = set(options['counters'])
+            unknown = names - {str(counter) for counter in counters}
+            if unknown:
+                raise CommandError(f'Contadores desconhecidos: {", ".join(sorted(unknown))}')
+            counters = [counter for counter in counters if str(counter) in names]
+
+        for counter in counters:
+            updated = counter.reconcile(batch_size=options['batch_size'])
+            self.stdout.write(f'{counter}: {updated} registros recalculados')
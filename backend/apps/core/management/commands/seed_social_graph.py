@@ -0,0 +1,204 @@
+# backend/apps/core/management/commands/seed_social_graph.py
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from apps.accounts.models import Follow, UserLevel
+from apps.chat.models import ChatParticipant, ChatRoom, Message
+from apps.core.counters import registered_counters
+from apps.interactions.models import Comment, Reaction
+from apps.posts.models import Post
+
+User = get_user_model()
+
+BENCH_PREFIX = 'bench_'
+BENCH_PASSWORD = 'bench-pass-123'
+TAGS = ['tech', 'music', 'sports', 'news', 'games', 'food', 'travel', 'art', 'movies', 'science']
+REGIONS = ['', 'sul', 'sudeste', 'nordeste', 'norte', 'centro-oeste']
+# Distribuição de níveis: maioria USER, PRO suficiente para comentar
+LEVELS = [UserLevel.USER] * 5 + [UserLevel.PLUS] * 3 + [UserLevel.PRO] * 2
+
+
+class Command(BaseCommand):
+    help = 'Gera um grafo social sintético e reprodutível (usuários bench_*) com bulk_create'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--follows-per-user', type=int, default=20)
+        parser.add_argument('--posts-per-user', type=int, default=5)
+        parser.add_argument('--reactions-per-post', type=int, default=10)
+        parser.add_argument('--comments-per-post', type=int, default=4)
+        parser.add_argument('--replies-per-comment', type=int, default=2)
+        parser.add_argument('--rooms-per-user', type=int, default=2)
+        parser.add_argument('--messages-per-room', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--clear', action='store_true', help='Remove os dados bench_* existentes antes')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+
+        if options['clear']:
+            deleted, _ = User.objects.filter(username__startswith=BENCH_PREFIX).delete()
+            self.stdout.write(f'{deleted} registros bench_* removidos')
+
+        with transaction.atomic():
+            user_ids = self.seed_users(options['users'])
+            self.seed_follows(user_ids, options['follows_per_user'])
+            post_ids = self.seed_posts(user_ids, options['posts_per_user'])
+            reactor_ids = list(User.objects.filter(
+                pk__in=user_ids, level__in=[UserLevel.PLUS, UserLevel.PRO]
+            ).values_list('pk', flat=True))
+            commenter_ids = list(User.objects.filter(
+                pk__in=user_ids, level=UserLevel.PRO
+            ).values_list('pk', flat=True))
+            self.seed_reactions(post_ids, reactor_ids, options['reactions_per_post'])
+            self.seed_comments(
+                post_ids, commenter_ids,
+                options['comments_per_post'], options['replies_per_comment']
+            )
+            self.seed_chat(user_ids, options['rooms_per_user'], options['messages_per_room'])
+
+        # bulk_create não passa pelos contadores; recalcula a partir das tabelas
+        for counter in registered_counters():
+            if counter.source:
+                counter.reconcile()
+        User.objects.filter(pk__in=user_ids).update(posts_count=Coalesce(
+            Subquery(
+                Post.objects.filter(author=OuterRef('pk')).order_by().values('author')
+                .annotate(total=Count('pk')).values('total'),
+                output_field=IntegerField()
+            ),
+            0
+        ))
+
+        self.stdout.write(self.style.SUCCESS('Grafo social gerado'))
+
+    def bulk(self, model, objects, **kwargs):
+        created = model.objects.bulk_create(objects, batch_size=self.batch_size, **kwargs)
+        self.stdout.write(f'{model._meta.label}: {len(created)}')
+        return created
+
+    def seed_users(self, total):
+        start = User.objects.filter(username__startswith=BENCH_PREFIX).count()
+        password = make_password(BENCH_PASSWORD)
+        users = self.bulk(User, [
+            User(
+                username=f'{BENCH_PREFIX}{i}',
+                email=f'{BENCH_PREFIX}{i}@bench.local',
+                password=password,
+                level=self.rng.choice(LEVELS),
+                region=self.rng.choice(REGIONS),
+                preferred_tags=self.rng.sample(TAGS, self.rng.randint(0, 3)),
+            )
+            for i in range(start, start + total)
+        ])
+        return [user.pk for user in users]
+
+    def seed_follows(self, user_ids, per_user):
+        per_user = min(per_user, len(user_ids) - 1)
+        follows = []
+        for follower_id in user_ids:
+            sample = self.rng.sample(user_ids, per_user + 1)
+            follows.extend(
+                Follow(follower_id=follower_id, following_id=following_id)
+                for following_id in [pk for pk in sample if pk != follower_id][:per_user]
+            )
+        self.bulk(Follow, follows, ignore_conflicts=True)
+
+    def seed_posts(self, user_ids, per_user):
+        posts = self.bulk(Post, [
+            Post(
+                author_id=author_id,
+                content=f'Post sintético {n} de {author_id}',
+                tags=self.rng.sample(TAGS, self.rng.randint(0, 3)),
+                region=self.rng.choice(REGIONS),
+            )
+            for author_id in user_ids
+            for n in range(per_user)
+        ])
+        return [post.pk for post in posts]
+
+    def seed_reactions(self, post_ids, reactor_ids, per_post):
+        if not reactor_ids:
+            return
+        types = [value for value, _ in Reaction.REACTION_TYPES]
+        self.bulk(Reaction, [
+            Reaction(user_id=user_id, post_id=post_id, reaction_type=self.rng.choice(types))
+            for post_id in post_ids
+            for user_id in self.rng.sample(reactor_ids, min(per_post, len(reactor_ids)))
+        ], ignore_conflicts=True)
+
+    def seed_comments(self, post_ids, commenter_ids, per_post, replies):
+        if not commenter_ids:
+            return
+        parents = self.bulk(Comment, [
+            Comment(user_id=self.rng.choice(commenter_ids), post_id=post_id, content=f'Comentário {n}')
+            for post_id in post_ids
+            for n in range(per_post)
+        ])
+        self.bulk(Comment, [
+            Comment(
+                user_id=self.rng.choice(commenter_ids),
+                post_id=parent.post_id,
+                parent_id=parent.pk,
+                content=f'Resposta {n}'
+            )
+            for parent in parents
+            for n in range(replies)
+        ])
+
+    def seed_chat(self, user_ids, per_user, messages):
+        if len(user_ids) < 2 or not per_user:
+            return
+
+        pairs = [
+            (user_id, other_id)
+            for user_id in user_ids
+            for other_id in self.rng.sample(user_ids, min(per_user + 1, len(user_ids)))
+            if other_id != user_id
+        ]
+        rooms = self.bulk(ChatRoom, [ChatRoom(room_type='private') for _ in pairs])
+        self.bulk(ChatParticipant, [
+            ChatParticipant(room_id=room.pk, user_id=user_id)
+            for room, pair in zip(rooms, pairs)
+            for user_id in pair
+        ])
+
+        created = self.bulk(Message, [
+            Message(room_id=room.pk, sender_id=self.rng.choice(pair), content=f'Mensagem {n}')
+            for room, pair in zip(rooms, pairs)
+            for n in range(messages)
+        ])
+
+        # Resumo denormalizado das salas, como faria ChatRoom.register_message
+        members = {room.pk: pair for room, pair in zip(rooms, pairs)}
+        last = {}
+        received = {}
+        for message in created:
+            last[message.room_id] = message
+            for user_id in members[message.room_id]:
+                if user_id != message.sender_id:
+                    received[(message.room_id, user_id)] = received.get((message.room_id, user_id), 0) + 1
+
+        for room in rooms:
+            message = last.get(room.pk)
+            if message:
+                room.last_message_content = message.content[:100]
+                room.last_message_sender_id = message.sender_id
+                room.last_message_at = message.created_at
+        ChatRoom.objects.bulk_update(
+            rooms, ['last_message_content', 'last_message_sender', 'last_message_at'],
+            batch_size=self.batch_size
+        )
+
+        participants = list(ChatParticipant.objects.filter(room_id__in=[room.pk for room in rooms]))
+        for participant in participants:
+            participant.unread_count = received.get((participant.room_id, participant.user_id), 0)
+        ChatParticipant.objects.bulk_update(participants, ['unread_count'], batch_size=self.batch_size)
@@ -0,0 +1,32 @@
+# backend/apps/core/middleware.py
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .queries import QueryRecorder, logger, record_view_queries
+
+
+class QueryBudgetMiddleware:
+    """Mede queries por request: header Server-Timing, histograma por view e alerta de N+1"""
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = (match.view_name if match else None) or 'unresolved'
+
+        timing = recorder.server_timing()
+        repeated = recorder.repeated(settings.QUERY_REPEAT_THRESHOLD)
+        if repeated:
+            timing += f', dbrepeat;desc="{len(repeated)} repeated statements"'
+            for sql, total in repeated:
+                logger.warning('Possível N+1 em %s: %d× %s', view_name, total, sql)
+
+        response['Server-Timing'] = timing
+        record_view_queries(view_name, recorder)
+        return response
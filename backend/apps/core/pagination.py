@@ -0,0 +1,136 @@
+# backend/apps/core/pagination.py
+import base64
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from .versioned_cache import cached
+
+
+class KeysetPagination(BasePagination):
+    """Paginação por cursor em (created_at, id), sem OFFSET nem COUNT"""
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    # Campo temporal seguido do desempate; o sinal define a direção
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Cursor inválido'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.limit = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        rows = self.fetch_page(queryset, position, self.limit + 1, view)
+        self.page = rows[:self.limit]
+        self.has_next = len(rows) > self.limit
+        return self.page
+
+    def get_page(self, queryset, position, limit):
+        """Busca `limit` itens a partir da posição, usando o índice de (campo, -created_at)"""
+        field, tiebreak = (name.lstrip('-') for name in self.ordering)
+        queryset = queryset.order_by(*self.ordering)
+
+        if position is not None:
+            value, pk = position
+            op = 'lt' if self.ordering[0].startswith('-') else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{field}__{op}': value}) |
+                Q(**{field: value, f'{tiebreak}__{op}': pk})
+            )
+
+        return queryset[:limit]
+
+    def fetch_page(self, queryset, position, limit, view=None):
+        return list(self.get_page(queryset, position, limit))
+
+    def get_position(self, obj):
+        field, tiebreak = (name.lstrip('-') for name in self.ordering)
+        return getattr(obj, field), getattr(obj, tiebreak)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def encode_cursor(self, position):
+        value, pk = position
+        raw = f'{value.isoformat()}|{pk}'.encode()
+        return base64.urlsafe_b64encode(raw).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode()).decode()
+            value, pk = raw.rsplit('|', 1)
+            value = parse_datetime(value)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        cursor = self.encode_cursor(self.get_position(self.page[-1]))
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+
+class CachedKeysetPagination(KeysetPagination):
+    """KeysetPagination com os ids de cada página em cache versionado
+
+    A view define cache_prefix e get_cache_versions(); as linhas são sempre
+    hidratadas do banco por pk, então contadores e estado do usuário ficam atuais.
+    """
+
+    def fetch_page(self, queryset, position, limit, view=None):
+        if view is None:
+            return super().fetch_page(queryset, position, limit)
+
+        ids = cached(
+            view.cache_prefix,
+            view.get_cache_versions(),
+            (position, limit),
+            lambda: list(self.get_page(
+                queryset.prefetch_related(None).values_list('pk', flat=True), position, limit
+            ))
+        )
+        rows = {row.pk: row for row in queryset.filter(pk__in=ids)}
+        return [rows[pk] for pk in ids if pk in rows]
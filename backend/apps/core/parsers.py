@@ -0,0 +1,28 @@
+# backend/apps/core/parsers.py
+import io
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from . import jsonlib
+from .renderers import ORJSONRenderer
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser via orjson para corpos UTF-8"""
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        data = stream.read()
+
+        # Outras codificações e o modo não estrito (NaN/Infinity) ficam com o parser do DRF
+        if encoding.lower().replace('-', '') != 'utf8' or not self.strict:
+            return super().parse(io.BytesIO(data), media_type, parser_context)
+
+        try:
+            return jsonlib.loads(data)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
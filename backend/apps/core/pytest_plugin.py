@@ -0,0 +1,31 @@
+# backend/apps/core/pytest_plugin.py
+from contextlib import contextmanager
+
+import pytest
+
+from .queries import QueryRecorder
+
+
+@pytest.fixture
+def query_budget():
+    """Falha o teste se o bloco exceder o orçamento de queries
+
+        with query_budget(5, max_repeats=1) as recorder:
+            client.get(url)
+    """
+    @contextmanager
+    def _query_budget(max_queries, max_repeats=None):
+        with QueryRecorder() as recorder:
+            yield recorder
+
+        details = '\n'.join(f'  {total}× {sql}' for sql, total in recorder.repeated(1))
+        assert recorder.count <= max_queries, (
+            f'{recorder.count} queries executadas (orçamento: {max_queries}):\n{details}'
+        )
+        if max_repeats is not None:
+            repeated = recorder.repeated(max_repeats + 1)
+            assert not repeated, (
+                f'Statements repetidos mais de {max_repeats}× (possível N+1):\n{details}'
+            )
+
+    return _query_budget
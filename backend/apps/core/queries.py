@@ -0,0 +1,142 @@
+# backend/apps/core/queries.py
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.core.cache import cache
+from django.db import connections
+
+from .cache import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Limites superiores (em queries) dos baldes do histograma por view
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+QUERY_STATS_KEY = 'querystats'
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'\bIN \((?:\?(?:, )?)+\)')
+_SPACES = re.compile(r'\s+')
+
+_local_lock = threading.Lock()
+
+
+def fingerprint(sql):
+    """Normaliza o SQL para agrupar statements que só diferem nos valores"""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """Conta queries, tempo de banco e statements repetidos via execute_wrapper"""
+
+    def __init__(self, aliases=None):
+        self.aliases = aliases
+        self.queries = []
+        self._stack = None
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for alias in self.aliases or connections:
+            self._stack.enter_context(connections[alias].execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+        return False
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((fingerprint(sql), time.perf_counter() - start))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration_ms(self):
+        return sum(duration for _, duration in self.queries) * 1000
+
+    def repeated(self, threshold=2):
+        """Statements executados `threshold` vezes ou mais, do mais frequente ao menos"""
+        counts = Counter(sql for sql, _ in self.queries)
+        return [(sql, total) for sql, total in counts.most_common() if total >= threshold]
+
+    def server_timing(self):
+        """Valor do header Server-Timing"""
+        return f'db;dur={self.duration_ms:.2f};desc="{self.count} queries"'
+
+
+def _bucket(count):
+    for limit in QUERY_BUCKETS:
+        if count <= limit:
+            return f'le_{limit}'
+    return 'le_inf'
+
+
+def record_view_queries(view_name, recorder):
+    """Acumula o histograma de queries por view (Redis; locmem nos testes)"""
+    fields = {
+        'requests': 1,
+        'queries': recorder.count,
+        'db_us': int(recorder.duration_ms * 1000),
+        _bucket(recorder.count): 1,
+    }
+
+    redis = get_redis_client()
+    if redis is not None:
+        key = cache.make_key(f'{QUERY_STATS_KEY}:{view_name}')
+        pipe = redis.pipeline(transaction=False)
+        for field, value in fields.items():
+            pipe.hincrby(key, field, value)
+        pipe.sadd(cache.make_key(QUERY_STATS_KEY), view_name)
+        pipe.execute()
+        return
+
+    with _local_lock:
+        stats = cache.get(QUERY_STATS_KEY) or {}
+        view_stats = stats.setdefault(view_name, {})
+        for field, value in fields.items():
+            view_stats[field] = view_stats.get(field, 0) + value
+        cache.set(QUERY_STATS_KEY, stats, None)
+
+
+def view_query_stats():
+    """{view: {campo: total}} acumulado por record_view_queries"""
+    redis = get_redis_client()
+    if redis is None:
+        return cache.get(QUERY_STATS_KEY) or {}
+
+    views = sorted(member.decode() for member in redis.smembers(cache.make_key(QUERY_STATS_KEY)))
+    pipe = redis.pipeline(transaction=False)
+    for view_name in views:
+        pipe.hgetall(cache.make_key(f'{QUERY_STATS_KEY}:{view_name}'))
+    return {
+        view_name: {field.decode(): int(value) for field, value in stats.items()}
+        for view_name, stats in zip(views, pipe.execute())
+    }
+
+
+def reset_view_query_stats():
+    redis = get_redis_client()
+    if redis is None:
+        cache.delete(QUERY_STATS_KEY)
+        return
+
+    index = cache.make_key(QUERY_STATS_KEY)
+    keys = [
+        cache.make_key(f'{QUERY_STATS_KEY}:{member.decode()}')
+        for member in redis.smembers(index)
+    ]
+    redis.delete(index, *keys)
@@ -0,0 +1,18 @@
+# backend/apps/core/renderers.py
+from rest_framework.renderers import JSONRenderer
+
+from . import jsonlib
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer via orjson; indentação e saída ASCII seguem pelo renderer do DRF"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact or not self.strict:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return jsonlib.dumps(data)
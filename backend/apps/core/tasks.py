@@ -0,0 +1,10 @@
+# backend/apps/core/tasks.py
+from celery import shared_task
+
+from .counters import flush_all
+
+
+@shared_task
+def flush_counters():
+    """Grava no banco os deltas acumulados de todos os contadores"""
+    return flush_all()
@@ -0,0 +1,103 @@
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from apps.chat.models import ChatParticipant, ChatRoom
+from apps.interactions.models import Comment
+from apps.posts.models import Post
+
+User = get_user_model()
+
+
+def seed_graph():
+    call_command(
+        'seed_social_graph', users=12, follows_per_user=3, posts_per_user=2,
+        reactions_per_post=2, comments_per_post=2, replies_per_comment=1,
+        rooms_per_user=1, messages_per_room=3, stdout=StringIO()
+    )
+
+
+@pytest.mark.django_db
+class TestBenchmarkSuite:
+    """Testes para o seed do grafo social e o runner de benchmark"""
+
+    def seed(self):
+        seed_graph()
+
+    def test_seed_is_consistent(self):
+        """Seed gera dados com contadores denormalizados corretos"""
+        self.seed()
+
+        assert User.objects.filter(username__startswith='bench_').count() == 12
+        assert Post.objects.count() == 24
+        user = User.objects.filter(username__startswith='bench_').first()
+        assert user.following_count == user.following_relationships.count()
+        assert user.posts_count == 2
+
+        post = Post.objects.order_by('-comments_count').first()
+        assert post.comments_count == Comment.objects.filter(post=post).count()
+
+        room = ChatRoom.objects.exclude(last_message_at=None).first()
+        assert room.last_message_content.startswith('Mensagem')
+        unread = ChatParticipant.objects.filter(room=room).values_list('unread_count', flat=True)
+        assert sum(unread) == room.messages.count()
+
+    def test_benchmark_report(self, tmp_path):
+        """Runner gera relatório JSON com latência, queries e throughput"""
+        self.seed()
+        output = tmp_path / 'bench.json'
+
+        call_command('benchmark_api', iterations=4, warmup=1, users=3, output=str(output))
+
+        report = json.loads(output.read_text())
+        assert set(report['endpoints']) == {
+            'timeline', 'post-list', 'comment-list', 'chat-room-list', 'reaction-toggle'
+        }
+        for stats in report['endpoints'].values():
+            assert stats['requests'] == 4
+            assert stats['errors'] == 0
+            assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms']
+            assert stats['queries_per_request'] > 0
+        assert report['meta']['dataset']['users'] == 12
+
+    def test_serializer_benchmark(self, tmp_path):
+        """Cartão do autor reduz o payload de uma página do timeline"""
+        self.seed()
+        output = tmp_path / 'serializers.json'
+
+        call_command('benchmark_serializers', iterations=3, warmup=1, page_size=20, output=str(output))
+
+        report = json.loads(output.read_text())
+        assert set(report['modes']) == {'full_author', 'author_card', 'fastpath'}
+        assert report['saved']['bytes'] > 0
+        assert report['modes']['fastpath']['payload_bytes'] == report['modes']['author_card']['payload_bytes']
+
+
+# database_sync_to_async fecha a conexão entre chamadas: precisa de transação real
+@pytest.mark.django_db(transaction=True)
+class TestWebsocketBenchmark:
+    """Harness de carga do ChatConsumer"""
+
+    def test_websocket_benchmark(self, tmp_path):
+        """Cada mensagem chega a todas as conexões da sala; as salas do benchmark são removidas"""
+        seed_graph()
+        output = tmp_path / 'websocket.json'
+
+        call_command(
+            'benchmark_websocket', connections=6, rooms=2, messages=2, typing=2, users=3,
+            output=str(output)
+        )
+
+        results = json.loads(output.read_text())['results']
+        assert results['accepted'] == 6
+        assert results['messages'] == 12
+        # 3 conexões por sala: cada mensagem chega 3 vezes
+        assert results['deliveries'] == 36
+        assert results['lost_deliveries'] == results['send_errors'] == 0
+        assert results['connect_p50_ms'] <= results['connect_p99_ms']
+        assert results['delivery_p50_ms'] <= results['delivery_p99_ms']
+        assert results['memory_per_connection_kb'] > 0
+        assert not ChatRoom.objects.filter(name__startswith='bench_ws_').exists()
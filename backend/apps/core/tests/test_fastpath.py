@@ -0,0 +1,64 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+from apps.chat.models import ChatParticipant, ChatRoom, Message, MessageAttachment
+from apps.interactions.models import Comment, CommentReaction, Reaction
+from apps.posts.models import Media, Post, SavedPost
+
+
+@pytest.mark.django_db
+class TestFastSerializers:
+    """Listagens rápidas geram o mesmo JSON, byte a byte, que os serializers do DRF"""
+
+    def fetch_both(self, client, url, settings):
+        settings.FAST_SERIALIZERS = False
+        slow = client.get(url)
+        settings.FAST_SERIALIZERS = True
+        fast = client.get(url)
+        assert slow.status_code == fast.status_code == 200
+        return slow.content, fast.content
+
+    def test_post_list(self, auth_client, user_user, plus_user, test_image, settings):
+        """Posts com mídia, avatar, reação e salvo"""
+        plus_user.profile_picture = test_image
+        plus_user.save()
+        post = Post.objects.create(author=plus_user, content='Com mídia', tags=['tech'], region='sul')
+        Media.objects.create(post=post, file=SimpleUploadedFile('a.png', b'x'), media_type='image', order=0)
+        Post.objects.create(author=user_user, content='Sem mídia')
+        Reaction.objects.create(user=user_user, post=post, reaction_type='like')
+        SavedPost.objects.create(user=user_user, post=post)
+
+        slow, fast = self.fetch_both(auth_client(user_user), reverse('post-list'), settings)
+        assert slow == fast
+        assert b'http://testserver/' in fast
+
+    def test_comment_tree(self, auth_client, user_user, pro_user, settings):
+        """Comentários com respostas aninhadas e reação do usuário"""
+        post = Post.objects.create(author=user_user, content='Post')
+        parent = Comment.objects.create(user=pro_user, post=post, content='Pai')
+        reply = Comment.objects.create(user=user_user, post=post, parent=parent, content='Resposta')
+        Comment.objects.create(user=pro_user, post=post, parent=reply, content='Tréplica')
+        CommentReaction.objects.create(user=user_user, comment=parent, reaction_type='like')
+
+        slow, fast = self.fetch_both(
+            auth_client(user_user), reverse('post-comments-list', args=[post.id]), settings
+        )
+        assert slow == fast
+
+    def test_messages(self, auth_client, user_user, plus_user, settings):
+        """Mensagens com anexos e estado de leitura pelos cursores"""
+        room = ChatRoom.objects.create(room_type='group', name='Grupo')
+        room.participants.add(user_user, plus_user)
+        first = Message.objects.create(room=room, sender=user_user, content='Oi')
+        Message.objects.create(room=room, sender=plus_user, content='Olá')
+        MessageAttachment.objects.create(
+            message=first, file=SimpleUploadedFile('doc.txt', b'abc'),
+            filename='doc.txt', file_type='text/plain', file_size=3
+        )
+        ChatParticipant.objects.filter(room=room, user=plus_user).update(last_read_message_id=first.id)
+
+        slow, fast = self.fetch_both(
+            auth_client(user_user), reverse('chat-room-messages', args=[room.id]), settings
+        )
+        assert slow == fast
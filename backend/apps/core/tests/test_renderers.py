@@ -0,0 +1,77 @@
+import datetime
+import decimal
+import io
+import uuid
+import zoneinfo
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from apps.core import jsonlib
+from apps.core.consumers import JSONFramesMixin
+from apps.core.parsers import ORJSONParser
+from apps.core.renderers import ORJSONRenderer
+
+SAO_PAULO = zoneinfo.ZoneInfo('America/Sao_Paulo')
+
+PAYLOADS = [
+    {'id': 1, 'content': 'Olá, ação! 🎉', 'tags': ['tech', 'música'], 'region': ''},
+    {'created_at': datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc)},
+    {'created_at': datetime.datetime(2024, 5, 1, 9, 30, tzinfo=SAO_PAULO)},
+    {'naive': datetime.datetime(2024, 5, 1, 9, 30), 'day': datetime.date(2024, 5, 1), 'at': datetime.time(8, 15)},
+    {'price': decimal.Decimal('19.90'), 'total': decimal.Decimal('100')},
+    {'label': gettext_lazy('Mensal'), 'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678')},
+    {'separators': 'linha\u2028parágrafo\u2029fim', 'quote': 'aspas " e \\ barra'},
+    {'elapsed': datetime.timedelta(minutes=3), 'empty': {}, 'none': None, 'flags': [True, False]},
+    {1: 'chave inteira', 'nested': ReturnList([ReturnDict({'a': 1}, serializer=None)], serializer=None)},
+    ReturnList([{'big': 2 ** 70}], serializer=None),
+    {'ratio': 0.1, 'score': 1.5, 'large': 123456789012345.6, 'small': 0.0001234, 'negative': -0.0},
+    {'huge': 1e16, 'tiny': 1e-7, 'decimal_form': 0.00001, 'max': 1.7976931348623157e308},
+    [1e22, -2.5e-5, 'id 1e5', 5e-324],
+    1e16,
+    [],
+]
+
+
+class TestORJSONRenderer:
+    """Renderer e parser orjson equivalentes aos do DRF"""
+
+    @pytest.mark.parametrize('data', PAYLOADS)
+    def test_render_matches_drf(self, data):
+        """Mesmos bytes que o JSONRenderer do DRF"""
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_indent_uses_drf(self):
+        """Indentação pedida no Accept segue pelo renderer do DRF"""
+        data = {'a': [1, 2]}
+        media_type = 'application/json; indent=4'
+        assert ORJSONRenderer().render(data, media_type) == JSONRenderer().render(data, media_type)
+
+    def test_none_renders_empty(self):
+        assert ORJSONRenderer().render(None) == b''
+
+    def test_unserializable_raises_type_error(self):
+        with pytest.raises(TypeError):
+            jsonlib.dumps({'obj': object()})
+
+    @pytest.mark.parametrize('body', [b'{"a": [1, 2.5, "\xc3\xa7"]}', b'[]', b'"texto"'])
+    def test_parse_matches_drf(self, body):
+        """Parser devolve os mesmos dados do JSONParser"""
+        assert ORJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(io.BytesIO(body))
+
+    @pytest.mark.parametrize('body', [b'{"a": ', b'{"a": NaN}'])
+    def test_parse_error(self, body):
+        """JSON inválido (ou NaN, como no modo estrito do DRF) vira ParseError"""
+        with pytest.raises(ParseError):
+            ORJSONParser().parse(io.BytesIO(body))
+
+    def test_consumer_hook(self):
+        """Frames do websocket codificados e decodificados pelo mesmo JSON rápido"""
+        frame = async_to_sync(JSONFramesMixin.encode_json)({'type': 'message', 'content': 'Olá'})
+        assert frame == '{"type":"message","content":"Olá"}'
+        assert async_to_sync(JSONFramesMixin.decode_json)(frame) == {'type': 'message', 'content': 'Olá'}
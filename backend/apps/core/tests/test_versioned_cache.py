@@ -0,0 +1,109 @@
+import threading
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from apps.accounts.models import Follow
+from apps.core import versioned_cache
+from apps.core.versioned_cache import bump_version, get_or_compute, versioned_key
+from apps.payments.models import Plan
+from apps.posts.models import Post
+
+
+@pytest.mark.django_db
+class TestVersionedCache:
+    """Chaves por versão e proteção contra stampede"""
+
+    def test_bump_changes_key(self):
+        """Escrita na entidade torna a chave anterior inalcançável"""
+        before = versioned_key('lista', ['user_posts:1'], 'a')
+        assert versioned_key('lista', ['user_posts:1'], 'a') == before
+
+        bump_version('user_posts:1')
+        assert versioned_key('lista', ['user_posts:1'], 'a') != before
+        assert versioned_key('lista', ['user_posts:2'], 'a') != before
+
+    def test_computes_once(self):
+        calls = []
+        compute = lambda: calls.append(1) or 'valor'
+        assert get_or_compute('vcache:teste', compute) == 'valor'
+        assert get_or_compute('vcache:teste', compute) == 'valor'
+        assert len(calls) == 1
+
+    def test_waiter_gets_value_from_lock_holder(self):
+        """Sem o lock, aguarda o valor calculado por outro processo"""
+        cache.add('vcache:teste:lock', 1)
+        timer = threading.Timer(0.1, lambda: cache.set('vcache:teste', 'do outro'))
+        timer.start()
+        try:
+            assert get_or_compute('vcache:teste', lambda: pytest.fail('não deveria calcular')) == 'do outro'
+        finally:
+            timer.cancel()
+
+    def test_waiter_gives_up_without_storing(self, monkeypatch):
+        """Se quem tem o lock demora, calcula sem gravar"""
+        monkeypatch.setattr(versioned_cache, 'STAMPEDE_WAIT', 0.1)
+        cache.add('vcache:teste:lock', 1)
+        assert get_or_compute('vcache:teste', lambda: 'local') == 'local'
+        assert cache.get('vcache:teste') is None
+
+
+@pytest.mark.django_db
+class TestCachedViews:
+    """Listas em cache refletem escritas logo após o bump de versão"""
+
+    def test_followers_cached_until_follow(self, auth_client, user_user, plus_user, pro_user,
+                                           django_assert_num_queries):
+        client = auth_client(user_user)
+        url = reverse('followers', args=[pro_user.id])
+        Follow.objects.create(follower=user_user, following=pro_user)
+        assert len(client.get(url).data) == 1
+
+        # Resposta inteira em cache: só a autenticação, já em cache também
+        with django_assert_num_queries(0):
+            assert len(client.get(url).data) == 1
+
+        Follow.objects.create(follower=plus_user, following=pro_user)
+        assert len(client.get(url).data) == 2
+
+        Follow.objects.get(follower=user_user, following=pro_user).delete()
+        assert [f['follower'] for f in client.get(url).data] == [plus_user.id]
+
+    def test_follow_lists_show_renamed_user(self, auth_client, user_user, plus_user):
+        """Só as linhas de Follow ficam em cache: nome novo aparece sem bump de follows"""
+        client = auth_client(user_user)
+        Follow.objects.create(follower=plus_user, following=user_user)
+        followers = reverse('followers', args=[user_user.id])
+        following = reverse('following', args=[plus_user.id])
+        assert client.get(followers).data[0]['follower_username'] == plus_user.username
+        assert client.get(following).data[0]['following_username'] == user_user.username
+
+        plus_user.username = 'renomeado'
+        plus_user.save()
+        assert client.get(followers).data[0]['follower_username'] == 'renomeado'
+        assert client.get(following).data[0]['follower_username'] == 'renomeado'
+
+    def test_user_posts_after_delete(self, auth_client, user_user):
+        """Ids da página em cache; exclusão pela API invalida a lista do autor"""
+        client = auth_client(user_user)
+        first = Post.objects.create(author=user_user, content='Primeiro')
+        Post.objects.create(author=user_user, content='Segundo')
+        url = reverse('user-posts', args=[user_user.id])
+        assert [p['content'] for p in client.get(url).data['results']] == ['Segundo', 'Primeiro']
+
+        assert client.delete(reverse('post-detail', args=[first.id])).status_code == 204
+        assert [p['content'] for p in client.get(url).data['results']] == ['Segundo']
+
+    def test_plans_after_save(self, auth_client, user_user):
+        client = auth_client(user_user)
+        plan = Plan.objects.create(name='Plus', level='plus', price=29.90)
+        url = reverse('plan-list')
+        assert 'Plus Anual' not in str(client.get(url).data)
+
+        plan.name = 'Plus Anual'
+        plan.save()
+        assert 'Plus Anual' in str(client.get(url).data)
+
+        plan.delete()
+        assert 'Plus Anual' not in str(client.get(url).data)
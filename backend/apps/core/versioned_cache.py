@@ -0,0 +1,114 @@
+# backend/apps/core/versioned_cache.py
+"""Cache de leituras invalidado por versão da entidade, sem depender de TTL
+
+Cada entidade tem um contador (ex.: 'user_posts:12'); escritas incrementam o
+contador e a chave das entradas inclui as versões de que dependem, então uma
+escrita torna as entradas antigas inalcançáveis. O TTL só recolhe as órfãs.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import get_language
+from rest_framework.response import Response
+
+VERSIONED_CACHE_TTL = 60 * 60
+# Proteção contra stampede: quem não pegou o lock espera o valor por até STAMPEDE_WAIT
+STAMPEDE_LOCK_TIMEOUT = 10
+STAMPEDE_WAIT = 2.0
+STAMPEDE_POLL = 0.05
+
+_missing = object()
+
+
+def version_key(name):
+    return f'version:{name}'
+
+
+def _initial_version():
+    # Versão nova nunca repete uma anterior, mesmo se o contador for despejado do cache
+    return time.time_ns()
+
+
+def get_versions(*names):
+    """Versões atuais das entidades, na ordem pedida, com uma ida ao cache"""
+    keys = [version_key(name) for name in names]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, _initial_version(), None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def _incr(name):
+    try:
+        cache.incr(version_key(name))
+    except ValueError:
+        cache.set(version_key(name), _initial_version(), None)
+
+
+def bump_version(*names):
+    """Invalida as entradas das entidades; repetido no commit para não recachear dados antigos"""
+    for name in names:
+        _incr(name)
+    transaction.on_commit(lambda: [_incr(name) for name in names])
+
+
+def versioned_key(prefix, names, *parts):
+    versions = get_versions(*names)
+    digest = hashlib.md5(repr((names, versions, parts)).encode()).hexdigest()
+    return f'vcache:{prefix}:{digest}'
+
+
+def get_or_compute(key, compute, timeout=VERSIONED_CACHE_TTL):
+    """Valor em cache ou calculado por um único processo enquanto os demais aguardam"""
+    value = cache.get(key, _missing)
+    if value is not _missing:
+        return value
+
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, STAMPEDE_LOCK_TIMEOUT):
+        try:
+            value = compute()
+            cache.set(key, value, timeout)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    deadline = time.monotonic() + STAMPEDE_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(STAMPEDE_POLL)
+        value = cache.get(key, _missing)
+        if value is not _missing:
+            return value
+
+    # Quem calculava demorou demais: calcula sem gravar para não competir com ele
+    return compute()
+
+
+def cached(prefix, names, parts, compute, timeout=VERSIONED_CACHE_TTL):
+    """get_or_compute com a chave derivada das versões de `names` e de `parts`"""
+    return get_or_compute(versioned_key(prefix, names, *parts), compute, timeout)
+
+
+class CachedListMixin:
+    """list() com a resposta inteira em cache, para listas sem estado por usuário, contadores
+    nem dados de outras entidades (que mudariam sem bump da versão)
+
+    A view define cache_prefix e get_cache_versions() (entidades de que a lista depende).
+    """
+    cache_prefix = None
+
+    def get_cache_versions(self):
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        data = cached(
+            self.cache_prefix,
+            self.get_cache_versions(),
+            (request.build_absolute_uri(), get_language()),
+            lambda: super(CachedListMixin, self).list(request, *args, **kwargs).data
+        )
+        return Response(data)
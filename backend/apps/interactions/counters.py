@@ -0,0 +1,7 @@
+# backend/apps/interactions/counters.py
+from apps.core.counters import BufferedCounter
+
+from .models import Comment
+
+comment_replies = BufferedCounter(Comment, 'replies_count', source=('interactions.Comment', 'parent'))
+comment_reactions = BufferedCounter(Comment, 'reactions_count', source=('interactions.CommentReaction', 'comment'))
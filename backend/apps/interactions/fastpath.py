@@ -0,0 +1,25 @@
+# backend/apps/interactions/fastpath.py
+from apps.accounts.cards import represent_user_card
+from apps.core.fastpath import format_datetime
+
+
+def render_comments(comments, context):
+    """Saída de CommentSerializer(many=True) para árvores carregadas por load_comment_threads"""
+    return [
+        {
+            'id': comment.id,
+            'user': represent_user_card(comment.user_id, context),
+            'post': comment.post_id,
+            'content': comment.content,
+            'parent': comment.parent_id,
+            'reactions_count': comment.reactions_count,
+            'replies_count': comment.replies_count,
+            'is_edited': comment.is_edited,
+            'is_active': comment.is_active,
+            'created_at': format_datetime(comment.created_at),
+            'updated_at': format_datetime(comment.updated_at),
+            'replies': render_comments(comment.loaded_replies, context),
+            'user_reaction': comment.viewer_reaction,
+        }
+        for comment in comments
+    ]
@@ -0,0 +1,95 @@
+# backend/apps/interactions/loaders.py
+from collections import defaultdict
+
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from .models import Comment, CommentReaction
+
+# Respostas exibidas por comentário e níveis de aninhamento carregados
+COMMENT_REPLIES_LIMIT = 5
+COMMENT_REPLIES_DEPTH = 3
+
+
+def first_replies(parent_ids, limit=COMMENT_REPLIES_LIMIT):
+    """Primeiras respostas ativas de cada comentário pai (ROW_NUMBER por pai)"""
+    return Comment.objects.filter(
+        parent_id__in=parent_ids,
+        is_active=True
+    ).annotate(
+        position=Window(
+            expression=RowNumber(),
+            partition_by=[F('parent_id')],
+            order_by=[F('created_at').asc(), F('id').asc()],
+        )
+    ).filter(position__lte=limit).order_by('parent_id', 'created_at', 'id')
+
+
+def comment_tree(parent_ids, limit=COMMENT_REPLIES_LIMIT, depth=COMMENT_REPLIES_DEPTH):
+    """{parent_id: [reply_id, ...]} dos níveis carregados; só ids, para guardar em cache"""
+    tree = {}
+    level = list(parent_ids)
+    for _ in range(depth):
+        if not level:
+            break
+
+        rows = first_replies(level, limit).values_list('parent_id', 'id')
+        level = []
+        for parent_id, reply_id in rows:
+            tree.setdefault(parent_id, []).append(reply_id)
+            level.append(reply_id)
+    return tree
+
+
+def load_comment_threads(comments, user, limit=COMMENT_REPLIES_LIMIT, depth=COMMENT_REPLIES_DEPTH, tree=None):
+    """Anexa respostas e reação do usuário a uma página de comentários com queries fixas
+
+    Com `tree` (ver comment_tree) as respostas vêm por pk, sem as queries por nível.
+    """
+    comments = list(comments)
+    loaded = list(comments)
+
+    rows = {}
+    if tree:
+        # Toda a árvore numa única query por pk
+        rows = Comment.objects.filter(
+            pk__in=[reply_id for reply_ids in tree.values() for reply_id in reply_ids],
+            is_active=True
+        ).in_bulk()
+
+    level = comments
+    for _ in range(depth):
+        if not level:
+            break
+
+        if tree is not None:
+            replies = {
+                comment.id: [rows[reply_id] for reply_id in tree.get(comment.id, []) if reply_id in rows]
+                for comment in level
+            }
+        else:
+            replies = defaultdict(list)
+            for reply in first_replies([comment.id for comment in level], limit):
+                replies[reply.parent_id].append(reply)
+
+        for comment in level:
+            comment.loaded_replies = replies.get(comment.id, [])
+
+        level = [reply for comment in level for reply in comment.loaded_replies]
+        loaded.extend(level)
+
+    # Último nível carregado: respostas mais profundas ficam em replies_count
+    for comment in level:
+        comment.loaded_replies = []
+
+    reactions = {}
+    if user is not None and user.is_authenticated and loaded:
+        reactions = dict(CommentReaction.objects.filter(
+            user=user,
+            comment_id__in=[comment.id for comment in loaded]
+        ).values_list('comment_id', 'reaction_type'))
+
+    for comment in loaded:
+        comment.viewer_reaction = reactions.get(comment.id)
+
+    return comments
@@ -0,0 +1,7 @@
+# backend/apps/interactions/pagination.py
+from apps.core.pagination import CachedKeysetPagination
+
+
+class CommentPagination(CachedKeysetPagination):
+    """Comentários de primeiro nível em ordem cronológica (ids da página em cache)"""
+    ordering = ('created_at', 'id')
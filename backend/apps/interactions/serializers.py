@@ -1,23 +1,61 @@
 # backend/apps/interactions/serializers.py
+from django.db import models
 from rest_framework import serializers
 from .models import Reaction, Comment, CommentReaction
-from apps.accounts.serializers import UserSerializer
+from .fastpath import render_comments
+from .loaders import load_comment_threads
+from apps.accounts.cards import load_user_cards
+from apps.accounts.serializers import UserCardField
+from apps.core.fastpath import fast_serializers_enabled
+
+class ReactionListSerializer(serializers.ListSerializer):
+    """Carrega os cartões dos autores da página em uma ida ao cache"""
+    
+    def to_representation(self, data):
+        reactions = list(data.all() if isinstance(data, models.Manager) else data)
+        load_user_cards(self.context, [reaction.user_id for reaction in reactions])
+        return super().to_representation(reactions)
 
 class ReactionSerializer(serializers.ModelSerializer):
-    user = UserSerializer(read_only=True)
+    user = UserCardField()
     
     class Meta:
         model = Reaction
+        list_serializer_class = ReactionListSerializer
         fields = ['id', 'user', 'reaction_type', 'created_at']
         read_only_fields = ['created_at']
 
+def _thread_user_ids(comments):
+    """Autores dos comentários e de todas as respostas carregadas"""
+    user_ids = set()
+    while comments:
+        user_ids.update(comment.user_id for comment in comments)
+        comments = [reply for comment in comments for reply in getattr(comment, 'loaded_replies', [])]
+    return user_ids
+
+class CommentListSerializer(serializers.ListSerializer):
+    """Carrega a árvore de respostas e as reações do usuário da página em lote"""
+    
+    def to_representation(self, data):
+        comments = list(data.all() if isinstance(data, models.Manager) else data)
+        if not all(hasattr(comment, 'loaded_replies') for comment in comments):
+            request = self.context.get('request')
+            load_comment_threads(
+                comments, request.user if request else None, tree=self.context.get('comment_tree')
+            )
+        load_user_cards(self.context, _thread_user_ids(comments))
+        if fast_serializers_enabled() and type(self.child) is CommentSerializer:
+            return render_comments(comments, self.context)
+        return super().to_representation(comments)
+
 class CommentSerializer(serializers.ModelSerializer):
-    user = UserSerializer(read_only=True)
+    user = UserCardField()
     replies = serializers.SerializerMethodField()
     user_reaction = serializers.SerializerMethodField()
     
     class Meta:
         model = Comment
+        list_serializer_class = CommentListSerializer
         fields = [
             'id', 'user', 'post', 'content', 'parent',
             'reactions_count', 'replies_count',
@@ -30,6 +68,9 @@ class CommentSerializer(serializers.ModelSerializer):
         ]
     
     def get_replies(self, obj):
+        if hasattr(obj, 'loaded_replies'):
+            return CommentSerializer(obj.loaded_replies, many=True, context=self.context).data
+        
         if obj.replies.exists():
             return CommentSerializer(
                 obj.replies.filter(is_active=True)[:5],
@@ -39,6 +80,9 @@ class CommentSerializer(serializers.ModelSerializer):
         return []
     
     def get_user_reaction(self, obj):
+        if hasattr(obj, 'viewer_reaction'):
+            return obj.viewer_reaction
+        
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             try:
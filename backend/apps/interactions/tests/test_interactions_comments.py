@@ -1,8 +1,12 @@
 import pytest
 from rest_framework import status
 from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from apps.posts.models import Post
-from apps.interactions.models import Comment
+from apps.accounts.cards import get_user_cards
+from apps.interactions.loaders import COMMENT_REPLIES_DEPTH
+from apps.interactions.models import Comment, CommentReaction
 
 @pytest.mark.django_db
 class TestComments:
@@ -57,7 +61,7 @@ class TestComments:
         response = client.get(url)
         
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 2
+        assert len(response.data['results']) == 2
     
     def test_update_own_comment(self, auth_client, pro_user, user_user):
         """Testa atualizar próprio comentário"""
@@ -135,4 +139,105 @@ class TestComments:
         
         assert response.status_code == status.HTTP_200_OK
         comment.refresh_from_db()
-        assert comment.reactions_count == 1
\ No newline at end of file
+        assert comment.reactions_count == 1
+
+@pytest.mark.django_db
+class TestCommentThreads:
+    """Testes para o carregamento em lote da árvore de comentários"""
+
+    def build_thread(self, post, author, top_level, replies):
+        for i in range(top_level):
+            parent = Comment.objects.create(user=author, post=post, content=f"Comentário {i}")
+            for j in range(replies):
+                reply = Comment.objects.create(user=author, post=post, content=f"Resposta {j}", parent=parent)
+                Comment.objects.create(user=author, post=post, content="Tréplica", parent=reply)
+
+    def test_replies_are_limited_per_parent(self, auth_client, pro_user, user_user):
+        """Cada comentário traz apenas as primeiras respostas, em ordem"""
+        post = Post.objects.create(author=user_user, content="Post")
+        self.build_thread(post, pro_user, top_level=2, replies=7)
+
+        client = auth_client(user_user)
+        response = client.get(reverse('post-comments-list', args=[post.id]))
+
+        assert response.status_code == status.HTTP_200_OK
+        for comment in response.data['results']:
+            assert [r['content'] for r in comment['replies']] == [f"Resposta {j}" for j in range(5)]
+            assert all(r['replies'][0]['content'] == "Tréplica" for r in comment['replies'])
+
+    def test_viewer_reactions_are_attached(self, auth_client, pro_user, user_user):
+        """Reação do usuário aparece em comentários e respostas"""
+        post = Post.objects.create(author=user_user, content="Post")
+        parent = Comment.objects.create(user=pro_user, post=post, content="Pai")
+        reply = Comment.objects.create(user=pro_user, post=post, content="Filho", parent=parent)
+        CommentReaction.objects.create(user=user_user, comment=reply, reaction_type='wow')
+
+        client = auth_client(user_user)
+        response = client.get(reverse('post-comments-list', args=[post.id]))
+
+        comment = response.data['results'][0]
+        assert comment['user_reaction'] is None
+        assert comment['replies'][0]['user_reaction'] == 'wow'
+
+    def test_constant_queries(self, auth_client, pro_user, user_user):
+        """Número de queries não depende da quantidade de comentários"""
+        client = auth_client(user_user)
+        small_post = Post.objects.create(author=user_user, content="Pequeno")
+        big_post = Post.objects.create(author=user_user, content="Grande")
+        self.build_thread(small_post, pro_user, top_level=1, replies=1)
+        self.build_thread(big_post, pro_user, top_level=6, replies=4)
+        # Cartões dos autores já em cache, como em regime normal
+        get_user_cards([pro_user.id])
+
+        def count_queries(post):
+            with CaptureQueriesContext(connection) as ctx:
+                client.get(reverse('post-comments-list', args=[post.id]))
+            return len(ctx.captured_queries)
+
+        assert count_queries(big_post) == count_queries(small_post)
+
+    def test_comments_budget(self, auth_client, pro_user, user_user, query_budget):
+        """Árvore de comentários: uma query por nível de respostas, não por comentário"""
+        post = Post.objects.create(author=user_user, content="Post")
+        self.build_thread(post, pro_user, top_level=6, replies=3)
+        client = auth_client(user_user)
+
+        url = reverse('post-comments-list', args=[post.id])
+
+        # Cache frio: ids da página, linhas, um nível de respostas por query,
+        # linhas das respostas, reações e cartões dos autores
+        with query_budget(5 + COMMENT_REPLIES_DEPTH, max_repeats=COMMENT_REPLIES_DEPTH):
+            response = client.get(url)
+        assert len(response.data['results']) == 6
+
+        # Ids em cache: só as linhas da página, das respostas e as reações
+        with query_budget(3, max_repeats=1):
+            cached = client.get(url)
+        assert cached.data == response.data
+
+    def test_new_reply_invalidates_cached_tree(self, auth_client, pro_user, user_user):
+        """Resposta nova aparece logo na listagem em cache"""
+        post = Post.objects.create(author=user_user, content="Post")
+        self.build_thread(post, pro_user, top_level=1, replies=1)
+        url = reverse('post-comments-list', args=[post.id])
+        parent_id = auth_client(user_user).get(url).data['results'][0]['id']
+
+        response = auth_client(pro_user).post(url, {'content': 'Nova', 'parent': parent_id})
+        assert response.status_code == status.HTTP_201_CREATED
+
+        replies = auth_client(user_user).get(url).data['results'][0]['replies']
+        assert [r['content'] for r in replies] == ["Resposta 0", "Nova"]
+
+    def test_top_level_cursor_pagination(self, auth_client, pro_user, user_user):
+        """Comentários de primeiro nível são paginados por cursor"""
+        post = Post.objects.create(author=user_user, content="Post")
+        self.build_thread(post, pro_user, top_level=3, replies=0)
+
+        client = auth_client(user_user)
+        url = reverse('post-comments-list', args=[post.id])
+        first = client.get(url, {'page_size': 2})
+        second = client.get(first.data['next'])
+
+        contents = [c['content'] for c in first.data['results'] + second.data['results']]
+        assert contents == ["Comentário 0", "Comentário 1", "Comentário 2"]
+        assert second.data['next'] is None
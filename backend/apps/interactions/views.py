@@ -5,16 +5,20 @@ from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied, ValidationError
 from django.shortcuts import get_object_or_404
 from django.db import transaction
-from django.db.models import F
 
+from .counters import comment_reactions, comment_replies
 from .models import Reaction, Comment, CommentReaction
+from .loaders import comment_tree
+from .pagination import CommentPagination
 from .serializers import (
     ReactionSerializer, CommentSerializer,
     CommentCreateSerializer
 )
+from apps.posts.counters import post_comments, post_reactions
 from apps.posts.models import Post
 from apps.accounts.permissions import CanReact, CanComment
-from apps.accounts.models import UserActivity
+from apps.accounts.activity import record_activity
+from apps.core.versioned_cache import bump_version, cached
 
 
 class ReactionViewSet(viewsets.GenericViewSet):
@@ -47,18 +51,18 @@ class ReactionViewSet(viewsets.GenericViewSet):
             if not created:
                 if reaction.reaction_type == reaction_type:
                     reaction.delete()
-                    Post.objects.filter(pk=post.id).update(reactions_count=F('reactions_count') - 1)
+                    post_reactions.incr(post.id, -1)
                     return Response({'message': 'Reação removida'})
 
                 reaction.reaction_type = reaction_type
                 reaction.save(update_fields=['reaction_type', 'updated_at'])
                 return Response({'message': 'Reação atualizada'})
 
-            Post.objects.filter(pk=post.id).update(reactions_count=F('reactions_count') + 1)
+            post_reactions.incr(post.id)
 
-            UserActivity.objects.create(
-                user=request.user,
-                activity_type='reaction',
+            record_activity(
+                request.user,
+                'reaction',
                 target_id=post.id,
                 metadata={'reaction': reaction_type}
             )
@@ -72,14 +76,31 @@ class ReactionViewSet(viewsets.GenericViewSet):
 class CommentViewSet(viewsets.ModelViewSet):
     """ViewSet para comentários"""
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = None
+    pagination_class = CommentPagination
+
+    cache_prefix = 'post_comments'
+
+    def get_cache_versions(self):
+        return [f"post_comments:{self.kwargs['post_pk']}"]
 
     def get_queryset(self):
+        # Respostas e reações do usuário são carregadas em lote pelo CommentListSerializer
         return Comment.objects.filter(
             post_id=self.kwargs['post_pk'],
             parent=None,
             is_active=True
-        ).select_related('user').prefetch_related('replies')
+        )
+
+    def list(self, request, *args, **kwargs):
+        # Ids da página (CommentPagination) e da árvore de respostas em cache versionado;
+        # as linhas sempre vêm do banco, com contadores atuais
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        comment_ids = [comment.id for comment in page]
+        tree = cached('comment_tree', self.get_cache_versions(), (comment_ids,), lambda: comment_tree(comment_ids))
+
+        serializer = self.get_serializer(page, many=True)
+        serializer.context['comment_tree'] = tree
+        return self.get_paginated_response(serializer.data)
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -106,22 +127,20 @@ class CommentViewSet(viewsets.ModelViewSet):
             raise ValidationError({'parent': 'Comentário pai inválido para este post.'})
 
         comment = serializer.save()
+        bump_version(f'post_comments:{comment.post_id}')
 
-        Post.objects.filter(pk=comment.post_id).update(comments_count=F('comments_count') + 1)
+        post_comments.incr(comment.post_id)
 
         if comment.parent_id:
-            Comment.objects.filter(pk=comment.parent_id).update(replies_count=F('replies_count') + 1)
+            comment_replies.incr(comment.parent_id)
 
-        UserActivity.objects.create(
-            user=self.request.user,
-            activity_type='comment',
-            target_id=comment.post_id
-        )
+        record_activity(self.request.user, 'comment', target_id=comment.post_id)
 
     def perform_update(self, serializer):
         if serializer.instance.user_id != self.request.user.id:
             raise PermissionDenied('Você não pode editar este comentário')
-        serializer.save(is_edited=True)
+        comment = serializer.save(is_edited=True)
+        bump_version(f'post_comments:{comment.post_id}')
 
     def perform_destroy(self, instance):
         if instance.user_id != self.request.user.id:
@@ -130,10 +149,11 @@ class CommentViewSet(viewsets.ModelViewSet):
         post_id = instance.post_id
         parent_id = instance.parent_id
         instance.delete()
+        bump_version(f'post_comments:{post_id}')
 
-        Post.objects.filter(pk=post_id).update(comments_count=F('comments_count') - 1)
+        post_comments.incr(post_id, -1)
         if parent_id:
-            Comment.objects.filter(pk=parent_id).update(replies_count=F('replies_count') - 1)
+            comment_replies.incr(parent_id, -1)
 
     @action(detail=True, methods=['post'])
     def react(self, request, post_pk=None, pk=None):
@@ -162,12 +182,12 @@ class CommentViewSet(viewsets.ModelViewSet):
         if not created:
             if reaction.reaction_type == reaction_type:
                 reaction.delete()
-                Comment.objects.filter(pk=comment.id).update(reactions_count=F('reactions_count') - 1)
+                comment_reactions.incr(comment.id, -1)
                 return Response({'message': 'Reação removida'})
 
             reaction.reaction_type = reaction_type
             reaction.save(update_fields=['reaction_type'])
             return Response({'message': 'Reação atualizada'})
 
-        Comment.objects.filter(pk=comment.id).update(reactions_count=F('reactions_count') + 1)
+        comment_reactions.incr(comment.id)
         return Response({'message': 'Reação adicionada'})
@@ -25,6 +25,17 @@ class Plan(models.Model):
     def __str__(self):
         return f"{self.name} - R${self.price}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        from apps.core.versioned_cache import bump_version
+        bump_version('plans')
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        from apps.core.versioned_cache import bump_version
+        bump_version('plans')
+        return result
+
 class Subscription(models.Model):
     """Assinatura do usuário"""
     STATUS_CHOICES = [
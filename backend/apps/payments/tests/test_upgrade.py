@@ -110,4 +110,21 @@ class TestUpgradeSystem:
         assert response.status_code == status.HTTP_200_OK
         subscription = Subscription.objects.get(user=plus_user)
         assert subscription.status == 'cancelled'
-        assert subscription.auto_renew is False
\ No newline at end of file
+        assert subscription.auto_renew is False
+
+@pytest.mark.django_db
+class TestPlanConditionalGet:
+    """ETag na listagem de planos"""
+
+    def test_plan_list_not_modified(self, auth_client, user_user, create_plan):
+        """Lista inalterada responde 304; alterar um plano muda o ETag"""
+        client = auth_client(user_user)
+        url = reverse('plan-list')
+        etag = client.get(url)['ETag']
+
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+        plan = Plan.objects.get(level=UserLevel.PLUS)
+        plan.price = 39.90
+        plan.save()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
@@ -4,19 +4,47 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils.translation import get_language
 
 from .models import Plan, Subscription, Payment
 from .serializers import (
     PlanSerializer, SubscriptionSerializer,
     PaymentSerializer, PaymentCreateSerializer
 )
-from apps.accounts.models import UserActivity, UserLevel
+from apps.accounts.activity import record_activity
+from apps.accounts.models import UserLevel
+from apps.core.conditional import ConditionalGetMixin, make_etag
+from apps.core.versioned_cache import CachedListMixin
 
-class PlanViewSet(viewsets.ReadOnlyModelViewSet):
+class PlanViewSet(ConditionalGetMixin, CachedListMixin, viewsets.ReadOnlyModelViewSet):
     """Listar planos disponíveis"""
     queryset = Plan.objects.filter(is_active=True)
     serializer_class = PlanSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cache_prefix = 'plans'
+
+    def get_cache_versions(self):
+        return ['plans']
+    
+    def get_validators(self):
+        # level_display é traduzido: o idioma entra no ETag
+        if self.action == 'retrieve':
+            updated_at = Plan.objects.filter(pk=self.kwargs['pk'], is_active=True).values_list(
+                'updated_at', flat=True
+            ).first()
+            if updated_at is None:
+                return None
+            return make_etag(updated_at, get_language()), updated_at
+        
+        # Desativar um plano também atualiza updated_at; a contagem cobre exclusões
+        state = Plan.objects.aggregate(
+            last_updated=Max('updated_at'),
+            active=Count('pk', filter=Q(is_active=True))
+        )
+        return make_etag(
+            state['last_updated'], state['active'], self.request.get_full_path(), get_language()
+        ), state['last_updated']
 
 class SubscriptionViewSet(viewsets.GenericViewSet):
     """Gerenciar assinaturas"""
@@ -122,9 +150,9 @@ class PaymentViewSet(viewsets.GenericViewSet):
         request.user.save()
         
         # Registrar atividade
-        UserActivity.objects.create(
-            user=request.user,
-            activity_type='upgrade',
+        record_activity(
+            request.user,
+            'upgrade',
             metadata={
                 'from_level': old_level,
                 'to_level': plan.level,
@@ -0,0 +1,9 @@
+# backend/apps/posts/counters.py
+from apps.core.counters import BufferedCounter
+
+from .models import Post
+
+# Acumulados e gravados periodicamente por apps.core.tasks.flush_counters
+post_views = BufferedCounter(Post, 'views_count')
+post_reactions = BufferedCounter(Post, 'reactions_count', source=('interactions.Reaction', 'post'))
+post_comments = BufferedCounter(Post, 'comments_count', source=('interactions.Comment', 'post'))
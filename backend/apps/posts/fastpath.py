@@ -0,0 +1,41 @@
+# backend/apps/posts/fastpath.py
+from apps.accounts.cards import represent_user_card
+from apps.core.fastpath import file_url, format_datetime
+
+
+def render_media(media, request=None):
+    """Saída de MediaSerializer(many=True)"""
+    return [
+        {
+            'id': item.id,
+            'file': file_url(item.file, request),
+            'media_type': item.media_type,
+            'order': item.order,
+        }
+        for item in media
+    ]
+
+
+def render_posts(posts, context):
+    """Saída de PostSerializer(many=True) para posts com estado do usuário e cartões já carregados"""
+    request = context.get('request')
+    return [
+        {
+            'id': post.id,
+            'author': represent_user_card(post.author_id, context),
+            'content': post.content,
+            'media': render_media(post.media.all(), request),
+            'tags': post.tags,
+            'region': post.region,
+            'reactions_count': post.reactions_count,
+            'comments_count': post.comments_count,
+            'shares_count': post.shares_count,
+            'views_count': post.views_count,
+            'is_edited': post.is_edited,
+            'created_at': format_datetime(post.created_at),
+            'updated_at': format_datetime(post.updated_at),
+            'user_reaction': post.viewer_reaction,
+            'is_saved': post.viewer_saved,
+        }
+        for post in posts
+    ]
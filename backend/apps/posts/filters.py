@@ -0,0 +1,23 @@
+# backend/apps/posts/filters.py
+import django_filters
+
+from .models import Post
+
+
+class TagsFilter(django_filters.BaseInFilter, django_filters.CharFilter):
+    """Lista de tags separadas por vírgula; casa posts com qualquer uma delas"""
+
+
+class PostFilter(django_filters.FilterSet):
+    # ?| no PostgreSQL, atendido pelo índice GIN de Post.tags
+    tags = TagsFilter(field_name='tags', lookup_expr='has_any_keys')
+
+    class Meta:
+        model = Post
+        fields = ['region', 'tags', 'author']
+
+
+class TimelineFilter(PostFilter):
+    class Meta:
+        model = Post
+        fields = ['region', 'tags']
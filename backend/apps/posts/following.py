@@ -0,0 +1,98 @@
+# backend/apps/posts/following.py
+from django.core.cache import cache
+from django.db import connection
+
+from apps.accounts.models import Follow
+from .models import Post
+
+# Posts mais recentes dos seguidos mantidos em cache por usuário
+FOLLOWING_FEED_WINDOW = 200
+FOLLOWING_FEED_TTL = 60
+
+
+def following_feed_key(user_id):
+    return f'following_feed:{user_id}'
+
+
+def invalidate_following_feed(user_id):
+    """Descarta a janela em cache (ex.: ao seguir ou deixar de seguir alguém)"""
+    cache.delete(following_feed_key(user_id))
+
+
+def merged_following_posts(user_id, before=None, limit=20):
+    """(id, created_at) dos posts dos seguidos, mesclados por um LATERAL por seguido
+
+    Cada seguido contribui com no máximo `limit` linhas lidas do índice
+    (author, -created_at); o banco só ordena essas linhas, nunca o histórico inteiro.
+    """
+    quote = connection.ops.quote_name
+    post_table = quote(Post._meta.db_table)
+    follow_table = quote(Follow._meta.db_table)
+
+    cursor_filter = ''
+    params = []
+    if before is not None:
+        created_at, post_id = before
+        cursor_filter = 'AND p.created_at <= %s AND (p.created_at < %s OR p.id < %s)'
+        params = [created_at, created_at, post_id]
+
+    sql = f'''
+        SELECT latest.id, latest.created_at
+        FROM {follow_table} AS f
+        CROSS JOIN LATERAL (
+            SELECT p.id, p.created_at
+            FROM {post_table} AS p
+            WHERE p.author_id = f.following_id AND p.is_active {cursor_filter}
+            ORDER BY p.created_at DESC, p.id DESC
+            LIMIT %s
+        ) AS latest
+        WHERE f.follower_id = %s
+        ORDER BY latest.created_at DESC, latest.id DESC
+        LIMIT %s
+    '''
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + [limit, user_id, limit])
+        return cursor.fetchall()
+
+
+class FollowingFeed:
+    """Feed dos perfis seguidos; a primeira janela fica em cache, o resto vem do LATERAL"""
+
+    def __init__(self, user, queryset):
+        self.user = user
+        self.queryset = queryset
+
+    def window(self):
+        entries = cache.get(following_feed_key(self.user.id))
+        if entries is None:
+            entries = merged_following_posts(self.user.id, limit=FOLLOWING_FEED_WINDOW)
+            cache.set(following_feed_key(self.user.id), entries, FOLLOWING_FEED_TTL)
+        return entries
+
+    def entries(self, position, limit):
+        """Até `limit` entradas (id, created_at) após a posição (created_at, id)"""
+        window = self.window()
+        if position is None:
+            entries = window[:limit]
+        else:
+            created_at, post_id = position
+            entries = [
+                (entry_id, entry_created) for entry_id, entry_created in window
+                if (entry_created, entry_id) < (created_at, post_id)
+            ][:limit]
+
+        # Janela completa esgotada: continua direto no banco
+        if len(entries) < limit and len(window) >= FOLLOWING_FEED_WINDOW:
+            last = entries[-1] if entries else None
+            before = (last[1], last[0]) if last else position
+            entries += merged_following_posts(self.user.id, before, limit - len(entries))
+
+        return entries
+
+    def page(self, position, limit):
+        """Posts após a posição (created_at, id) do cursor"""
+        post_ids = [post_id for post_id, _ in self.entries(position, limit)]
+        if not post_ids:
+            return []
+        posts = {post.id: post for post in self.queryset.filter(id__in=post_ids)}
+        return [posts[post_id] for post_id in post_ids if post_id in posts]
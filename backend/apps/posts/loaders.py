@@ -0,0 +1,32 @@
+# backend/apps/posts/loaders.py
+from django.db.models import Exists, OuterRef, Subquery
+
+from .models import Post, SavedPost
+
+
+def load_viewer_state(posts, user):
+    """Anexa reação e estado de salvo do usuário a uma página de posts em uma única query"""
+    posts = [post for post in posts if post is not None]
+    if not posts:
+        return posts
+
+    if user is None or not user.is_authenticated:
+        for post in posts:
+            post.viewer_reaction = None
+            post.viewer_saved = False
+        return posts
+
+    from apps.interactions.models import Reaction
+
+    rows = Post.objects.filter(id__in={post.id for post in posts}).annotate(
+        viewer_reaction=Subquery(
+            Reaction.objects.filter(post=OuterRef('pk'), user=user).values('reaction_type')[:1]
+        ),
+        viewer_saved=Exists(SavedPost.objects.filter(post=OuterRef('pk'), user=user)),
+    ).values_list('id', 'viewer_reaction', 'viewer_saved')
+
+    state = {post_id: (reaction, saved) for post_id, reaction, saved in rows}
+    for post in posts:
+        post.viewer_reaction, post.viewer_saved = state.get(post.id, (None, False))
+
+    return posts
@@ -0,0 +1,103 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:59
+
+import apps.posts.models
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Post',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content', models.TextField(max_length=2000, verbose_name='Conteúdo')),
+                ('tags', models.JSONField(blank=True, default=list, verbose_name='Tags')),
+                ('region', models.CharField(blank=True, max_length=100, verbose_name='Região')),
+                ('reactions_count', models.PositiveIntegerField(default=0, verbose_name='Reações')),
+                ('comments_count', models.PositiveIntegerField(default=0, verbose_name='Comentários')),
+                ('shares_count', models.PositiveIntegerField(default=0, verbose_name='Compartilhamentos')),
+                ('views_count', models.PositiveIntegerField(default=0, verbose_name='Visualizações')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Ativo')),
+                ('is_edited', models.BooleanField(default=False, verbose_name='Editado')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='posts', to=settings.AUTH_USER_MODEL, verbose_name='Autor')),
+            ],
+            options={
+                'verbose_name': 'Post',
+                'verbose_name_plural': 'Posts',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Report',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reason', models.CharField(choices=[('spam', 'Spam'), ('harassment', 'Assédio'), ('hate_speech', 'Discurso de ódio'), ('violence', 'Violência'), ('nudity', 'Nudez'), ('other', 'Outro')], max_length=20)),
+                ('description', models.TextField(blank=True, max_length=500)),
+                ('is_resolved', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reports', to='posts.post')),
+                ('reporter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reports_made', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Denúncia',
+                'verbose_name_plural': 'Denúncias',
+            },
+        ),
+        migrations.CreateModel(
+            name='Media',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(upload_to=apps.posts.models.post_media_path, validators=[django.core.validators.FileExtensionValidator(['jpg', 'jpeg', 'png', 'gif', 'mp4', 'webm'])], verbose_name='Arquivo')),
+                ('media_type', models.CharField(choices=[('image', 'Imagem'), ('video', 'Vídeo'), ('gif', 'GIF')], max_length=10, verbose_name='Tipo de mídia')),
+                ('order', models.PositiveSmallIntegerField(default=0, verbose_name='Ordem')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='media', to='posts.post', verbose_name='Post')),
+            ],
+            options={
+                'verbose_name': 'Mídia',
+                'verbose_name_plural': 'Mídias',
+                'ordering': ['order'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SavedPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_by', to='posts.post')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_posts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Post salvo',
+                'verbose_name_plural': 'Posts salvos',
+                'unique_together': {('user', 'post')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-created_at'], name='posts_post_created_183a3b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-created_at'], name='posts_post_author__f8ea20_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['region'], name='posts_post_region_b343c5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['tags'], name='posts_post_tags_025b77_idx'),
+        ),
+    ]
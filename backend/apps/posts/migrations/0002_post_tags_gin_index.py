@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:59
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='posts_post_tags_025b77_idx',
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tags'], name='posts_post_tags_gin'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 # backend/apps/posts/models.py
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
 from django.core.validators import FileExtensionValidator
 from django.contrib.auth import get_user_model
 import os
@@ -58,16 +59,17 @@ class Post(models.Model):
             models.Index(fields=['-created_at']),
             models.Index(fields=['author', '-created_at']),
             models.Index(fields=['region']),
-            models.Index(fields=['tags']),
+            # jsonb_ops: atende o operador ?| (has_any_keys) usado nos filtros de tags
+            GinIndex(fields=['tags'], name='posts_post_tags_gin'),
         ]
     
     def __str__(self):
         return f"Post de {self.author.username} - {self.created_at.strftime('%d/%m/%Y')}"
     
     def increment_views(self):
-        """Incrementa contador de visualizações"""
-        self.views_count += 1
-        self.save(update_fields=['views_count'])
+        """Incrementa contador de visualizações direto no banco (a API usa o buffer)"""
+        Post.objects.filter(pk=self.pk).update(views_count=models.F('views_count') + 1)
+        self.refresh_from_db(fields=['views_count'])
 
 class Media(models.Model):
     MEDIA_TYPES = [
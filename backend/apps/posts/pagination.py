@@ -0,0 +1,9 @@
+# backend/apps/posts/pagination.py
+from apps.core.pagination import KeysetPagination
+
+
+class TimelinePagination(KeysetPagination):
+    """Cursor lido direto do feed (timeline ou seguidos), que expõe page(position, limit)"""
+
+    def get_page(self, feed, position, limit):
+        return feed.page(position, limit)
@@ -1,26 +1,49 @@
 # backend/apps/posts/serializers.py
+from django.db import models
 from rest_framework import serializers
 from .models import Post, Media, SavedPost, Report
-from apps.accounts.serializers import UserSerializer
+from .fastpath import render_posts
+from .loaders import load_viewer_state
+from apps.accounts.cards import load_user_cards
+from apps.accounts.serializers import UserCardField
+from apps.core.fastpath import fast_serializers_enabled
 
 class MediaSerializer(serializers.ModelSerializer):
     class Meta:
         model = Media
         fields = ['id', 'file', 'media_type', 'order']
 
+def _request_user(serializer):
+    request = serializer.context.get('request')
+    return request.user if request else None
+
+class PostListSerializer(serializers.ListSerializer):
+    """Carrega o estado do usuário (reação/salvo) da página inteira antes de serializar"""
+    
+    def to_representation(self, data):
+        posts = list(data.all() if isinstance(data, models.Manager) else data)
+        load_viewer_state(posts, _request_user(self))
+        load_user_cards(self.context, [post.author_id for post in posts])
+        # Subclasses com outros campos seguem pelo caminho do DRF
+        if fast_serializers_enabled() and type(self.child) is PostSerializer:
+            return render_posts(posts, self.context)
+        return super().to_representation(posts)
+
 class PostSerializer(serializers.ModelSerializer):
-    author = UserSerializer(read_only=True)
+    author = UserCardField()
     media = MediaSerializer(many=True, read_only=True)
     user_reaction = serializers.SerializerMethodField()
+    is_saved = serializers.SerializerMethodField()
     
     class Meta:
         model = Post
+        list_serializer_class = PostListSerializer
         fields = [
             'id', 'author', 'content', 'media',
             'tags', 'region', 'reactions_count',
             'comments_count', 'shares_count', 'views_count',
             'is_edited', 'created_at', 'updated_at',
-            'user_reaction'
+            'user_reaction', 'is_saved'
         ]
         read_only_fields = [
             'reactions_count', 'comments_count', 
@@ -28,6 +51,9 @@ class PostSerializer(serializers.ModelSerializer):
         ]
     
     def get_user_reaction(self, obj):
+        if hasattr(obj, 'viewer_reaction'):
+            return obj.viewer_reaction
+        
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             from apps.interactions.models import Reaction
@@ -37,6 +63,15 @@ class PostSerializer(serializers.ModelSerializer):
             except Reaction.DoesNotExist:
                 pass
         return None
+    
+    def get_is_saved(self, obj):
+        if hasattr(obj, 'viewer_saved'):
+            return obj.viewer_saved
+        
+        user = _request_user(self)
+        if user and user.is_authenticated:
+            return SavedPost.objects.filter(user=user, post=obj).exists()
+        return False
 
 class PostCreateSerializer(serializers.ModelSerializer):
     media = serializers.ListField(
@@ -73,11 +108,21 @@ class PostCreateSerializer(serializers.ModelSerializer):
         
         return post
 
+class SavedPostListSerializer(serializers.ListSerializer):
+    """Carrega o estado do usuário dos posts salvos da página em lote"""
+    
+    def to_representation(self, data):
+        saved = list(data.all() if isinstance(data, models.Manager) else data)
+        load_viewer_state([item.post for item in saved], _request_user(self))
+        load_user_cards(self.context, [item.post.author_id for item in saved])
+        return super().to_representation(saved)
+
 class SavedPostSerializer(serializers.ModelSerializer):
     post = PostSerializer(read_only=True)
     
     class Meta:
         model = SavedPost
+        list_serializer_class = SavedPostListSerializer
         fields = ['id', 'post', 'created_at']
 
 class ReportSerializer(serializers.ModelSerializer):
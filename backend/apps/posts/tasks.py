@@ -0,0 +1,14 @@
+# backend/apps/posts/tasks.py
+from celery import shared_task
+
+from .models import Post
+from .timeline import fanout_post
+
+
+@shared_task
+def fanout_post_to_timelines(post_id):
+    """Distribui um post recém-criado para as timelines inscritas"""
+    post = Post.objects.filter(pk=post_id, is_active=True).first()
+    if post is None:
+        return 0
+    return fanout_post(post)
@@ -0,0 +1,72 @@
+import pytest
+from rest_framework import status
+from django.urls import reverse
+from apps.posts.models import Post, SavedPost
+from apps.chat.models import ChatRoom, Message
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    """Testes para paginação por cursor (created_at, id)"""
+
+    def collect(self, client, url, params):
+        ids = []
+        response = client.get(url, params)
+        while True:
+            assert response.status_code == status.HTTP_200_OK
+            assert 'count' not in response.data
+            ids.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                return ids
+            response = client.get(response.data['next'])
+
+    def test_user_posts_pages_cover_all_posts(self, auth_client, user_user):
+        """Percorre todas as páginas sem repetir nem pular posts"""
+        posts = [Post.objects.create(author=user_user, content=f"Post {i}") for i in range(5)]
+
+        client = auth_client(user_user)
+        url = reverse('user-posts', args=[user_user.id])
+        ids = self.collect(client, url, {'page_size': 2})
+
+        assert ids == [post.id for post in reversed(posts)]
+
+    def test_ties_on_created_at_use_id(self, auth_client, user_user):
+        """Posts com o mesmo created_at são desempatados pelo id"""
+        posts = [Post.objects.create(author=user_user, content=f"Post {i}") for i in range(4)]
+        Post.objects.filter(id__in=[p.id for p in posts]).update(created_at=posts[0].created_at)
+
+        client = auth_client(user_user)
+        url = reverse('user-posts', args=[user_user.id])
+        ids = self.collect(client, url, {'page_size': 1})
+
+        assert ids == sorted((post.id for post in posts), reverse=True)
+
+    def test_saved_posts_cursor(self, auth_client, user_user, plus_user):
+        """Posts salvos paginados por cursor"""
+        saved = [
+            SavedPost.objects.create(user=user_user, post=Post.objects.create(author=plus_user, content=f"P{i}"))
+            for i in range(3)
+        ]
+
+        client = auth_client(user_user)
+        ids = self.collect(client, reverse('saved-posts'), {'page_size': 2})
+
+        assert ids == [item.id for item in reversed(saved)]
+
+    def test_chat_messages_chronological_cursor(self, auth_client, user_user, plus_user):
+        """Histórico do chat paginado em ordem cronológica"""
+        room = ChatRoom.objects.create(room_type='private')
+        room.participants.add(user_user, plus_user)
+        messages = [Message.objects.create(room=room, sender=plus_user, content=f"M{i}") for i in range(5)]
+
+        client = auth_client(user_user)
+        ids = self.collect(client, reverse('chat-room-messages', args=[room.id]), {'page_size': 2})
+
+        assert ids == [message.id for message in messages]
+
+    def test_invalid_cursor(self, auth_client, user_user):
+        """Cursor inválido retorna 404"""
+        client = auth_client(user_user)
+        url = reverse('user-posts', args=[user_user.id])
+        response = client.get(url, {'cursor': 'invalido'})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -3,7 +3,14 @@ from rest_framework import status
 from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from apps.posts.models import Post, SavedPost
+from apps.posts.counters import post_views
+from apps.core.queries import fingerprint, view_query_stats
+from apps.core.tasks import flush_counters
+from apps.interactions.models import Reaction
 
 @pytest.mark.django_db
 class TestPostViews:
@@ -48,6 +55,19 @@ class TestPostViews:
         assert response.status_code == status.HTTP_200_OK
         assert response.data['count'] == 3
     
+    def test_filter_posts_by_any_tag(self, auth_client, user_user, plus_user):
+        """Testa filtro de tags por sobreposição (qualquer tag em comum)"""
+        Post.objects.create(author=user_user, content="Post Python", tags=["python", "django"])
+        Post.objects.create(author=plus_user, content="Post JS", tags=["js", "react"])
+        Post.objects.create(author=plus_user, content="Post Go", tags=["go"])
+
+        client = auth_client(user_user)
+        url = reverse('post-list')
+        response = client.get(url, {'tags': 'django,react'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 2
+        assert {p['content'] for p in response.data['results']} == {"Post Python", "Post JS"}
+
     def test_update_own_post(self, auth_client, user_user):
         """Testa atualizar próprio post"""
         post = Post.objects.create(author=user_user, content="Original")
@@ -133,4 +153,169 @@ class TestSavedPosts:
         
         response = client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 2
\ No newline at end of file
+        assert len(response.data['results']) == 2
+
+
+@pytest.mark.django_db
+class TestViewerState:
+    """Testes para o carregamento em lote do estado do usuário nas listagens"""
+
+    def create_posts(self, author, viewer, total):
+        posts = [Post.objects.create(author=author, content=f"Post {i}") for i in range(total)]
+        Reaction.objects.create(user=viewer, post=posts[0], reaction_type='love')
+        SavedPost.objects.create(user=viewer, post=posts[-1])
+        return posts
+
+    def test_list_exposes_reaction_and_saved_state(self, auth_client, user_user, plus_user):
+        """Listagem traz reação e estado de salvo do usuário"""
+        posts = self.create_posts(plus_user, user_user, 3)
+
+        client = auth_client(user_user)
+        response = client.get(reverse('user-posts', args=[plus_user.id]))
+        state = {p['id']: (p['user_reaction'], p['is_saved']) for p in response.data['results']}
+
+        assert state[posts[0].id] == ('love', False)
+        assert state[posts[1].id] == (None, False)
+        assert state[posts[2].id] == (None, True)
+
+    @pytest.mark.parametrize('url_name', ['post-list', 'user-posts', 'saved-posts', 'timeline'])
+    def test_constant_queries_per_page(self, auth_client, user_user, plus_user, url_name):
+        """Número de queries não cresce com o tamanho da página"""
+        client = auth_client(user_user)
+        args = [plus_user.id] if url_name == 'user-posts' else []
+        url = reverse(url_name, args=args)
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as ctx:
+                response = client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            return len(ctx.captured_queries)
+
+        for post in self.create_posts(plus_user, user_user, 2):
+            SavedPost.objects.get_or_create(user=user_user, post=post)
+        cache.clear()
+        small = count_queries()
+
+        for post in self.create_posts(plus_user, user_user, 6):
+            SavedPost.objects.get_or_create(user=user_user, post=post)
+        cache.clear()
+        assert count_queries() == small
+
+@pytest.mark.django_db
+class TestBufferedViews:
+    """Testes para o contador de visualizações write-behind"""
+
+    @pytest.fixture(autouse=True)
+    def write_behind(self, settings):
+        settings.COUNTERS_WRITE_BEHIND = True
+
+    def test_increment_view_is_buffered(self, auth_client, user_user, plus_user):
+        """Visualizações ficam no buffer até o flush"""
+        post = Post.objects.create(author=plus_user, content="Post viral")
+        client = auth_client(user_user)
+        url = reverse('post-increment-view', args=[post.id])
+
+        for expected in (1, 2, 3):
+            response = client.post(url)
+            assert response.data['views_count'] == expected
+
+        post.refresh_from_db()
+        assert post.views_count == 0
+
+        assert flush_counters() == 1
+        post.refresh_from_db()
+        assert post.views_count == 3
+        assert post_views.pending([post.id]) == {post.id: 0}
+
+    def test_flush_batches_many_posts(self, plus_user):
+        """Flush aplica os deltas de vários posts em lotes"""
+        posts = [Post.objects.create(author=plus_user, content=f"P{i}") for i in range(5)]
+        for i, post in enumerate(posts):
+            post_views.incr(post.id, i + 1)
+
+        assert post_views.flush(batch_size=2) == 5
+        assert list(Post.objects.filter(id__in=[p.id for p in posts]).order_by('id').values_list('views_count', flat=True)) == [1, 2, 3, 4, 5]
+        assert post_views.flush() == 0
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+    """Orçamento de queries dos endpoints de posts e instrumentação por request"""
+
+    def test_feed_budget(self, auth_client, user_user, plus_user, query_budget):
+        """Listagem de posts cabe no orçamento, sem statements repetidos"""
+        for i in range(10):
+            Post.objects.create(author=plus_user, content=f"Post {i}")
+        client = auth_client(user_user)
+
+        with query_budget(5, max_repeats=1):
+            response = client.get(reverse('post-list'))
+        assert len(response.data['results']) == 10
+
+    def test_server_timing_header(self, settings, auth_client, user_user, plus_user):
+        """Middleware expõe Server-Timing e acumula o histograma por view"""
+        settings.QUERY_INSTRUMENTATION = True
+        Post.objects.create(author=plus_user, content="Post")
+        client = auth_client(user_user)
+
+        response = client.get(reverse('post-list'))
+
+        assert response['Server-Timing'].startswith('db;dur=')
+        assert 'queries' in response['Server-Timing']
+        stats = view_query_stats()['post-list']
+        assert stats['requests'] == 1
+        assert stats['queries'] >= 1
+
+    def test_repeated_statements_are_flagged(self, settings, auth_client, user_user, plus_user):
+        """Statements repetidos acima do limite aparecem no header"""
+        settings.QUERY_INSTRUMENTATION = True
+        settings.QUERY_REPEAT_THRESHOLD = 1
+        Post.objects.create(author=plus_user, content="Post")
+        client = auth_client(user_user)
+
+        response = client.get(reverse('post-list'))
+        assert 'dbrepeat' in response['Server-Timing']
+
+    def test_fingerprint_groups_values(self):
+        """Fingerprint ignora literais e tamanho de listas IN"""
+        assert fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = \'x\'') == \
+            fingerprint('SELECT * FROM t WHERE id IN (%s) AND name = \'y\'')
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    """ETag/Last-Modified no detalhe do post"""
+
+    def test_not_modified_skips_serialization(self, auth_client, user_user, query_budget):
+        """If-None-Match com a versão atual responde 304 com uma única query"""
+        post = Post.objects.create(author=user_user, content="Post")
+        client = auth_client(user_user)
+        url = reverse('post-detail', args=[post.id])
+
+        response = client.get(url)
+        assert response['ETag'] and response['Last-Modified']
+
+        with query_budget(1):
+            cached = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+        assert cached.content == b''
+
+    def test_counters_and_viewer_state_change_etag(self, auth_client, user_user, plus_user):
+        """Contadores e reação/salvo do usuário geram um novo ETag"""
+        post = Post.objects.create(author=plus_user, content="Post")
+        client = auth_client(user_user)
+        url = reverse('post-detail', args=[post.id])
+        etag = client.get(url)['ETag']
+
+        Post.objects.filter(pk=post.pk).update(views_count=10)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['views_count'] == 10
+
+        SavedPost.objects.create(user=user_user, post=post)
+        assert client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == status.HTTP_200_OK
+
+    def test_missing_post_is_404(self, auth_client, user_user):
+        client = auth_client(user_user)
+        response = client.get(reverse('post-detail', args=[999999]), HTTP_IF_NONE_MATCH='"x"')
+        assert response.status_code == status.HTTP_404_NOT_FOUND
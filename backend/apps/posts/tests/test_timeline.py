@@ -3,7 +3,10 @@ from rest_framework import status
 from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
+from apps.accounts.models import Follow
 from apps.posts.models import Post
+from apps.posts import timeline
+from apps.posts.timeline import TimelineFeed, TimelineStore, fanout_post
 
 @pytest.mark.django_db
 class TestTimeline:
@@ -30,8 +33,8 @@ class TestTimeline:
         response = client.get(url)
         
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 1
-        assert response.data[0]['content'] == 'Post de hoje'
+        assert len(response.data['results']) == 1
+        assert response.data['results'][0]['content'] == 'Post de hoje'
     
     def test_timeline_filter_by_region(self, auth_client, user_user, plus_user):
         """Testa filtro por região"""
@@ -54,8 +57,8 @@ class TestTimeline:
         url = reverse('timeline')
         response = client.get(url)
         
-        assert len(response.data) == 1
-        assert response.data[0]['content'] == 'Post Sudeste'
+        assert len(response.data['results']) == 1
+        assert response.data['results'][0]['content'] == 'Post Sudeste'
     
     def test_timeline_filter_by_tags(self, auth_client, user_user, plus_user):
         """Testa filtro por tags preferidas"""
@@ -78,8 +81,8 @@ class TestTimeline:
         url = reverse('timeline')
         response = client.get(url)
         
-        assert len(response.data) == 1
-        assert "Python" in response.data[0]['content']
+        assert len(response.data['results']) == 1
+        assert "Python" in response.data['results'][0]['content']
     
     def test_anonimo_cannot_see_timeline(self, auth_client, anon_user):
         """Testa que anônimo não vê timeline"""
@@ -98,5 +101,167 @@ class TestTimeline:
         url = reverse('user-posts', args=[user_user.id])
         response = client.get(url)
         
-        assert len(response.data) == 2
-        assert all(p['author']['id'] == user_user.id for p in response.data)
\ No newline at end of file
+        assert len(response.data['results']) == 2
+        assert all(p['author']['id'] == user_user.id for p in response.data['results'])
+
+def feed_ids(store, user_id):
+    return [post_id for post_id, _ in store.page(user_id, limit=10)]
+
+
+@pytest.mark.django_db
+class TestTimelineFanout:
+    """Testes para a timeline pré-computada (fan-out-on-write)"""
+
+    def test_fanout_pushes_to_matching_warm_feeds(self, user_user, plus_user, pro_user):
+        """Post entra apenas nos feeds aquecidos de inscritos compatíveis"""
+        user_user.region = "Sudeste"
+        user_user.save()
+        plus_user.region = "Sul"
+        plus_user.save()
+
+        store = TimelineStore()
+        store.fill(user_user.id, [])
+        store.fill(plus_user.id, [])
+
+        post = Post.objects.create(author=pro_user, content="Post Sudeste", region="Sudeste")
+        fanout_post(post, store)
+
+        assert feed_ids(store, user_user.id) == [post.id]
+        assert feed_ids(store, plus_user.id) == []
+        # Feed frio não recebe push; será reconstruído na leitura
+        assert not store.is_warm(pro_user.id)
+
+    def test_fanout_respects_preferred_tags(self, user_user, plus_user, pro_user):
+        """Usuários com tags preferidas só recebem posts com tags em comum"""
+        user_user.preferred_tags = ["python"]
+        user_user.save()
+        plus_user.preferred_tags = ["js"]
+        plus_user.save()
+
+        store = TimelineStore()
+        store.fill(user_user.id, [])
+        store.fill(plus_user.id, [])
+
+        post = Post.objects.create(author=pro_user, content="Post Python", tags=["python", "django"])
+        fanout_post(post, store)
+
+        assert feed_ids(store, user_user.id) == [post.id]
+        assert feed_ids(store, plus_user.id) == []
+
+    def test_create_post_dispatches_fanout(self, auth_client, user_user, plus_user,
+                                           django_capture_on_commit_callbacks):
+        """Criar post via API distribui o id para os feeds após o commit"""
+        store = TimelineStore()
+        store.fill(plus_user.id, [])
+
+        client = auth_client(user_user)
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(reverse('post-list'), {'content': 'Novo post'}, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        post = Post.objects.get(author=user_user)
+        assert feed_ids(store, plus_user.id) == [post.id]
+
+    def test_cold_feed_is_rebuilt_from_database(self, user_user, plus_user):
+        """Feed frio é reconstruído a partir do banco na primeira leitura"""
+        older = Post.objects.create(author=plus_user, content="Primeiro")
+        newer = Post.objects.create(author=plus_user, content="Segundo")
+
+        feed = TimelineFeed(user_user, Post.objects.all())
+
+        assert [post.id for post in feed.page(None, 10)] == [newer.id, older.id]
+        assert [post.id for post in feed.page((newer.created_at, newer.id), 10)] == [older.id]
+
+    def test_fanout_during_cold_fill_is_kept(self, monkeypatch, user_user, plus_user):
+        """Post distribuído entre a leitura do banco e o fill entra no feed reconstruído"""
+        older = Post.objects.create(author=plus_user, content="Antes da leitura")
+        store = TimelineStore()
+        created = []
+        build = timeline.build_timeline_queryset
+
+        def build_then_fanout(user, day):
+            rows = list(build(user, day).values_list('id', 'created_at'))
+            post = Post.objects.create(author=plus_user, content="Durante a reconstrução")
+            fanout_post(post, store)
+            created.append(post)
+            return Post.objects.filter(id__in=[post_id for post_id, _ in rows])
+
+        monkeypatch.setattr(timeline, 'build_timeline_queryset', build_then_fanout)
+        feed = TimelineFeed(user_user, Post.objects.all(), store)
+
+        assert [post.id for post in feed.page(None, 10)] == [created[0].id, older.id]
+
+    def test_timeline_cursor_pagination(self, auth_client, user_user, plus_user):
+        """Timeline é paginada por cursor a partir do feed"""
+        posts = [Post.objects.create(author=plus_user, content=f"Post {i}") for i in range(3)]
+
+        client = auth_client(user_user)
+        response = client.get(reverse('timeline'), {'page_size': 2})
+        assert [p['id'] for p in response.data['results']] == [posts[2].id, posts[1].id]
+
+        response = client.get(response.data['next'])
+        assert [p['id'] for p in response.data['results']] == [posts[0].id]
+        assert response.data['next'] is None
+
+
+@pytest.mark.django_db
+class TestFollowingFeed:
+    """Testes para o feed dos perfis seguidos"""
+
+    def collect(self, client, url):
+        ids = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            ids += [post['id'] for post in response.data['results']]
+            url = response.data['next']
+        return ids
+
+    def test_only_followed_authors_newest_first(self, auth_client, user_user, plus_user, pro_user, anon_user):
+        """Feed mescla os posts dos seguidos, do mais novo para o mais antigo"""
+        Follow.objects.create(follower=user_user, following=plus_user)
+        Follow.objects.create(follower=user_user, following=pro_user)
+        posts = []
+        for i in range(3):
+            posts.append(Post.objects.create(author=plus_user, content=f"Plus {i}"))
+            posts.append(Post.objects.create(author=pro_user, content=f"Pro {i}"))
+        Post.objects.create(author=anon_user, content="Não seguido")
+        Post.objects.create(author=plus_user, content="Inativo", is_active=False)
+
+        ids = self.collect(auth_client(user_user), reverse('following-feed') + '?page_size=4')
+        assert ids == [post.id for post in reversed(posts)]
+
+    def test_pagination_past_cached_window(self, monkeypatch, auth_client, user_user, plus_user, pro_user):
+        """Páginas além da janela em cache continuam pelo LATERAL"""
+        monkeypatch.setattr('apps.posts.following.FOLLOWING_FEED_WINDOW', 3)
+        Follow.objects.create(follower=user_user, following=plus_user)
+        Follow.objects.create(follower=user_user, following=pro_user)
+        posts = [
+            Post.objects.create(author=author, content=f"Post {i}")
+            for i in range(4) for author in (plus_user, pro_user)
+        ]
+
+        ids = self.collect(auth_client(user_user), reverse('following-feed') + '?page_size=2')
+        assert ids == [post.id for post in reversed(posts)]
+
+    def test_follow_invalidates_cached_window(self, auth_client, user_user, plus_user):
+        """Seguir alguém descarta a janela em cache"""
+        client = auth_client(user_user)
+        post = Post.objects.create(author=plus_user, content="Post")
+        assert client.get(reverse('following-feed')).data['results'] == []
+
+        client.post(reverse('follow', args=[plus_user.id]))
+
+        results = client.get(reverse('following-feed')).data['results']
+        assert [item['id'] for item in results] == [post.id]
+
+    def test_following_feed_budget(self, auth_client, user_user, plus_user, pro_user, query_budget):
+        """Custo em queries independe do número de seguidos"""
+        for author in (plus_user, pro_user):
+            Follow.objects.create(follower=user_user, following=author)
+            for i in range(5):
+                Post.objects.create(author=author, content=f"Post {i}")
+
+        with query_budget(5, max_repeats=1):
+            response = auth_client(user_user).get(reverse('following-feed'))
+        assert len(response.data['results']) == 10
@@ -0,0 +1,258 @@
+# backend/apps/posts/timeline.py
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.accounts.models import UserLevel
+from apps.core.cache import get_redis_client
+from .models import Post
+
+User = get_user_model()
+
+# Quantidade máxima de posts mantidos por feed
+TIMELINE_MAX_SIZE = 1000
+# Feeds são diários; o TTL cobre o dia inteiro com folga
+TIMELINE_TTL = 60 * 60 * 36
+# Reconstrução em andamento: pushes também vão para o feed (leitor que morreu expira sozinho)
+TIMELINE_FILL_TIMEOUT = 60
+FANOUT_BATCH_SIZE = 500
+
+
+def timeline_score(created_at):
+    """Score usado para ordenar os posts no feed"""
+    return created_at.timestamp()
+
+
+def build_timeline_queryset(user, day=None):
+    """Timeline do dia calculada direto no banco (caminho frio)"""
+    day = day or timezone.localdate()
+
+    queryset = Post.objects.filter(
+        created_at__date=day,
+        is_active=True
+    ).order_by('-created_at')
+
+    if user.preferred_tags:
+        queryset = queryset.filter(tags__has_any_keys=user.preferred_tags)
+
+    if user.region:
+        queryset = queryset.filter(Q(region=user.region) | Q(region=''))
+
+    return queryset
+
+
+def timeline_subscribers(post):
+    """IDs dos usuários cuja timeline deve receber o post"""
+    users = User.objects.filter(is_active=True).exclude(level=UserLevel.ANONIMO)
+
+    if post.region:
+        users = users.filter(Q(region=post.region) | Q(region=''))
+
+    tags_filter = Q(preferred_tags=[])
+    if post.tags:
+        tags_filter |= Q(preferred_tags__has_any_keys=post.tags)
+
+    return users.filter(tags_filter).values_list('id', flat=True)
+
+
+class TimelineStore:
+    """Feeds ordenados por usuário mantidos no cache (sorted sets no Redis)"""
+
+    def __init__(self, day=None):
+        self.day = day or timezone.localdate()
+        self.redis = get_redis_client()
+
+    def _key(self, user_id):
+        return f'timeline:{user_id}:{self.day.isoformat()}'
+
+    def _raw_key(self, user_id):
+        return cache.make_key(self._key(user_id))
+
+    def _ready_key(self, user_id):
+        return f'{self._raw_key(user_id)}:ready'
+
+    def _filling_key(self, user_id):
+        return f'{self._raw_key(user_id)}:filling'
+
+    def _local_keys(self, user_id):
+        """Chaves do feed, aquecido e em reconstrução no cache do Django (sem Redis)"""
+        key = self._key(user_id)
+        return key, f'{key}:ready', f'{key}:filling'
+
+    @staticmethod
+    def _member(post_id):
+        # Zero à esquerda: empates de score caem na ordem numérica do id
+        return f'{post_id:020d}'
+
+    @staticmethod
+    def _sort(entries):
+        return sorted(entries, key=lambda entry: (entry[1], entry[0]), reverse=True)
+
+    def is_warm(self, user_id):
+        if self.redis is not None:
+            return bool(self.redis.exists(self._ready_key(user_id)))
+        return cache.get(self._local_keys(user_id)[1]) is not None
+
+    def begin_fill(self, user_id):
+        """Esvazia o feed e o marca em reconstrução, antes da leitura do banco
+
+        A partir daqui push() também escreve nele; fill() mescla o que chegou, então
+        um post distribuído entre a leitura do banco e o fill não se perde.
+        """
+        if self.redis is not None:
+            pipe = self.redis.pipeline()
+            pipe.delete(self._raw_key(user_id))
+            pipe.set(self._filling_key(user_id), 1, ex=TIMELINE_FILL_TIMEOUT)
+            pipe.execute()
+            return
+
+        key, _, filling_key = self._local_keys(user_id)
+        cache.set(filling_key, 1, TIMELINE_FILL_TIMEOUT)
+        cache.delete(key)
+
+    def fill(self, user_id, entries):
+        """Mescla (post_id, score) ao feed e o marca como aquecido"""
+        entries = self._sort(entries)[:TIMELINE_MAX_SIZE]
+
+        if self.redis is not None:
+            key = self._raw_key(user_id)
+            pipe = self.redis.pipeline()
+            if entries:
+                pipe.zadd(key, {self._member(post_id): score for post_id, score in entries})
+            pipe.zremrangebyrank(key, 0, -(TIMELINE_MAX_SIZE + 1))
+            pipe.expire(key, TIMELINE_TTL)
+            pipe.set(self._ready_key(user_id), 1, ex=TIMELINE_TTL)
+            pipe.delete(self._filling_key(user_id))
+            pipe.execute()
+            return
+
+        key, ready_key, filling_key = self._local_keys(user_id)
+        pushed = [tuple(entry) for entry in cache.get(key) or []]
+        merged = self._sort(set(pushed) | set(entries))[:TIMELINE_MAX_SIZE]
+        cache.set_many({key: [list(entry) for entry in merged], ready_key: 1}, TIMELINE_TTL)
+        cache.delete(filling_key)
+
+    def push(self, user_ids, post_id, score):
+        """Insere o post nos feeds aquecidos ou em reconstrução; os frios são reconstruídos na leitura"""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return 0
+
+        if self.redis is not None:
+            pipe = self.redis.pipeline()
+            for user_id in user_ids:
+                pipe.exists(self._ready_key(user_id), self._filling_key(user_id))
+            warm_ids = [user_id for user_id, warm in zip(user_ids, pipe.execute()) if warm]
+
+            pipe = self.redis.pipeline()
+            for user_id in warm_ids:
+                key = self._raw_key(user_id)
+                pipe.zadd(key, {self._member(post_id): score})
+                pipe.zremrangebyrank(key, 0, -(TIMELINE_MAX_SIZE + 1))
+                pipe.expire(key, TIMELINE_TTL)
+            pipe.execute()
+            return len(warm_ids)
+
+        local_keys = [self._local_keys(user_id) for user_id in user_ids]
+        found = cache.get_many([key for keys in local_keys for key in keys])
+        feeds = {
+            key: found.get(key, []) for key, ready_key, filling_key in local_keys
+            if ready_key in found or filling_key in found
+        }
+        for key, entries in feeds.items():
+            entries = [entry for entry in entries if entry[0] != post_id]
+            entries.append([post_id, score])
+            feeds[key] = self._sort(entries)[:TIMELINE_MAX_SIZE]
+        cache.set_many(feeds, TIMELINE_TTL)
+        return len(feeds)
+
+    def page(self, user_id, after=None, limit=20):
+        """Até `limit` entradas (post_id, score) posteriores ao cursor (score, post_id)"""
+        if self.redis is not None:
+            key = self._raw_key(user_id)
+            if after is None:
+                rows = self.redis.zrevrangebyscore(key, '+inf', '-inf', start=0, num=limit, withscores=True)
+                return [(int(member), score) for member, score in rows]
+
+            score, post_id = after
+            # Empates no score do cursor já vistos são descartados abaixo
+            ties = self.redis.zcount(key, score, score)
+            rows = self.redis.zrevrangebyscore(key, score, '-inf', start=0, num=limit + ties, withscores=True)
+            entries = [(int(member), row_score) for member, row_score in rows]
+        else:
+            entries = [tuple(entry) for entry in cache.get(self._key(user_id)) or []]
+            if after is None:
+                return entries[:limit]
+            score, post_id = after
+
+        return [
+            (entry_id, entry_score) for entry_id, entry_score in entries
+            if entry_score < score or (entry_score == score and entry_id < post_id)
+        ][:limit]
+
+    def clear(self, user_id):
+        if self.redis is not None:
+            self.redis.delete(self._raw_key(user_id), self._ready_key(user_id), self._filling_key(user_id))
+            return
+        cache.delete_many(self._local_keys(user_id))
+
+
+def fanout_post(post, store=None):
+    """Distribui o post para os feeds dos usuários inscritos"""
+    store = store or TimelineStore(timezone.localdate(post.created_at))
+    score = timeline_score(post.created_at)
+    pushed = 0
+
+    batch = []
+    for user_id in timeline_subscribers(post).iterator(chunk_size=FANOUT_BATCH_SIZE):
+        batch.append(user_id)
+        if len(batch) >= FANOUT_BATCH_SIZE:
+            pushed += store.push(batch, post.id, score)
+            batch = []
+    pushed += store.push(batch, post.id, score)
+
+    return pushed
+
+
+class TimelineFeed:
+    """Feed pré-computado do usuário, hidratado página a página"""
+
+    def __init__(self, user, queryset, store=None):
+        self.user = user
+        self.queryset = queryset
+        self.store = store or TimelineStore()
+
+        if not self.store.is_warm(user.id):
+            self.store.begin_fill(user.id)
+            rows = build_timeline_queryset(user, self.store.day).values_list('id', 'created_at')
+            self.store.fill(user.id, [
+                (post_id, timeline_score(created_at))
+                for post_id, created_at in rows[:TIMELINE_MAX_SIZE]
+            ])
+
+    def page(self, position, limit):
+        """Posts após a posição (created_at, id) do cursor, na ordem do feed"""
+        after = None
+        if position is not None:
+            created_at, post_id = position
+            after = (timeline_score(created_at), post_id)
+
+        posts = []
+        while len(posts) < limit:
+            wanted = limit - len(posts)
+            entries = self.store.page(self.user.id, after, wanted)
+            posts.extend(self.hydrate([post_id for post_id, _ in entries]))
+            if len(entries) < wanted:
+                break
+            last_id, last_score = entries[-1]
+            after = (last_score, last_id)
+
+        return posts
+
+    def hydrate(self, post_ids):
+        """Carrega os posts em uma única query preservando a ordem do feed"""
+        if not post_ids:
+            return []
+        posts = {post.id: post for post in self.queryset.filter(id__in=post_ids)}
+        return [posts[post_id] for post_id in post_ids if post_id in posts]
@@ -9,6 +9,7 @@ router.register(r'posts', views.PostViewSet, basename='post')
 urlpatterns = [
     # Timeline e feeds
     path('timeline/', views.TimelineView.as_view(), name='timeline'),
+    path('following/', views.FollowingFeedView.as_view(), name='following-feed'),
     path('user/<int:user_id>/', views.UserPostsView.as_view(), name='user-posts'),
     path('saved/', views.SavedPostsView.as_view(), name='saved-posts'),
     
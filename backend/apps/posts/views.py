@@ -3,27 +3,39 @@ from rest_framework import generics, permissions, status, viewsets, filters
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Prefetch
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Subquery
 from django.core.exceptions import PermissionDenied
 from django.utils import timezone
 
+from .counters import post_views
+from .filters import PostFilter, TimelineFilter
+from .following import FollowingFeed
 from .models import Post, SavedPost
+from .pagination import TimelinePagination
+from .tasks import fanout_post_to_timelines
+from .timeline import TimelineFeed
 from .serializers import (
     PostSerializer, PostCreateSerializer,
     SavedPostSerializer, ReportSerializer
 )
 from apps.accounts.permissions import CanPost, CanViewContent
-from apps.accounts.models import UserActivity
-from apps.interactions.models import Reaction
+from apps.core.conditional import ConditionalGetMixin, make_etag
+from apps.core.pagination import CachedKeysetPagination, KeysetPagination
+from apps.core.versioned_cache import bump_version
+from apps.accounts.activity import record_activity
 
+User = get_user_model()
 
-class PostViewSet(viewsets.ModelViewSet):
+
+class PostViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet para posts"""
-    queryset = Post.objects.filter(is_active=True)
+    queryset = Post.objects.filter(is_active=True).prefetch_related('media')
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticated, CanViewContent]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
-    filterset_fields = ['region', 'tags', 'author']
+    filterset_class = PostFilter
     search_fields = ['content']
 
     def get_serializer_class(self):
@@ -36,27 +48,45 @@ class PostViewSet(viewsets.ModelViewSet):
             self.permission_classes = [permissions.IsAuthenticated, CanPost]
         return super().get_permissions()
 
+    def get_validators(self):
+        if self.action != 'retrieve':
+            return None
+
+        from apps.interactions.models import Reaction
+
+        # Uma linha: timestamps, contadores e o estado do usuário exibido no post
+        user = self.request.user
+        row = Post.objects.filter(pk=self.kwargs['pk'], is_active=True).values_list(
+            'updated_at', 'author__updated_at',
+            'reactions_count', 'comments_count', 'shares_count', 'views_count',
+            Subquery(Reaction.objects.filter(post=OuterRef('pk'), user=user).values('reaction_type')[:1]),
+            Exists(SavedPost.objects.filter(post=OuterRef('pk'), user=user)),
+        ).first()
+        if row is None:
+            return None
+        return make_etag(*row), max(row[0], row[1])
+
     def perform_create(self, serializer):
         post = serializer.save()
+        bump_version(f'user_posts:{post.author_id}')
 
-        UserActivity.objects.create(
-            user=self.request.user,
-            activity_type='post',
-            target_id=post.id
-        )
+        record_activity(self.request.user, 'post', target_id=post.id)
+
+        User.objects.filter(pk=self.request.user.pk).update(posts_count=F('posts_count') + 1)
 
-        self.request.user.posts_count += 1
-        self.request.user.save()
+        transaction.on_commit(lambda: fanout_post_to_timelines.delay(post.id))
 
     def perform_update(self, serializer):
         if serializer.instance.author_id != self.request.user.id:
             raise PermissionDenied('Você não pode editar este post')
-        serializer.save(is_edited=True)
+        post = serializer.save(is_edited=True)
+        bump_version(f'user_posts:{post.author_id}')
 
     def perform_destroy(self, instance):
         if instance.author_id != self.request.user.id:
             raise PermissionDenied('Você não pode excluir este post')
         instance.delete()
+        bump_version(f'user_posts:{instance.author_id}')
 
     @action(detail=True, methods=['post'])
     def save(self, request, pk=None):
@@ -93,8 +123,9 @@ class PostViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def increment_view(self, request, pk=None):
         post = self.get_object()
-        post.increment_views()
-        return Response({'views_count': post.views_count})
+        # Write-behind: o incremento vai para o buffer e é gravado em lote depois
+        pending = post_views.incr(post.pk)
+        return Response({'views_count': post.views_count + pending})
 
 
 class TimelineView(generics.ListAPIView):
@@ -102,51 +133,67 @@ class TimelineView(generics.ListAPIView):
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticated, CanViewContent]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
-    filterset_fields = ['region', 'tags']
+    filterset_class = TimelineFilter
+    pagination_class = TimelinePagination
 
     def get_queryset(self):
-        user = self.request.user
-        today = timezone.now().date()
-
-        queryset = Post.objects.filter(
-            created_at__date=today,
+        return Post.objects.filter(
+            created_at__date=timezone.localdate(),
             is_active=True
-        ).select_related('author').prefetch_related(
-            'media',
-            Prefetch(
-                'reactions',
-                queryset=Reaction.objects.filter(user=user),
-                to_attr='user_reaction'
-            )
-        ).order_by('-created_at')
+        ).prefetch_related('media')
 
-        if user.preferred_tags:
-            allowed_ids = [
-                post.id for post in queryset
-                if set(post.tags or []).intersection(set(user.preferred_tags))
-            ]
-            queryset = queryset.filter(id__in=allowed_ids)
+    def list(self, request, *args, **kwargs):
+        # O feed vem pré-computado (fan-out-on-write); aqui só hidratamos a página
+        feed = TimelineFeed(request.user, self.filter_queryset(self.get_queryset()))
 
-        if user.region:
-            queryset = queryset.filter(Q(region=user.region) | Q(region=''))
+        page = self.paginate_queryset(feed)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
-        return queryset
+
+class FollowingFeedView(generics.ListAPIView):
+    """Posts mais recentes dos perfis seguidos"""
+    serializer_class = PostSerializer
+    permission_classes = [permissions.IsAuthenticated, CanViewContent]
+    pagination_class = TimelinePagination
+
+    def get_queryset(self):
+        return Post.objects.filter(is_active=True).prefetch_related('media')
+
+    def list(self, request, *args, **kwargs):
+        feed = FollowingFeed(request.user, self.get_queryset())
+
+        page = self.paginate_queryset(feed)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
 
 class UserPostsView(generics.ListAPIView):
     """Posts de um usuário específico"""
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticated, CanViewContent]
+    pagination_class = CachedKeysetPagination
+
+    cache_prefix = 'user_posts'
+
+    def get_cache_versions(self):
+        return [f"user_posts:{self.kwargs['user_id']}"]
 
     def get_queryset(self):
         user_id = self.kwargs['user_id']
-        return Post.objects.filter(author_id=user_id, is_active=True).order_by('-created_at')
+        return Post.objects.filter(
+            author_id=user_id,
+            is_active=True
+        ).prefetch_related('media')
 
 
 class SavedPostsView(generics.ListAPIView):
     """Posts salvos pelo usuário"""
     serializer_class = SavedPostSerializer
     permission_classes = [permissions.IsAuthenticated, CanViewContent]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
-        return SavedPost.objects.filter(user=self.request.user).select_related('post__author').order_by('-created_at')
+        return SavedPost.objects.filter(
+            user=self.request.user
+        ).select_related('post').prefetch_related('post__media')
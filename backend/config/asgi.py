@@ -2,20 +2,22 @@
 import os
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
 from django.urls import path
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 django_asgi_app = get_asgi_application()
 
-from apps.chat.consumers import ChatConsumer
+from apps.accounts.auth import CachedAuthMiddlewareStack
+from apps.chat.consumers import ChatConsumer, InboxConsumer
 
 application = ProtocolTypeRouter({
     'http': django_asgi_app,
-    'websocket': AuthMiddlewareStack(
+    'websocket': CachedAuthMiddlewareStack(
         URLRouter([
             path('ws/chat/<int:room_id>/', ChatConsumer.as_asgi()),
+            # Um socket por usuário para todas as conversas
+            path('ws/inbox/', InboxConsumer.as_asgi()),
         ])
     ),
 })
\ No newline at end of file
@@ -42,6 +42,7 @@ INSTALLED_APPS = [
     'storages',
     
     # Local apps
+    'apps.core',
     'apps.accounts',
     'apps.posts',
     'apps.chat',
@@ -51,6 +52,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'apps.core.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -61,6 +63,10 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Server-Timing, histograma de queries por view e alerta de N+1 (ver apps.core.middleware)
+QUERY_INSTRUMENTATION = os.getenv('QUERY_INSTRUMENTATION', '1' if DEBUG else '0') == '1'
+QUERY_REPEAT_THRESHOLD = int(os.getenv('QUERY_REPEAT_THRESHOLD', '5'))
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -166,7 +172,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',  
+        'apps.accounts.auth.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
@@ -175,6 +181,16 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
     ),
+    # orjson com a mesma saída do JSONRenderer do DRF
+    'DEFAULT_RENDERER_CLASSES': (
+        'apps.core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'apps.core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_THROTTLE_CLASSES': [
@@ -223,6 +239,29 @@ CELERY_ACCEPT_CONTENT = ['application/json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_TASK_ALWAYS_EAGER = IS_TESTING
+CELERY_BEAT_SCHEDULE = {
+    'flush-counters': {
+        'task': 'apps.core.tasks.flush_counters',
+        'schedule': 10.0,
+    },
+    'flush-activity-queue': {
+        'task': 'apps.accounts.tasks.flush_activity_queue',
+        'schedule': 5.0,
+    },
+    'create-activity-partitions': {
+        'task': 'apps.accounts.tasks.create_activity_partitions',
+        'schedule': 60 * 60 * 24,
+    },
+}
+
+# Contadores (views, reações, comentários, seguidores) acumulados e gravados em lote;
+# nos testes os deltas vão direto para o banco
+COUNTERS_WRITE_BEHIND = not IS_TESTING
+# Atividades enfileiradas no Redis e persistidas com bulk_create
+ACTIVITY_WRITE_BEHIND = not IS_TESTING
+# Listas de posts, comentários e mensagens renderizadas sem os campos do DRF (mesmo JSON)
+FAST_SERIALIZERS = os.getenv('FAST_SERIALIZERS', '1') == '1'
 
 # MinIO/S3
 if IS_TESTING:
@@ -2,14 +2,24 @@ import pytest
 from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from apps.accounts.models import UserLevel
 from apps.payments.models import Plan
 import tempfile
 from PIL import Image
 import io
 
+pytest_plugins = ['apps.core.pytest_plugin']
+
 User = get_user_model()
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Isola o cache (locmem) entre os testes"""
+    cache.clear()
+    yield
+    cache.clear()
+
 @pytest.fixture
 def api_client():
     """Retorna um APICliente não autenticado"""